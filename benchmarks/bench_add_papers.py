@@ -0,0 +1,71 @@
+"""
+Benchmark adding Papers one by one to a paperSet.
+
+The previous `paperSet.add_paper` scanned `self.papers` for duplicates and
+copied the whole df with `pd.concat` for every Paper, which is quadratic in
+the number of Papers. It is reproduced below as `scan_and_concat` for
+comparison; the current `add_papers` uses a PMCID index and appends buffered
+rows to the df in one block.
+
+Usage:
+    python benchmarks/bench_add_papers.py [--papers 500 2000 5000]
+"""
+
+import argparse
+import time
+import warnings
+import pandas as pd
+from scrapemed.paperSet import paperSet
+from scrapemed.tests.conftest import make_test_papers
+
+
+def scan_and_concat(pset: paperSet, papers: list) -> None:
+    """
+    The previous add_papers, for comparison.
+    """
+    df = pset.df
+    for paper in papers:
+        if paper not in pset.papers:
+            pset.papers.append(paper)
+            new_row = paper.to_relational()
+            df = pd.concat([df, new_row.to_frame().T], ignore_index=True)
+    pset.df = df
+    return None
+
+
+def indexed(pset: paperSet, papers: list) -> None:
+    pset.add_papers(papers)
+    pset.df
+    return None
+
+
+def timed(fn, papers: list) -> float:
+    pset = paperSet([])
+    start = time.perf_counter()
+    fn(pset, papers)
+    elapsed = time.perf_counter() - start
+    assert len(pset.df) == len(papers)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--papers", type=int, nargs="+", default=[500, 2000, 5000])
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    print(f"{'papers':>7} | {'scan+concat':>11} {'indexed':>9} {'speedup':>7}")
+    for n_papers in args.papers:
+        papers = make_test_papers(n_papers)
+        old_time = timed(scan_and_concat, papers)
+        new_time = timed(indexed, papers)
+        print(
+            f"{n_papers:>7} | {old_time:>10.2f}s {new_time:>8.2f}s "
+            f"{old_time / new_time:>6.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
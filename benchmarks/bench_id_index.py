@@ -0,0 +1,101 @@
+"""
+Benchmark xref and affiliation resolution on reference-heavy papers.
+
+Each citation, table, figure and affiliation id used to be resolved with its
+own absolute XPath query (ie. //ref[@id='CR1']), which is O(references x
+document size). `_parse.index_ids` indexes every @id once per document, so
+resolution is a dict lookup. The test paper is padded with extra references,
+each cited once in the body, to show how parse time scales.
+
+Usage:
+    python benchmarks/bench_id_index.py [--repeats 3] [--refs 100 300 1000]
+"""
+
+import argparse
+import copy
+import os
+import time
+import warnings
+import lxml.etree as ET
+import scrapemed._parse as parse
+
+TEST_XML = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "scrapemed",
+    "tests",
+    "testdata",
+    "test.xml",
+)
+
+
+def reference_heavy_paper(root: ET.Element, n_refs: int) -> ET.Element:
+    """
+    Pad a paper's reference list to `n_refs` references, each cited once.
+    """
+    root = copy.deepcopy(root)
+    ref_list = root.find(".//ref-list")
+    template = ref_list.find("ref")
+    paragraph = ET.SubElement(root.find(".//body"), "p")
+    paragraph.text = "Padding "
+    for i in range(len(ref_list.findall("ref")), n_refs):
+        ref = copy.deepcopy(template)
+        ref.set("id", f"PAD{i}")
+        ref_list.append(ref)
+        xref = ET.SubElement(paragraph, "xref", {"ref-type": "bibr", "rid": f"PAD{i}"})
+        xref.text = str(i)
+        xref.tail = ", "
+    return root
+
+
+def resolve_xpath(root: ET.Element) -> None:
+    for xref in root.iterfind(".//xref[@ref-type='bibr']"):
+        root.xpath(f"//ref[@id='{xref.get('rid')}']")
+
+
+def resolve_index(root: ET.Element) -> None:
+    ids = parse.index_ids(root)
+    for xref in root.iterfind(".//xref[@ref-type='bibr']"):
+        parse._find_by_id(ids, xref.get("rid"), "ref")
+
+
+def best_time(fn, root: ET.Element, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(root)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--refs", type=int, nargs="+", default=[100, 300, 1000])
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    base = ET.parse(TEST_XML).getroot()
+
+    print(
+        f"{'refs':>5} | {'resolve xpath':>13} {'index':>8} {'speedup':>7} | "
+        f"{'paper_dict':>10} {'per ref':>8}"
+    )
+    for n_refs in args.refs:
+        root = reference_heavy_paper(base, n_refs)
+        xpath_time = best_time(resolve_xpath, root, args.repeats)
+        index_time = best_time(resolve_index, root, args.repeats)
+        dict_time = best_time(
+            lambda r: parse.generate_paper_dict(0, r), root, args.repeats
+        )
+        print(
+            f"{n_refs:>5} | {xpath_time * 1000:>11.1f}ms {index_time * 1000:>6.1f}ms "
+            f"{xpath_time / index_time:>6.1f}x | {dict_time * 1000:>8.0f}ms "
+            f"{dict_time / n_refs * 1000:>6.2f}ms"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
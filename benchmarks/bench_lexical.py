@@ -0,0 +1,100 @@
+"""
+Benchmark the BM25 lexical index over a paperSet's chunks.
+
+`_lexical.bm25Index` keeps its postings in flat numpy arrays. It is compared
+with the same postings as a dict of per-term Python lists of (chunk, count)
+tuples, on the chunks of a PMC article repeated under many PMCIDs: memory of
+the postings, build time, and time per query.
+
+Usage:
+    python benchmarks/bench_lexical.py [--papers 200] [--queries 200]
+        [--xml examples/data/entrez_download_PMCID=7067710.xml]
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+import lxml.etree as ET
+import scrapemed._lexical as _lexical
+import scrapemed._vector as _vector
+from scrapemed.paper import Paper
+
+
+def list_postings(chunk_lists: list) -> dict:
+    """
+    The postings as a dict of per-term lists, for comparison.
+    """
+    postings = {}
+    chunk = 0
+    for chunks in chunk_lists:
+        for text in chunks:
+            for term, count in Counter(_lexical.tokenize(text)).items():
+                postings.setdefault(term, []).append((chunk, count))
+            chunk += 1
+    return postings
+
+
+def list_postings_nbytes(postings: dict) -> int:
+    """
+    Memory of the per-term lists and their tuples, excluding shared ints.
+    """
+    return sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(posting) for posting in row)
+        for row in postings.values()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--xml", default="examples/data/entrez_download_PMCID=7067710.xml"
+    )
+    args = parser.parse_args()
+
+    paper = Paper.from_xml(
+        7067710, ET.parse(args.xml).getroot(), suppress_warnings=True
+    )
+    _, chunks, _ = _vector.chunk_paper(paper, 100, 20)
+    chunk_lists = [chunks] * args.papers
+    words = sorted(set(_lexical.tokenize(paper.full_text())))
+    queries = [
+        f"{words[i % len(words)]} {words[(7 * i) % len(words)]}"
+        for i in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    index = _lexical.bm25Index()
+    for pmcid, paper_chunks in enumerate(chunk_lists):
+        index.add(pmcid, paper_chunks)
+    index.search("warm up")
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    postings = list_postings(chunk_lists)
+    list_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, n_results=10)
+    query_time = (time.perf_counter() - start) / len(queries)
+
+    print(
+        f"{args.papers} papers, {len(index)} chunks, "
+        f"{len(index.postings)} postings, {len(index.vocabulary)} terms"
+    )
+    print(f"{'postings':>10} | {'memory':>9} {'build':>8}")
+    print(
+        f"{'lists':>10} | {list_postings_nbytes(postings) / 2**20:>7.1f}MB "
+        f"{list_time:>7.2f}s"
+    )
+    print(f"{'arrays':>10} | {index.nbytes / 2**20:>7.1f}MB {build_time:>7.2f}s")
+    print(f"query: {query_time * 1000:.2f}ms")
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
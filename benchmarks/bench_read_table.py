@@ -0,0 +1,102 @@
+"""
+Benchmark reading PMC tables into dataframes.
+
+TextTable previously serialized each <table-wrap> and re-parsed it with
+`pd.read_html`. The current `_text.read_table` walks the lxml tree directly,
+producing the same dataframe. Both are timed on the tables of a PMC article,
+and on a synthetic table-heavy clinical paper (baseline characteristics and
+adverse event tables, with grouped rows and spanning headers).
+
+Usage:
+    python benchmarks/bench_read_table.py [--repeats 5] [--tables 20]
+        [--rows 60] [--xml examples/data/entrez_download_PMCID=7067710.xml]
+"""
+
+import argparse
+import time
+import lxml.etree as ET
+import pandas as pd
+import scrapemed._text as _text
+
+
+def clinical_table(n_rows: int) -> ET.Element:
+    """
+    A table-wrap of adverse events by arm, with a two row header spanning
+    dose groups, and body rows grouped by system organ class via rowspan.
+    """
+    arms = ["Placebo", "Low dose", "High dose"]
+    head = (
+        "<thead><tr><th rowspan='2'>System organ class</th>"
+        "<th rowspan='2'>Preferred term</th>"
+        + "".join(f"<th colspan='2'>{arm}</th>" for arm in arms)
+        + "</tr><tr>"
+        + "<th>n</th><th>%</th>" * len(arms)
+        + "</tr></thead>"
+    )
+    rows = []
+    for i in range(n_rows):
+        group = f"<td rowspan='5'>Class {i // 5}</td>" if i % 5 == 0 else ""
+        cells = "".join(
+            f"<td>{1000 + 37 * i + j:,}</td><td>{(i * 7 + j) % 100 / 10}</td>"
+            for j in range(len(arms))
+        )
+        rows.append(f"<tr>{group}<td>Event {i}</td>{cells}</tr>")
+    return ET.fromstring(
+        "<table-wrap><label>Table 2</label><caption><p>Adverse events</p>"
+        f"</caption><table>{head}<tbody>{''.join(rows)}</tbody></table>"
+        "</table-wrap>"
+    )
+
+
+def read_html(table_wrap: ET.Element) -> pd.DataFrame:
+    """
+    The previous table reading, for comparison.
+    """
+    return pd.read_html(ET.tostring(table_wrap))[0]
+
+
+def best_time(fn, tables: list, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for table in tables:
+            fn(table)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=60)
+    parser.add_argument(
+        "--xml", default="examples/data/entrez_download_PMCID=7067710.xml"
+    )
+    args = parser.parse_args()
+
+    article_tables = list(ET.parse(args.xml).getroot().iter("table-wrap"))
+    clinical_tables = [clinical_table(args.rows) for _ in range(args.tables)]
+    cases = [
+        (f"article ({len(article_tables)} tables)", article_tables),
+        (f"clinical ({args.tables}x{args.rows} rows)", clinical_tables),
+    ]
+
+    print(f"{'tables':>26} | {'read_html':>10} {'walk':>9} {'speedup':>7}")
+    for name, tables in cases:
+        # both produce the same dataframes
+        for table in tables:
+            pd.testing.assert_frame_equal(_text.read_table(table), read_html(table))
+
+        old_time = best_time(read_html, tables, args.repeats)
+        new_time = best_time(_text.read_table, tables, args.repeats)
+        print(
+            f"{name:>26} | {old_time * 1000:>8.1f}ms {new_time * 1000:>7.1f}ms "
+            f"{old_time / new_time:>6.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
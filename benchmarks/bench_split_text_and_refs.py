@@ -0,0 +1,103 @@
+"""
+Micro-benchmark `_clean.split_text_and_refs` on long, xref-dense paragraphs.
+
+The previous tokenizer searched for the next tag, then sliced the rest of the
+text off and appended to the output string piece by piece, which is quadratic
+in paragraph length. It is reproduced below as `search_and_slice` for
+comparison; the current tokenizer makes one `finditer` pass.
+
+Usage:
+    python benchmarks/bench_split_text_and_refs.py [--repeats 5]
+        [--xrefs 100 1000 5000 20000]
+"""
+
+import argparse
+import time
+import warnings
+import scrapemed._clean as _clean
+import scrapemed._morehtml as mhtml
+from scrapemed.utils import basicBiMap
+
+SENTENCE = (
+    "Ibuprofen and <italic>acetaminophen</italic> are among the most widely "
+    'used analgesics [<xref ref-type="bibr" rid="CR{i}">{i}</xref>]. '
+)
+
+
+def xref_dense_paragraph(n_xrefs: int) -> str:
+    return "".join(SENTENCE.format(i=i % 300) for i in range(n_xrefs))
+
+
+def search_and_slice(tree_text: str, ref_map: basicBiMap) -> str:
+    """
+    The previous tokenizer (known tags only), for comparison.
+    """
+    text = _clean._remove_text_styling(tree_text.strip())
+    cleaned_text = ""
+    while len(text) > 0:
+        match = _clean.XML_HTML_TAG_PATTERN.search(text)
+        if match:
+            cleaned_text += text[0 : match.start()]
+            if match.group(1) == "xref":
+                cleaned_text += match.group(2)
+            data_ref = _clean._data_ref_from_tag(
+                match.group(1), match.group(), match.group(2), {}
+            )
+            if data_ref in ref_map.reverse:
+                ref_num = ref_map.reverse[data_ref]
+            else:
+                ref_num = len(ref_map)
+                ref_map[ref_num] = data_ref
+            cleaned_text += mhtml.generate_typed_mhtml_tag(
+                tag_type="dataref", string=str(ref_num)
+            )
+            text = text[match.end() :]
+        else:
+            cleaned_text += text
+            text = ""
+    return cleaned_text
+
+
+def best_time(fn, text: str, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text, basicBiMap())
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--xrefs", type=int, nargs="+", default=[100, 1000, 5000, 20000]
+    )
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    print(
+        f"{'xrefs':>6} {'chars':>9} | {'search+slice':>12} {'finditer':>9} "
+        f"{'speedup':>7}"
+    )
+    for n_xrefs in args.xrefs:
+        text = xref_dense_paragraph(n_xrefs)
+        # both tokenizers produce the same text and ref map
+        old_map, new_map = basicBiMap(), basicBiMap()
+        assert search_and_slice(text, old_map) == _clean.split_text_and_refs(
+            text, new_map
+        )
+        assert old_map == new_map
+
+        old_time = best_time(search_and_slice, text, args.repeats)
+        new_time = best_time(_clean.split_text_and_refs, text, args.repeats)
+        print(
+            f"{n_xrefs:>6} {len(text):>9} | {old_time * 1000:>10.2f}ms "
+            f"{new_time * 1000:>7.2f}ms {old_time / new_time:>6.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark `_clean._remove_text_styling` on a PMC article and its paragraphs.
+
+The previous implementation made one case-insensitive regex pass for all
+removals and closing tags, then one pass per replacement. It is reproduced
+below as `multi_pass` for comparison; the current `styleCleaner` makes a
+single pass with a callback.
+
+Usage:
+    python benchmarks/bench_style_cleaner.py [--repeats 20]
+        [--xml examples/data/entrez_download_PMCID=7067710.xml]
+"""
+
+import argparse
+import re
+import time
+import lxml.etree as ET
+import scrapemed._clean as _clean
+
+REMOVALS = ["<italic>", "<i>", "<bold>", "<b>", "<underline>", "<u>"]
+REPLACES = {"<sub>": "_", "<sup>": "^", "<ext-link>": "[External URI:]"}
+
+
+def multi_pass(text: str) -> str:
+    """
+    The previous styling removal, for comparison.
+    """
+    to_remove = REMOVALS + [f"</{tag[1:]}" for tag in REMOVALS + list(REPLACES)]
+    removal_pattern = "|".join(tag[:-1] + r"\b[^>]*>" for tag in to_remove)
+    text = re.sub(removal_pattern, "", text, flags=re.IGNORECASE)
+    for find, replace in REPLACES.items():
+        text = re.sub(find[:-1] + r"\b[^>]*>", replace, text)
+    return text
+
+
+def best_time(fn, texts: list, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--xml", default="examples/data/entrez_download_PMCID=7067710.xml"
+    )
+    args = parser.parse_args()
+
+    with open(args.xml, "rb") as f:
+        xml_bytes = f.read()
+    xml_text = xml_bytes.decode("utf-8")
+    paragraphs = [
+        ET.tostring(p, encoding="unicode") for p in ET.fromstring(xml_bytes).iter("p")
+    ]
+    cases = [
+        ("document", [xml_text]),
+        (f"{len(paragraphs)} paragraphs", paragraphs),
+    ]
+
+    print(f"{'input':>18} | {'multi-pass':>10} {'single':>9} {'speedup':>7}")
+    for name, texts in cases:
+        # both implementations produce the same text
+        for text in texts:
+            assert multi_pass(text) == _clean._remove_text_styling(text)
+
+        old_time = best_time(multi_pass, texts, args.repeats)
+        new_time = best_time(_clean._remove_text_styling, texts, args.repeats)
+        print(
+            f"{name:>18} | {old_time * 1000:>8.2f}ms {new_time * 1000:>7.2f}ms "
+            f"{old_time / new_time:>6.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
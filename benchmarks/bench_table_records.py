@@ -0,0 +1,134 @@
+"""
+Benchmark deferred table materialization, on a table-heavy paper.
+
+Papers previously held each table as a pandas Styler (a dataframe captioned
+with its label and caption), built while parsing, and `Paper.to_relational`
+rendered each one to HTML. Tables are now kept as compact `tableRecord`s of
+their cell text, built into Stylers only on access to `paper.tables`, and
+exported by `to_relational` as they are. The previous behavior is reproduced
+below by accessing `paper.tables` while parsing, and rendering it to HTML.
+
+Times are measured on the test article, with synthetic clinical tables (see
+bench_read_table.py) added to its body, and the memory held by its tables
+on the test article's tables and the clinical tables alone.
+
+Usage:
+    python benchmarks/bench_table_records.py [--repeats 5] [--tables 20]
+        [--rows 60]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+import warnings
+import lxml.etree as ET
+import scrapemed._text as _text
+from scrapemed.paper import Paper
+from bench_read_table import clinical_table
+
+TEST_XML = os.path.join("scrapemed", "tests", "testdata", "test.xml")
+
+
+def table_heavy_article(n_tables: int, n_rows: int) -> ET.Element:
+    root = ET.parse(TEST_XML).getroot()
+    body = root.find(".//body")
+    for _ in range(n_tables):
+        body.append(clinical_table(n_rows))
+    return root
+
+
+def parse_eager(root: ET.Element) -> Paper:
+    """
+    The previous parsing, building every table's Styler.
+    """
+    paper = Paper.from_xml(7067710, root, suppress_warnings=True)
+    paper.tables
+    return paper
+
+
+def parse_deferred(root: ET.Element) -> Paper:
+    return Paper.from_xml(7067710, root, suppress_warnings=True)
+
+
+def relational_html(paper: Paper) -> None:
+    """
+    The previous to_relational tables, rendered to HTML.
+    """
+    paper.to_relational()
+    [table.to_html() for table in paper.tables if table is not None]
+    return None
+
+
+def relational_records(paper: Paper) -> None:
+    paper.to_relational()
+    return None
+
+
+def best_time(fn, arg, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def retained_mb(fn, tables: list) -> float:
+    """
+    Memory held by the results of fn on each table-wrap.
+    """
+    tracemalloc.start()
+    results = [fn(table) for table in tables]  # noqa: F841
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained / 1e6
+
+
+def read_styler(table_wrap: ET.Element):
+    return _text.read_table_record(table_wrap, label="Table", caption="").to_table()
+
+
+def read_record(table_wrap: ET.Element) -> _text.tableRecord:
+    return _text.read_table_record(table_wrap, label="Table", caption="")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=60)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    root = table_heavy_article(args.tables, args.rows)
+    eager, deferred = parse_eager(root), parse_deferred(root)
+    cases = [
+        ("parse", parse_eager, parse_deferred, root, root),
+        ("to_relational", relational_html, relational_records, eager, deferred),
+    ]
+
+    print(f"{'':>15} | {'previous':>10} {'records':>9} {'speedup':>7}")
+    for name, old_fn, new_fn, old_arg, new_arg in cases:
+        old_time = best_time(old_fn, old_arg, args.repeats)
+        new_time = best_time(new_fn, new_arg, args.repeats)
+        print(
+            f"{name:>15} | {old_time * 1000:>8.1f}ms {new_time * 1000:>7.1f}ms "
+            f"{old_time / new_time:>6.1f}x"
+        )
+    article_tables = list(ET.parse(TEST_XML).getroot().iter("table-wrap"))
+    clinical_tables = [clinical_table(args.rows) for _ in range(args.tables)]
+    read_styler(article_tables[0])  # first Styler loads pandas' templates
+    for name, tables in [("article", article_tables), ("clinical", clinical_tables)]:
+        old_mb = retained_mb(read_styler, tables)
+        new_mb = retained_mb(read_record, tables)
+        print(
+            f"{name + ' memory':>15} | {old_mb:>8.2f}MB {new_mb:>7.2f}MB "
+            f"{old_mb / new_mb:>6.1f}x"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark the "xpath" and "walk" engines of `_parse.generate_paper_dict`.
+
+The "xpath" engine runs one absolute XPath query per metadata field, each of
+which rescans the whole document. The "walk" engine walks the tree once. To
+show how this scales with paper size, the test paper's body and reference list
+are repeated to build larger papers.
+
+Usage:
+    python benchmarks/bench_tree_walk.py [--repeats 5] [--scales 1 10 50]
+"""
+
+import argparse
+import copy
+import os
+import time
+import warnings
+import lxml.etree as ET
+import scrapemed._parse as parse
+
+TEST_XML = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "scrapemed",
+    "tests",
+    "testdata",
+    "test.xml",
+)
+
+METADATA_FIELDS = [
+    parse.gather_title,
+    parse.gather_authors,
+    parse.gather_non_author_contributors,
+    parse.gather_journal_id,
+    parse.gather_journal_title,
+    parse.gather_issn,
+    parse.gather_publisher_name,
+    parse.gather_publisher_location,
+    parse.gather_article_id,
+    parse.gather_article_types,
+    parse.gather_article_categories,
+    parse.gather_published_date,
+    parse.gather_volume,
+    parse.gather_issue,
+    parse.gather_fpage,
+    parse.gather_lpage,
+    parse.gather_permissions,
+    parse.gather_funding,
+    parse.gather_footnote,
+    parse.gather_acknowledgements,
+    parse.gather_notes,
+    parse.gather_custom_metadata,
+]
+
+
+def scaled_paper(root: ET.Element, scale: int) -> ET.Element:
+    """
+    Repeat the body sections and reference list of a paper `scale` times.
+    """
+    root = copy.deepcopy(root)
+    for tag in ["body", "ref-list"]:
+        parent = root.find(f".//{tag}")
+        children = list(parent)
+        for _ in range(scale - 1):
+            parent.extend(copy.deepcopy(child) for child in children)
+    return root
+
+
+def metadata_xpath(root: ET.Element) -> None:
+    for gather in METADATA_FIELDS:
+        gather(root)
+
+
+def metadata_walk(root: ET.Element) -> None:
+    index = parse.index_paper_tree(root)
+    for gather in METADATA_FIELDS:
+        gather(root, index)
+
+
+def best_time(fn, root: ET.Element, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(root)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    base = ET.parse(TEST_XML).getroot()
+
+    print(
+        f"{'scale':>5} {'elements':>9} | {'metadata xpath':>14} "
+        f"{'walk':>8} {'speedup':>7} | {'paper_dict xpath':>16} {'walk':>8}"
+    )
+    for scale in args.scales:
+        root = scaled_paper(base, scale)
+        n_elements = sum(1 for _ in root.iter())
+        meta_xpath = best_time(metadata_xpath, root, args.repeats)
+        meta_walk = best_time(metadata_walk, root, args.repeats)
+        dict_xpath = best_time(
+            lambda r: parse.generate_paper_dict(0, r, engine="xpath"),
+            root,
+            args.repeats,
+        )
+        dict_walk = best_time(
+            lambda r: parse.generate_paper_dict(0, r, engine="walk"),
+            root,
+            args.repeats,
+        )
+        print(
+            f"{scale:>5} {n_elements:>9} | {meta_xpath * 1000:>12.2f}ms "
+            f"{meta_walk * 1000:>6.2f}ms {meta_xpath / meta_walk:>6.1f}x | "
+            f"{dict_xpath * 1000:>14.1f}ms {dict_walk * 1000:>6.1f}ms"
+        )
+
+    return None
+
+
+if __name__ == "__main__":
+    main()
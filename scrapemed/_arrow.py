@@ -0,0 +1,408 @@
+"""
+ScrapeMed's ``_arrow`` Module
+=============================
+
+Typed Apache Arrow and Parquet export of Papers, used by
+`paperSet.to_arrow` and `paperSet.to_parquet`.
+
+Unlike `Paper.to_relational`, nested values keep their structure: authors,
+citations, and article categories are lists of structs, identifiers and dates
+are maps, journal and publisher names are dictionary encoded, and tables are
+exported as a separate table of tables (one row per table, keyed by PMCID)
+rather than a list of dicts.
+
+Requires the optional `pyarrow` package.
+"""
+
+import datetime
+import pandas as pd
+from typing import Dict, Iterable, Iterator, List, Tuple
+from scrapemed.utils import pmcid_as_int, plain_str
+import scrapemed._parse as parse
+
+# pyarrow is an optional dependency, and slow to import, so it is only
+# imported on first use, by _require_pyarrow
+pa = None
+pq = None
+
+# number of papers per Arrow record batch / Parquet row group
+DEFAULT_ROW_GROUP_SIZE = 1000
+
+CITATION_FIELDS = [
+    "Title",
+    "Source",
+    "Year",
+    "Volume",
+    "FirstPage",
+    "LastPage",
+    "DOI",
+    "PMID",
+]
+
+
+# -------------------------------Schemas---------------------------------
+def _require_pyarrow() -> None:
+    """
+    Import pyarrow on first use. Raise an informative ImportError if pyarrow
+    is not installed.
+    """
+    global pa, pq
+    if pa is not None:
+        return None
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # optional dependency
+        raise ImportError(
+            "Arrow and Parquet export require the pyarrow package. "
+            "Install it via `pip install pyarrow`."
+        )
+    pa, pq = pyarrow, pyarrow.parquet
+    return None
+
+
+def paper_schema() -> "pa.Schema":
+    """
+    Arrow schema of exported papers, one row per Paper.
+
+    :return: The paper schema.
+    :rtype: pa.Schema
+    """
+    _require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    string_map = pa.map_(pa.string(), pa.string())
+    contributor = pa.struct(
+        [
+            ("Contributor_Type", pa.string()),
+            ("First_Name", pa.string()),
+            ("Last_Name", pa.string()),
+            ("Email_Address", pa.string()),
+            ("Affiliations", pa.list_(pa.string())),
+        ]
+    )
+    citation = pa.struct(
+        [("Authors", pa.list_(pa.string()))]
+        + [(field, pa.string()) for field in CITATION_FIELDS]
+        # citations only available as free text are kept whole
+        + [("Text", pa.string())]
+    )
+    figure = pa.struct(
+        [("Label", pa.string()), ("Caption", pa.string()), ("Link", pa.string())]
+    )
+    article_category = pa.struct(
+        [("Subject_Group_Type", pa.string()), ("Subject", pa.string())]
+    )
+    return pa.schema(
+        [
+            ("PMCID", pa.int64()),
+            ("Last_Updated", pa.date32()),
+            ("Title", pa.string()),
+            ("Authors", pa.list_(contributor)),
+            ("Non_Author_Contributors", pa.list_(contributor)),
+            ("Abstract", pa.string()),
+            ("Body", pa.string()),
+            ("Journal_ID", string_map),
+            ("Journal_Title", dict_string),
+            ("ISSN", string_map),
+            ("Publisher_Name", dict_string),
+            ("Publisher_Location", dict_string),
+            ("Article_ID", string_map),
+            ("Article_Types", pa.list_(pa.string())),
+            ("Article_Categories", pa.list_(article_category)),
+            ("Published_Date", pa.map_(pa.string(), pa.timestamp("s"))),
+            ("Volume", pa.string()),
+            ("Issue", pa.string()),
+            ("First_Page", pa.string()),
+            ("Last_Page", pa.string()),
+            ("Copyright", pa.string()),
+            ("License", dict_string),
+            ("Funding", pa.list_(pa.string())),
+            ("Footnote", pa.string()),
+            ("Acknowledgements", pa.list_(pa.string())),
+            ("Notes", pa.list_(pa.string())),
+            ("Custom_Meta", string_map),
+            ("Citations", pa.list_(citation)),
+            ("Figures", pa.list_(figure)),
+        ]
+    )
+
+
+def table_schema() -> "pa.Schema":
+    """
+    Arrow schema of exported tables, one row per table found in a Paper.
+
+    :return: The table schema.
+    :rtype: pa.Schema
+    """
+    _require_pyarrow()
+    return pa.schema(
+        [
+            ("PMCID", pa.int64()),
+            ("Table_Index", pa.int32()),
+            ("Label", pa.string()),
+            ("Caption", pa.string()),
+            ("Header", pa.list_(pa.list_(pa.string()))),
+            ("Rows", pa.list_(pa.list_(pa.string()))),
+        ]
+    )
+
+
+# -----------------------------End Schemas-------------------------------
+
+
+# ---------------------------Paper -> Records----------------------------
+def paper_record(paper) -> Dict:
+    """
+    Convert a Paper to a record (dict) matching `paper_schema`.
+
+    :param Paper paper: The Paper to convert.
+
+    :return: A record of the Paper's data.
+    :rtype: dict
+    """
+    month, day, year = paper.last_updated
+    return {
+        "PMCID": pmcid_as_int(paper.pmcid),
+        "Last_Updated": datetime.date(year, month, day),
+        "Title": plain_str(paper.title),
+        "Authors": _contributor_records(paper.authors),
+        "Non_Author_Contributors": _contributor_records(paper.non_author_contributors),
+        "Abstract": paper.abstract_as_str(),
+        "Body": paper.body_as_str(),
+        "Journal_ID": _as_map(paper.journal_id),
+        "Journal_Title": plain_str(paper.journal_title),
+        "ISSN": _as_map(paper.issn),
+        "Publisher_Name": plain_str(paper.publisher_name),
+        "Publisher_Location": plain_str(paper.publisher_location),
+        "Article_ID": _as_map(paper.article_id),
+        "Article_Types": _as_list(paper.article_types),
+        "Article_Categories": _article_category_records(paper.article_categories),
+        "Published_Date": (
+            [
+                (str(key), value)
+                for key, value in paper.published_date.items()
+                if isinstance(value, datetime.datetime)
+            ]
+            if isinstance(paper.published_date, dict)
+            else None
+        ),
+        "Volume": plain_str(paper.volume),
+        "Issue": plain_str(paper.issue),
+        "First_Page": plain_str(paper.fpage),
+        "Last_Page": plain_str(paper.lpage),
+        "Copyright": plain_str(paper.copyright),
+        "License": plain_str(paper.license),
+        "Funding": _as_list(paper.funding),
+        "Footnote": plain_str(paper.footnote),
+        "Acknowledgements": _as_list(paper.acknowledgements),
+        "Notes": _as_list(paper.notes),
+        "Custom_Meta": _as_map(paper.custom_meta),
+        "Citations": [_citation_record(citation) for citation in paper.citations or []],
+        "Figures": [
+            {key: plain_str(figure.get(key)) for key in ["Label", "Caption", "Link"]}
+            for figure in paper.figures or []
+            if isinstance(figure, dict)
+        ],
+    }
+
+
+def table_records(paper) -> List[Dict]:
+    """
+    Convert the tables of a Paper to records (dicts) matching `table_schema`.
+
+    :param Paper paper: The Paper whose tables to convert.
+
+    :return: One record per table, with the text of its header rows and rows,
+        written straight from `paper.table_records`.
+    :rtype: List[dict]
+    """
+    records = []
+    for i, record in enumerate(paper.table_records or []):
+        if record is None:
+            continue
+        records.append(
+            {
+                "PMCID": pmcid_as_int(paper.pmcid),
+                "Table_Index": i,
+                "Label": plain_str(record.label),
+                "Caption": plain_str(record.caption),
+                "Header": record.header,
+                "Rows": record.rows,
+            }
+        )
+    return records
+
+
+# -------------------------End Paper -> Records--------------------------
+
+
+# --------------------------Arrow and Parquet----------------------------
+def iter_record_batches(
+    papers: Iterable, row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> Iterator[Tuple["pa.RecordBatch", "pa.RecordBatch"]]:
+    """
+    Convert Papers to Arrow record batches, `row_group_size` Papers at a time.
+
+    :param Iterable[Paper] papers: Papers to convert. May be a generator, ie.
+        `paperSet.iter_from_pmcid_list`, so only one batch is held in memory.
+    :param int row_group_size: Number of Papers per batch.
+
+    :return: Generator of (paper batch, table batch) pairs.
+    :rtype: Iterator[Tuple[pa.RecordBatch, pa.RecordBatch]]
+    """
+    _require_pyarrow()
+    papers_schema, tables_schema = paper_schema(), table_schema()
+    paper_rows, table_rows = [], []
+    for paper in papers:
+        if not paper:
+            continue
+        paper_rows.append(paper_record(paper))
+        table_rows.extend(table_records(paper))
+        if len(paper_rows) >= row_group_size:
+            yield (
+                pa.RecordBatch.from_pylist(paper_rows, schema=papers_schema),
+                pa.RecordBatch.from_pylist(table_rows, schema=tables_schema),
+            )
+            paper_rows, table_rows = [], []
+    if paper_rows:
+        yield (
+            pa.RecordBatch.from_pylist(paper_rows, schema=papers_schema),
+            pa.RecordBatch.from_pylist(table_rows, schema=tables_schema),
+        )
+
+
+def to_arrow(
+    papers: Iterable, row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> Tuple["pa.Table", "pa.Table"]:
+    """
+    Convert Papers to typed Arrow tables.
+
+    :param Iterable[Paper] papers: Papers to convert.
+    :param int row_group_size: Number of Papers per record batch.
+
+    :return: A table of papers, and a table of the papers' tables.
+    :rtype: Tuple[pa.Table, pa.Table]
+    """
+    _require_pyarrow()
+    paper_batches, table_batches = [], []
+    for paper_batch, table_batch in iter_record_batches(papers, row_group_size):
+        paper_batches.append(paper_batch)
+        table_batches.append(table_batch)
+    return (
+        pa.Table.from_batches(paper_batches, schema=paper_schema()),
+        pa.Table.from_batches(table_batches, schema=table_schema()),
+    )
+
+
+def write_parquet(
+    papers: Iterable,
+    path: str,
+    tables_path: str = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Tuple[str, str]:
+    """
+    Write Papers to Parquet files, one row group per `row_group_size` Papers.
+
+    :param Iterable[Paper] papers: Papers to write. May be a generator, so
+        export is not limited by memory.
+    :param str path: Path of the papers Parquet file.
+    :param str tables_path: Path of the tables Parquet file. Default is None
+        (`path` with ".parquet" replaced by ".tables.parquet").
+    :param int row_group_size: Number of Papers per row group.
+
+    :return: The paths of the papers and tables Parquet files.
+    :rtype: Tuple[str, str]
+    """
+    _require_pyarrow()
+    path = str(path)
+    if tables_path is None:
+        tables_path = path.removesuffix(".parquet") + ".tables.parquet"
+
+    with pq.ParquetWriter(path, paper_schema()) as paper_writer, pq.ParquetWriter(
+        tables_path, table_schema()
+    ) as table_writer:
+        for paper_batch, table_batch in iter_record_batches(papers, row_group_size):
+            paper_writer.write_batch(paper_batch)
+            if table_batch.num_rows:
+                table_writer.write_batch(table_batch)
+
+    return path, str(tables_path)
+
+
+# ------------------------End Arrow and Parquet--------------------------
+
+
+# -------------------------------Helpers---------------------------------
+def _as_list(value) -> List[str]:
+    """
+    List of plain strings, wrapping a lone string and keeping None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [str(value)]
+    return [plain_str(item) for item in value]
+
+
+def _as_map(value) -> List[Tuple[str, str]]:
+    """
+    Map entries of a dict, as (key, value) string pairs. None if not a dict.
+    """
+    if not isinstance(value, dict):
+        return None
+    return [(str(key), plain_str(item)) for key, item in value.items()]
+
+
+def _contributor_records(contributors) -> List[Dict]:
+    """
+    Records of an authors (or non-author contributors) DataFrame. None if the
+    paper has none.
+    """
+    if not isinstance(contributors, pd.DataFrame):
+        return None
+    records = []
+    for contributor in contributors.to_dict("records"):
+        affiliations = contributor.get("Affiliations")
+        records.append(
+            {
+                "Contributor_Type": plain_str(contributor.get("Contributor_Type")),
+                "First_Name": plain_str(contributor.get("First_Name")),
+                "Last_Name": plain_str(contributor.get("Last_Name")),
+                "Email_Address": plain_str(contributor.get("Email_Address")),
+                "Affiliations": (
+                    _as_list(affiliations)
+                    if isinstance(affiliations, (list, str))
+                    else None
+                ),
+            }
+        )
+    return records
+
+
+def _article_category_records(categories) -> List[Dict]:
+    """
+    Records of a paper's (non-heading) article categories, a list of
+    {subj-group-type: subject} dicts. Empty if the paper has none beyond its
+    headings, None if it has no article categories at all.
+    """
+    if not isinstance(categories, list):
+        return [] if categories == parse.NO_ARTICLE_CATEGORIES else None
+    return [
+        {"Subject_Group_Type": plain_str(group_type), "Subject": plain_str(subject)}
+        for category in categories
+        for group_type, subject in category.items()
+    ]
+
+
+def _citation_record(citation) -> Dict:
+    """
+    Record of a parsed citation dict, or of a free text citation.
+    """
+    if not isinstance(citation, dict):
+        return {"Text": plain_str(citation)}
+    record = {field: plain_str(citation.get(field)) for field in CITATION_FIELDS}
+    record["Authors"] = _as_list(citation.get("Authors"))
+    return record
+
+
+# -----------------------------End Helpers-------------------------------
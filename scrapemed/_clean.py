@@ -13,7 +13,10 @@ Scrapemed module for markup language cleaning utilities.
 
 import warnings
 import re
-from scrapemed.utils import basicBiMap
+import functools
+import lxml.etree as ET
+from typing import Dict, List, Tuple
+from scrapemed.utils import basicBiMap, dataRef
 import scrapemed._morehtml as mhtml
 
 # monkeypatch warnings.formatwarning for cleaner warnings
@@ -22,6 +25,27 @@ warnings.formatwarning = (
 )
 
 
+# tags removed or replaced by _remove_text_styling
+STYLING_TAG_NAMES = [
+    "italic",
+    "i",
+    "bold",
+    "b",
+    "underline",
+    "u",
+    "sub",
+    "sup",
+    "ext-link",
+]
+# matches tags through to closing tag or self closing, should match any HTML or
+# XML tag (DOTALL used in case of multiline tag spans)
+XML_HTML_TAG_PATTERN = re.compile(
+    r"<([a-zA-Z][\w-]*)\b[^>]*>(.*?)</\1>|<([a-zA-Z][\w-]*)\b[^/>]*/?>", re.DOTALL
+)
+# matches name="value" attribute pairs in a serialized opening tag
+ATTRIBUTE_PATTERN = re.compile(r'([^\s=/>]+)\s*=\s*"([^"]*)"')
+
+
 class unexpectedTagWarning(Warning):
     """
     Warned when an unexpected tag enclosed in angle brackets is found.
@@ -30,7 +54,7 @@ class unexpectedTagWarning(Warning):
     pass
 
 
-def clean_xml_string(xml_string: str, strip_text_styling=True, verbose=False):
+def clean_xml_string(xml_string: str, strip_text_styling=True, verbose=False) -> str:
     """
     Clean an XML string.
 
@@ -47,6 +71,162 @@ def clean_xml_string(xml_string: str, strip_text_styling=True, verbose=False):
     return xml_string
 
 
+def clean_xml_tree(
+    root: ET.Element, strip_text_styling=True, verbose=False
+) -> ET.Element:
+    """
+    Clean a parsed XML tree in place.
+
+    Tree level alternative to `clean_xml_string`. Styling elements are stripped
+    with `lxml.etree.strip_tags`, so no string copies are made, and CDATA,
+    comments, and processing instructions are never rewritten.
+
+    :param ET.Element root: Root of the XML tree to be cleaned.
+    :param bool strip_text_styling: Whether to remove or replace HTML text styling tags.
+    :param bool verbose: Whether to print verbose output.
+
+    :return: The cleaned root, modified in place.
+    :rtype: ET.Element
+    """
+    if strip_text_styling:
+        TEXT_STYLING_CLEANER.clean_tree(root, verbose=verbose)
+    return root
+
+
+class styleCleaner:
+    """
+    Compiled remover of HTML text styling tags, configured once and reused.
+
+    All removals and replacements are made in a single regex pass with a
+    callback.
+
+    :param List[str] removals: A list of opening tags to be removed. Their
+        corresponding closing tags will also be removed. Tags will be removed
+        regardless of attributes (and case).
+    :param Dict[str, str] replaces: A dictionary of find, replace values. The find
+        values should be HTML opening tags. They will be matched regardless of
+        attributes. Their closing tags are removed.
+
+    Example:
+    ```
+    cleaner = styleCleaner(["<i>"], {"<sub>": "_"})
+    cleaner.clean("C<sub>4</sub> is <i>great</i>")  # Output: 'C_4 is great'
+    ```
+    """
+
+    def __init__(self, removals: List[str], replaces: Dict[str, str]):
+        """
+        Compile the cleaner for the given removals and replacements.
+
+        :param List[str] removals: Opening tags to be removed, along with their
+            closing tags.
+        :param Dict[str, str] replaces: Opening tags to be replaced, mapped to
+            their replacement. Their closing tags are removed.
+        """
+        self.removals = list(removals)
+        self.replaces = dict(replaces)
+
+        # tag names, ie. "<italic>" -> "italic"
+        self._removal_names = {tag[1:-1].lower() for tag in self.removals}
+        self._replacements = {tag[1:-1]: value for tag, value in self.replaces.items()}
+
+        # match opening or closing tags regardless of attributes or case, ie.
+        # /<\/?(italic|i|...)\b[^>]*>/i. Case is matched with character classes
+        # ([iI][tT]...), which scan much faster than re.IGNORECASE.
+        names = [tag[1:-1] for tag in self.removals + list(self.replaces)]
+        pattern = (
+            r"<(/?)("
+            + "|".join(_case_insensitive_pattern(name) for name in names)
+            + r")\b[^>]*>"
+        )
+        self._pattern = re.compile(pattern)
+
+        return None
+
+    def clean(self, text: str, verbose=False) -> str:
+        """
+        Remove and replace styling tags in the text.
+
+        :param str text: The text containing HTML stylings.
+        :param bool verbose: Whether to print verbose output.
+
+        :return: The text with styling tags removed or replaced.
+        :rtype: str
+        """
+        # REPORT REQUESTED BEHAVIOR AT RUNTIME
+        if verbose:
+            print(f"Removing the following tags:\n{self.removals}\n")
+            print("Making the following replacements:\n")
+            for find, replace in self.replaces.items():
+                print(f"{find} replaced with {replace}\n")
+
+        return self._pattern.sub(self._replace, text)
+
+    def clean_tree(self, root: ET.Element, verbose=False) -> ET.Element:
+        """
+        Remove and replace styling elements in a parsed tree, in place.
+
+        Matches `clean` on well-formed markup: removal elements are stripped
+        regardless of case, keeping their text and children; replacement
+        elements (case sensitive) are stripped after prepending their
+        replacement to their text.
+
+        :param ET.Element root: Root of the tree containing HTML stylings.
+        :param bool verbose: Whether to print verbose output.
+
+        :return: The root with styling elements removed or replaced.
+        :rtype: ET.Element
+        """
+        if verbose:
+            print(f"Removing the following tags:\n{self.removals}\n")
+            print("Making the following replacements:\n")
+            for find, replace in self.replaces.items():
+                print(f"{find} replaced with {replace}\n")
+
+        to_strip = set()
+        for element in root.iter(ET.Element):
+            tag = element.tag
+            if tag in self._replacements:
+                element.text = self._replacements[tag] + (element.text or "")
+                to_strip.add(tag)
+            elif tag.lower() in self._removal_names:
+                to_strip.add(tag)
+        if to_strip:
+            ET.strip_tags(root, *to_strip)
+        return root
+
+    def _replace(self, match: re.Match) -> str:
+        """
+        Callback deciding what a matched styling tag becomes.
+        """
+        closing, name = match.group(1, 2)
+        if closing:
+            return ""
+        # replacements are case sensitive, removals are not
+        if name in self._replacements:
+            return self._replacements[name]
+        if name.lower() in self._removal_names:
+            return ""
+        return match.group()
+
+
+def _case_insensitive_pattern(name: str) -> str:
+    """
+    Build a regex matching `name` regardless of case, ie. "sub" -> "[sS][uU][bB]".
+    """
+    return "".join(
+        f"[{char.lower()}{char.upper()}]" if char.isalpha() else re.escape(char)
+        for char in name
+    )
+
+
+# remove italic, bold, underline styling, and replace sub/sup/ext-link
+TEXT_STYLING_CLEANER = styleCleaner(
+    removals=["<italic>", "<i>", "<bold>", "<b>", "<underline>", "<u>"],
+    replaces={"<sub>": "_", "<sup>": "^", "<ext-link>": "[External URI:]"},
+)
+
+
 def _remove_text_styling(text: str, verbose=False) -> str:
     """
     Remove specified HTML stylings from the provided text.
@@ -60,26 +240,17 @@ def _remove_text_styling(text: str, verbose=False) -> str:
     styling tags from the input text. Additionally, it replaces <sub> with "_"
     and <sup> with "^". <ext-link> is replaced with "[External URI:]".
 
-    :param str text: The text containing HTML stylings to be removed or replaced.
-    :param list[str] removals: A list of opening tags to be removed. Their
-        corresponding closing tags will also be removed. Tags will be removed
-        regardless of attributes.
-    :param dict replaces: A dictionary of find, replace values. The find values
-        should be HTML opening tags. They will be matched regardless of attributes.
+    Uses the module-level, precompiled `TEXT_STYLING_CLEANER`.
+
+    :param str text: The text containing HTML stylings to be removed or
+        replaced.
     :param bool verbose: Whether to print verbose output.
 
-    :return: The XML string with default HTML text styling tags (`REMOVALS`, `REPLACES`)
-        removed or replaced.
+    :return: The XML string with default HTML text styling tags removed or
+        replaced.
     :rtype: str
     """
-
-    # remove italic, bold, underline styling
-    REMOVALS = ["<italic>", "<i>", "<bold>", "<b>", "<underline>", "<u>"]
-    REPLACES = {"<sub>": "_", "<sup>": "^", "<ext-link>": "[External URI:]"}
-
-    return _remove_html_styling(
-        text, removals=REMOVALS, replaces=REPLACES, verbose=verbose
-    )
+    return TEXT_STYLING_CLEANER.clean(text, verbose=verbose)
 
 
 def _remove_html_styling(
@@ -99,51 +270,23 @@ def _remove_html_styling(
     :return: The XML string with specified HTML text styling tags removed.
     :rtype: str
     """
+    cleaner = _get_style_cleaner(tuple(removals), tuple(replaces.items()))
+    return cleaner.clean(text, verbose=verbose)
 
-    # ADD IN CLOSING TAGS FOR REMOVAL TAGS
-    to_remove = removals.copy()
-    more_to_remove = []
-    for tag in to_remove:
-        more_to_remove.append(tag[0] + "/" + tag[1:])
-    to_remove.extend(more_to_remove)
-    # ADD IN CLOSING TAGS FOR REPLACEMENT TAGS
-    to_replace_basic = replaces.copy()
-    for tag in to_replace_basic.keys():
-        to_remove.append(tag[0] + "/" + tag[1:])
-
-    # MATCH REGARDLESS OF HTML ATTRIBUTES
-    # Sample of what removals should look like for tag matching
-    # regardless of attributes
-    # /<head\b[^>]*>/i
-    for i in range(len(to_remove)):
-        to_remove[i] = to_remove[i][0:-1] + "\\b[^>]*" + to_remove[i][-1]
-    to_replace = {}
-    for find, replace in to_replace_basic.items():
-        new_find = find[0:-1] + "\\b[^>]*" + find[-1]
-        to_replace[new_find] = replace
-
-    # REPORT REQUESTED BEHAVIOR AT RUNTIME
-    if verbose:
-        print(f"Removing the following tags:\n{to_remove}\n")
-        print("Making the following replacements:\n")
-        for find, replace in to_replace.items():
-            print(f"{find} replaced with {replace}\n")
-
-    # REMOVALS
-    removal_pattern = "|".join(to_remove)
-    r = re.compile(removal_pattern, re.IGNORECASE)
-    text = r.sub("", text)
-
-    # REPLACEMENTS
-    for find, replace in to_replace.items():
-        text = re.sub(find, replace, text)
-
-    # RETURN THE CLEANED TEXT
-    return text
+
+@functools.lru_cache(maxsize=None)
+def _get_style_cleaner(
+    removals: Tuple[str], replaces: Tuple[Tuple[str, str]]
+) -> styleCleaner:
+    """
+    Get a compiled styleCleaner, built once per distinct set of removals and
+    replacements.
+    """
+    return styleCleaner(list(removals), dict(replaces))
 
 
 def split_text_and_refs(
-    tree_text: str, ref_map: basicBiMap, id=None, on_unknown="keep"
+    tree_text: str, ref_map: basicBiMap, id=None, on_unknown="keep", root=None
 ):
     """
     Split HTML tags out of text.
@@ -159,15 +302,18 @@ def split_text_and_refs(
         HTML tags.
     :param ref_map: A BiMap containing keys connected to reference tag values. BiMap
         forward keys should be reference keys to place into the text in lieu of the
-        tag for later BiMap table lookup. BiMap forward values should be the
-        actual tags. The provided BiMap will be modified to reflect any new tag
-        values found, and keys will be appended as necessary.
+        tag for later BiMap table lookup. BiMap forward values are dataRef records
+        of the actual tags. The provided BiMap will be modified to reflect any new
+        tag values found, and keys will be appended as necessary.
     :type ref_map: basicBiMap
     :param id: Optionally provide an id for traceback of any issues.
     :type id: Any, optional
     :param str on_unknown: Behavior when encountering an unknown tag. Determines
         what happens to the tag contents.
         Default is 'keep'. Options: ['drop', 'keep']
+    :param ET.Element root: Optionally provide the element `tree_text` was
+        serialized from, so that dataRef records keep a handle to the
+        referenced elements.
 
     :return: A tuple containing the cleaned text and the updated BiMap.
     :rtype: Tuple[str, basicBiMap]
@@ -177,77 +323,111 @@ def split_text_and_refs(
     TABLEWRAP_TAG_NAME = "table-wrap"
     ALLOWED_TAG_NAMES = [XREF_TAG_NAME, FIGURE_TAG_NAME, TABLEWRAP_TAG_NAME]
 
-    # regex pattern string to match tags through to closing tag or self closing
-    # should match any HTML or XML tag
-    XML_HTML_TAG_PATTERN = (
-        r"<([a-zA-Z][\w-]*)\b[^>]*>(.*?)</\1>|<([a-zA-Z][\w-]*)\b[^/>]*/?>"
-    )
-    tag_r = re.compile(
-        XML_HTML_TAG_PATTERN, re.DOTALL
-    )  # DOTALL used in case of multiline tag spans
-
     text = tree_text.strip()
     text = _remove_text_styling(text)
-    cleaned_text = ""
-
-    while len(text) > 0:
-        match = tag_r.search(text)
-        if match:
-            # found a tag, append the text prior to the tag
-            # and deal w tag
-            # EAT NEXT TAG AND MATCH PARTS
-            tag_name = match.group(1)
-            tag_contents = match.group(2)
-            full_tag = match.group()
-
-            # ADD CONTENTS PRIOR TO TAG
-            tag_start_index = match.start()
-            cleaned_text += text[0:tag_start_index]
-
-            # UNKNOWN TAG PROCESSING, WARN AND PERFORM SPECIFIED BEHAVIOR
-            if tag_name not in ALLOWED_TAG_NAMES:
-                warning_msg = (
-                    f"Tag of type {tag_name} found in a text portion of "
-                    "the provided markup language. "
-                    "Expected only HTML styling tags, or tags from the "
-                    f"following list: {ALLOWED_TAG_NAMES}."
-                    f" Specified unknown tag behavior: {on_unknown}."
-                )
-                if id:
-                    warning_msg += (
-                        " Warning occured in a text section " f"with id: {id}."
-                    )
-                warnings.warn(warning_msg, unexpectedTagWarning)
-                if on_unknown == "keep":
-                    cleaned_text += tag_contents
-                # eat through the text that was just processed
-                text = text[match.end() :]
-
-            # KNOWN TAG PROCESSING, UPDATE DATA REF
-            else:
-                # add tag contents if it is an xref.
-                if tag_name == "xref":
-                    cleaned_text += tag_contents
-                # Get reference number for data reference
-                ref_num = None
-                if full_tag in ref_map.reverse:
-                    # have we generated a map for this tag before?
-                    ref_num = ref_map.reverse[full_tag]
-                else:
-                    ref_num = len(ref_map)  # new tag, append a new key
-                    ref_map[ref_num] = full_tag  # and fill in the tag value
-
-                data_ref_tag = mhtml.generate_typed_mhtml_tag(
-                    tag_type="dataref", string=str(ref_num)
-                )
-                cleaned_text += f"{data_ref_tag}"
-
-                # eat through the text that was just processed
-                text = text[match.end() :]
-
-        else:
-            # no more tags to deal with, add the last bits to our output text
-            cleaned_text += text
-            text = ""
-
-    return cleaned_text
+    ref_elements = _index_ref_elements(root, ALLOWED_TAG_NAMES)
+
+    # single pass over the tags in the text, collecting output pieces
+    cleaned_pieces = []
+    position = 0
+    for match in XML_HTML_TAG_PATTERN.finditer(text):
+        # found a tag, keep the text prior to the tag and deal w tag
+        tag_name = match.group(1)
+        tag_contents = match.group(2)
+        cleaned_pieces.append(text[position : match.start()])
+        position = match.end()
+
+        # UNKNOWN TAG PROCESSING, WARN AND PERFORM SPECIFIED BEHAVIOR
+        if tag_name not in ALLOWED_TAG_NAMES:
+            warning_msg = (
+                f"Tag of type {tag_name} found in a text portion of "
+                "the provided markup language. "
+                "Expected only HTML styling tags, or tags from the "
+                f"following list: {ALLOWED_TAG_NAMES}."
+                f" Specified unknown tag behavior: {on_unknown}."
+            )
+            if id:
+                warning_msg += " Warning occured in a text section " f"with id: {id}."
+            warnings.warn(warning_msg, unexpectedTagWarning)
+            if on_unknown == "keep":
+                cleaned_pieces.append(tag_contents)
+            continue
+
+        # KNOWN TAG PROCESSING, UPDATE DATA REF
+        # add tag contents if it is an xref.
+        if tag_name == XREF_TAG_NAME:
+            cleaned_pieces.append(tag_contents)
+        # Get reference number for data reference
+        data_ref = _data_ref_from_tag(
+            tag_name, match.group(), tag_contents, ref_elements
+        )
+        ref_num = ref_map.reverse.get(data_ref)
+        if ref_num is None:
+            ref_num = len(ref_map)  # new tag, append a new key
+            ref_map[ref_num] = data_ref  # and fill in the tag value
+
+        cleaned_pieces.append(
+            mhtml.generate_typed_mhtml_tag(tag_type="dataref", string=str(ref_num))
+        )
+
+    # no more tags to deal with, add the last bits to our output text
+    cleaned_pieces.append(text[position:])
+
+    return "".join(cleaned_pieces)
+
+
+def _index_ref_elements(
+    root: ET.Element, tag_names: List[str]
+) -> Dict[Tuple[str, str, str], List[ET.Element]]:
+    """
+    Index the reference elements under root by (tag, id, rid), in document
+    order, so tags matched in serialized text can be linked back to elements.
+
+    Elements containing text styling are left out, since their markup is
+    cleaned of styling before matching and no longer mirrors the element.
+
+    :param ET.Element root: The element the text was serialized from, or None.
+    :param List[str] tag_names: The reference tag names to index.
+
+    :return: Dict of (tag, id, rid) to the matching elements.
+    :rtype: Dict[Tuple[str, str, str], List[ET.Element]]
+    """
+    ref_elements = {}
+    if root is None:
+        return ref_elements
+    for element in root.iter(*tag_names):
+        if element is root or next(element.iter(*STYLING_TAG_NAMES), None) is not None:
+            continue
+        key = (element.tag, element.get("id"), element.get("rid"))
+        ref_elements.setdefault(key, []).append(element)
+    return ref_elements
+
+
+def _data_ref_from_tag(
+    tag_name: str,
+    full_tag: str,
+    tag_contents: str,
+    ref_elements: Dict[Tuple[str, str, str], List[ET.Element]],
+) -> dataRef:
+    """
+    Build a dataRef record from a tag matched in serialized text, linking it to
+    its element when one is indexed.
+
+    :param str tag_name: The name of the matched tag.
+    :param str full_tag: The full matched tag, including its contents.
+    :param str tag_contents: The inner contents of the matched tag.
+    :param dict ref_elements: Index of reference elements from
+        `_index_ref_elements`. Linked elements are consumed.
+
+    :return: The data reference record.
+    :rtype: dataRef
+    """
+    opening_tag = full_tag[len(tag_name) + 1 : full_tag.index(">")]
+    attrib = tuple(ATTRIBUTE_PATTERN.findall(opening_tag))
+    data_ref = dataRef(tag_name, attrib, tag_contents)
+
+    matches = ref_elements.get((tag_name, data_ref.get("id"), data_ref.get("rid")))
+    if matches:
+        data_ref.element = matches.pop(0)
+
+    return data_ref
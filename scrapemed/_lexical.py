@@ -0,0 +1,229 @@
+"""
+ScrapeMed's ``_lexical`` Module
+===============================
+
+In-process BM25 index of Paper text chunks, built next to the Chroma vector
+collection by `Paper.vectorize` and `paperSet.vectorize`, for lexical and
+hybrid (lexical + dense) retrieval, see `scrapemed._vector`.
+
+Exact biomedical terms, such as gene names and drug codes, are matched
+faster and more reliably lexically than by embedding similarity. To hold a
+whole paperSet, postings are kept in flat numpy arrays (compressed sparse
+rows, one row per term) rather than per-term Python lists: each posting
+costs 6 bytes, and each chunk 20, plus the vocabulary.
+"""
+
+import re
+import numpy as np
+from typing import List, Tuple
+from scrapemed.utils import pmcid_as_int
+
+# postings store term frequencies as uint16
+_MAX_FREQUENCY = np.iinfo(np.uint16).max
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercased words, the terms of the index.
+
+    :param str text: The text to tokenize.
+
+    :return: The words of the text, in order.
+    :rtype: List[str]
+    """
+    return _WORD.findall(text.lower())
+
+
+class bm25Index:
+    """
+    Okapi BM25 index of the text chunks of Papers.
+
+    Chunks are added a Paper at a time, and numbered in the order added.
+    Postings of added Papers are buffered, and merged into the term-sorted
+    posting arrays on the next search.
+
+    :param float k1: Term frequency saturation. Default is 1.5.
+    :param float b: Chunk length normalization. Default is 0.75.
+
+    :Example:
+
+    >>> index = bm25Index()
+    >>> index.add(paper.pmcid, chunks)
+    >>> index.search("CYP2C9 polymorphism", n_results=5)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty bm25Index.
+
+        :param float k1: Term frequency saturation. Default is 1.5.
+        :param float b: Chunk length normalization. Default is 0.75.
+        """
+        self.k1 = k1
+        self.b = b
+        # term -> term number
+        self.vocabulary = {}
+
+        # per chunk: the PMCID of its Paper, its index in the Paper, and its
+        # length in words
+        self.pmcids = np.zeros(0, dtype=np.int64)
+        self.chunk_indexes = np.zeros(0, dtype=np.int32)
+        self.lengths = np.zeros(0, dtype=np.int32)
+
+        # postings of term t are postings[indptr[t] : indptr[t + 1]], the
+        # chunks it occurs in (in order), with its frequencies in them
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.frequencies = np.zeros(0, dtype=np.uint16)
+
+        # (terms, chunks, frequencies, pmcids, chunk_indexes, lengths) arrays
+        # of each added Paper, not yet merged into the postings
+        self._pending = []
+        self._n_chunks = 0
+        # per chunk length normalization, k1 * (1 - b + b * length / average)
+        self._norms = np.zeros(0, dtype=np.float32)
+
+        return None
+
+    def __len__(self) -> int:
+        return self._n_chunks
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the index's arrays, in bytes (excluding the vocabulary).
+        """
+        self._merge()
+        return sum(
+            array.nbytes
+            for array in [
+                self.pmcids,
+                self.chunk_indexes,
+                self.lengths,
+                self.indptr,
+                self.postings,
+                self.frequencies,
+                self._norms,
+            ]
+        )
+
+    def add(self, pmcid, chunks: List[str]) -> None:
+        """
+        Add the text chunks of a Paper to the index.
+
+        :param pmcid: The PMCID of the Paper, stored as an integer.
+        :param List[str] chunks: The Paper's chunks, in order, ie. as returned
+            by `scrapemed._vector.chunk_paper`.
+
+        :return: None
+        """
+        vocabulary = self.vocabulary
+        terms, lengths = [], []
+        for chunk in chunks:
+            words = tokenize(chunk)
+            terms.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+            lengths.append(len(words))
+        lengths = np.array(lengths, dtype=np.int32)
+
+        # count each (chunk, term) pair, sorted by chunk
+        local = np.repeat(np.arange(len(chunks), dtype=np.int64), lengths)
+        keys, counts = np.unique(
+            (local << 32) | np.array(terms, dtype=np.int64), return_counts=True
+        )
+        self._pending.append(
+            (
+                (keys & 0xFFFFFFFF).astype(np.int32),
+                (keys >> 32).astype(np.int32) + self._n_chunks,
+                np.minimum(counts, _MAX_FREQUENCY).astype(np.uint16),
+                np.full(len(chunks), pmcid_as_int(pmcid), dtype=np.int64),
+                np.arange(len(chunks), dtype=np.int32),
+                lengths,
+            )
+        )
+        self._n_chunks += len(chunks)
+        return None
+
+    def search(
+        self, query: str, n_results: int = 5, pmcids: List[int] = None
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Find the chunks with the highest BM25 scores for a query.
+
+        :param str query: The query. Its words are matched exactly, ignoring
+            case.
+        :param int n_results: Maximum number of chunks to return. Default is 5.
+        :param List[int] pmcids: Only return chunks of these PMCIDs, in any
+            form, ie. 7067710 or "PMC7067710". Default is None, any Paper in
+            the index.
+
+        :return: The (pmcid, chunk index, score) of the matching chunks,
+            highest scoring first. Chunks sharing no words with the query are
+            not returned.
+        :rtype: List[Tuple[int, int, float]]
+        """
+        self._merge()
+        n_chunks = len(self.lengths)
+        scores = np.zeros(n_chunks, dtype=np.float32)
+        for term in {self.vocabulary.get(word) for word in tokenize(query)}:
+            if term is None:
+                continue
+            start, end = self.indptr[term], self.indptr[term + 1]
+            chunks = self.postings[start:end]
+            frequencies = self.frequencies[start:end].astype(np.float32)
+            idf = np.log1p((n_chunks - (end - start) + 0.5) / (end - start + 0.5))
+            # chunks are unique within a term's postings
+            scores[chunks] += (
+                idf * frequencies * (self.k1 + 1) / (frequencies + self._norms[chunks])
+            )
+        if pmcids is not None:
+            pmcids = np.array([pmcid_as_int(pmcid) for pmcid in pmcids], dtype=np.int64)
+            scores[~np.isin(self.pmcids, pmcids)] = 0
+
+        matches = np.flatnonzero(scores)
+        if n_results <= 0:
+            return []
+        if len(matches) > n_results:
+            matches = matches[np.argpartition(-scores[matches], n_results - 1)]
+            matches = np.sort(matches[:n_results])
+        # highest score first, ties in chunk order
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        return [
+            (int(self.pmcids[i]), int(self.chunk_indexes[i]), float(scores[i]))
+            for i in matches
+        ]
+
+    # --------------------------------Helpers--------------------------------
+    def _merge(self) -> None:
+        """
+        Merge the pending postings of added Papers into the posting arrays.
+        """
+        if not self._pending:
+            return None
+        terms, chunks, frequencies, pmcids, chunk_indexes, lengths = (
+            np.concatenate(arrays) for arrays in zip(*self._pending)
+        )
+        self._pending = []
+
+        # existing postings are in chunk order within each term, and precede
+        # the new chunks, so a stable sort by term keeps every row in order
+        n_terms = len(self.vocabulary)
+        old_terms = np.repeat(
+            np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr)
+        )
+        terms = np.concatenate([old_terms, terms])
+        order = np.argsort(terms, kind="stable")
+        self.postings = np.concatenate([self.postings, chunks])[order]
+        self.frequencies = np.concatenate([self.frequencies, frequencies])[order]
+        self.indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=n_terms), out=self.indptr[1:])
+
+        self.pmcids = np.concatenate([self.pmcids, pmcids])
+        self.chunk_indexes = np.concatenate([self.chunk_indexes, chunk_indexes])
+        self.lengths = np.concatenate([self.lengths, lengths])
+        average = max(self.lengths.mean(), 1) if len(self.lengths) else 1
+        self._norms = (self.k1 * (1 - self.b + self.b * self.lengths / average)).astype(
+            np.float32
+        )
+        return None
@@ -23,15 +23,18 @@ Middleman between the `scrape` module and the `paper` module for ScrapeMed.
         but not matched to an actual <table-wrap> tag.
     - :class:`unmatchedFigureWarning` - Warned when a figure reference is made
         but not matched to an actual <fig> tag.
+    - :class:`parseFailureWarning` - Warned when parsing a PMCID fails in a
+        worker process, and errors are suppressed.
 """
 
-import copy
 from typing import List, Dict, Tuple, Set
 from typing import Union
 import scrapemed.scrape as scrape
 import lxml.etree as ET
-from scrapemed.utils import basicBiMap, cleanerdoc
+from scrapemed.utils import basicBiMap, dataRef, cleanerdoc
 from scrapemed._text import TextParagraph, TextSection, TextTable, TextFigure
+from scrapemed._text import tableRecord, table_to_state, table_from_state
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import pandas as pd
 import warnings
@@ -87,6 +90,15 @@ class unmatchedFigureWarning(Warning):
     pass
 
 
+class parseFailureWarning(Warning):
+    """
+    Warned when parsing the XML of a PMCID fails in a worker process, and
+    errors are suppressed.
+    """
+
+    pass
+
+
 # -----------End Custom Warnings & Exceptions for Parsing------------
 
 
@@ -99,6 +111,10 @@ def paper_dict_from_pmc(
     verbose: bool = False,
     suppress_warnings: bool = False,
     suppress_errors: bool = False,
+    cache: scrape.xmlCache = None,
+    fields: List[str] = None,
+    strip_text_styling: bool = True,
+    strip_method: str = "regex",
 ) -> dict:
     """
     Wrapper that scrapes a PMC article specified by PMCID from the web,
@@ -119,6 +135,13 @@ def paper_dict_from_pmc(
         Recommended to suppress when parsing many XMLs at once.
     :param bool suppress_errors: Return None on failed XML parsing, instead of
         raising an error.
+    :param xmlCache cache: Optional on-disk cache to serve the XML from, and to
+        store a newly downloaded XML in.
+    :param List[str] fields: Fields to extract, see `generate_paper_dict`.
+    :param bool strip_text_styling: Whether or not to clean common HTML text
+        styling from the XML.
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `scrape.xml_tree_from_string`.
 
     :return: A dictionary containing useful values parsed from the PMC article.
     :rtype: dict
@@ -128,7 +151,14 @@ def paper_dict_from_pmc(
         print(f"Generating Paper object for PMCID = {pmcid}...")
     # DOWNLOAD XML TREE AND GET ROOT
     paper_tree = scrape.get_xml(
-        pmcid=pmcid, email=email, download=download, validate=validate, verbose=verbose
+        pmcid=pmcid,
+        email=email,
+        download=download,
+        validate=validate,
+        strip_text_styling=strip_text_styling,
+        verbose=verbose,
+        cache=cache,
+        strip_method=strip_method,
     )
     root = paper_tree.getroot()
 
@@ -138,6 +168,7 @@ def paper_dict_from_pmc(
         verbose=verbose,
         suppress_warnings=suppress_warnings,
         suppress_errors=suppress_errors,
+        fields=fields,
     )
 
 
@@ -147,6 +178,8 @@ def generate_paper_dict(
     verbose: bool = False,
     suppress_warnings: bool = False,
     suppress_errors: bool = False,
+    engine: str = "xpath",
+    fields: List[str] = None,
 ) -> dict:
     """
     Given the root of an XML tree, parse through it and generate
@@ -165,10 +198,21 @@ def generate_paper_dict(
         Recommended to suppress when parsing many XMLs at once.
     :param bool suppress_errors: Whether to suppress errors during parsing.
         If suppressed, None will be returned upon a failed parsing attempt.
+    :param str engine: How metadata is located in the tree. "xpath" runs one
+        XPath query per field, "walk" walks the tree once and dispatches
+        elements to each field (faster on large papers). Both produce the same
+        dictionary. Default is "xpath".
+    :param List[str] fields: Fields to extract, from `PAPER_DICT_FIELDS`, ie.
+        `METADATA_FIELDS` to skip text, table, citation, and figure parsing.
+        Only the collectors of the selected fields run, and other fields are
+        left out of the dictionary. Default is None (every field).
 
     :return: A flattened dictionary containing relevant PMC paper XML information.
     :rtype: dict or None if errors are suppressed and parsing fails.
     """
+    if engine not in PAPER_DICT_ENGINES:
+        raise ValueError(f"Unknown engine {engine}. Options: {PAPER_DICT_ENGINES}")
+    fields = resolve_fields(fields)
 
     paper_dict = None
 
@@ -177,11 +221,15 @@ def generate_paper_dict(
 
     if suppress_errors:
         try:
-            paper_dict = _actually_generate_paper_dict(pmcid, paper_root, verbose)
+            paper_dict = _actually_generate_paper_dict(
+                pmcid, paper_root, verbose, engine, fields
+            )
         except Exception as e:
             print(f"An exception occurred: {str(e)}")
     else:
-        paper_dict = _actually_generate_paper_dict(pmcid, paper_root, verbose)
+        paper_dict = _actually_generate_paper_dict(
+            pmcid, paper_root, verbose, engine, fields
+        )
 
     if suppress_warnings:
         warnings.simplefilter("default")
@@ -190,7 +238,11 @@ def generate_paper_dict(
 
 
 def _actually_generate_paper_dict(
-    pmcid: int, paper_root: ET.Element, verbose: bool = False
+    pmcid: int,
+    paper_root: ET.Element,
+    verbose: bool = False,
+    engine: str = "xpath",
+    fields: List[str] = None,
 ) -> dict:
     """
     Actual paper dictionary generation function.
@@ -202,51 +254,83 @@ def _actually_generate_paper_dict(
     :param int pmcid: Unique PMCID for the article being parsed.
     :param ET.Element paper_root: The root element of the PMC paper XML tree.
     :param bool verbose: Whether or not to have verbose output for debugging.
+    :param str engine: "xpath" or "walk", see `generate_paper_dict`.
+    :param List[str] fields: Fields to extract, see `generate_paper_dict`.
 
     :return: A dictionary containing relevant PMC paper XML information.
     :rtype: dict
     """
+    fields = resolve_fields(fields)
+    with_ref_map = any(field in fields for field in REF_MAP_FIELDS)
+
     root = paper_root
+    index = index_paper_tree(root) if engine == "walk" else None
+    # ONE @id INDEX SHARED BY ALL XREF AND AFFILIATION LOOKUPS
+    ids = None
+    if with_ref_map or "Authors" in fields or "Non-Author Contributors" in fields:
+        ids = index_ids(root)
     # KEEP TRACK OF XREFS, TABLES, FIGURES IN BIMAP
     # (THIS WILL BE UPDATED DURING TEXT RETRIEVAL
     # WHEN HTML REF TAGS ARE SPLIT OUT)
     ref_map = basicBiMap()
 
-    # STORE EXTRACTED INFO IN PAPER DICT
-    paper_dict = {
-        "PMCID": pmcid,
-        "Title": gather_title(root),
-        "Authors": gather_authors(root),
-        "Non-Author Contributors": gather_non_author_contributors(root),
-        "Abstract": gather_abstract(root, ref_map),
-        "Body": gather_body(root, ref_map),
-        "Journal ID": gather_journal_id(root),
-        "Journal Title": gather_journal_title(root),
-        "ISSN": gather_issn(root),
-        "Publisher Name": gather_publisher_name(root),
-        "Publisher Location": gather_publisher_location(root),
-        "Article ID": gather_article_id(root),
-        "Article Types": gather_article_types(root),
-        "Article Categories": gather_article_categories(root),
-        "Published Date": gather_published_date(root),
-        "Volume": gather_volume(root),
-        "Issue": gather_issue(root),
-        "First Page": gather_fpage(root),
-        "Last Page": gather_lpage(root),
-        "Permissions": gather_permissions(root),
-        "Funding": gather_funding(root),
-        "Footnote": gather_footnote(root),
-        "Acknowledgements": gather_acknowledgements(root),
-        "Notes": gather_notes(root),
-        "Custom Meta": gather_custom_metadata(root),
-        "Ref Map With Tags": copy.deepcopy(ref_map),
-        "Ref Map": _clean_ref_map(paper_root=root, ref_map=ref_map),
+    # ONLY RUN THE COLLECTORS OF THE SELECTED FIELDS
+    collectors = {
+        "Title": lambda: gather_title(root, index),
+        "Authors": lambda: gather_authors(root, index, ids),
+        "Non-Author Contributors": lambda: gather_non_author_contributors(
+            root, index, ids
+        ),
+        "Abstract": lambda: gather_abstract(root, ref_map, index),
+        "Body": lambda: gather_body(root, ref_map, index),
+        "Journal ID": lambda: gather_journal_id(root, index),
+        "Journal Title": lambda: gather_journal_title(root, index),
+        "ISSN": lambda: gather_issn(root, index),
+        "Publisher Name": lambda: gather_publisher_name(root, index),
+        "Publisher Location": lambda: gather_publisher_location(root, index),
+        "Article ID": lambda: gather_article_id(root, index),
+        "Article Types": lambda: gather_article_types(root, index),
+        "Article Categories": lambda: gather_article_categories(root, index),
+        "Published Date": lambda: gather_published_date(root, index),
+        "Volume": lambda: gather_volume(root, index),
+        "Issue": lambda: gather_issue(root, index),
+        "First Page": lambda: gather_fpage(root, index),
+        "Last Page": lambda: gather_lpage(root, index),
+        "Permissions": lambda: gather_permissions(root, index),
+        "Funding": lambda: gather_funding(root, index),
+        "Footnote": lambda: gather_footnote(root, index),
+        "Acknowledgements": lambda: gather_acknowledgements(root, index),
+        "Notes": lambda: gather_notes(root, index),
+        "Custom Meta": lambda: gather_custom_metadata(root, index),
     }
 
-    citations, tables, figures = _split_citations_tables_figs(paper_dict["Ref Map"])
-    paper_dict["Citations"] = citations
-    paper_dict["Tables"] = tables
-    paper_dict["Figures"] = figures
+    # STORE EXTRACTED INFO IN PAPER DICT
+    paper_dict = {"PMCID": pmcid}
+    for field, collector in collectors.items():
+        if field in fields:
+            paper_dict[field] = collector()
+        elif field in ["Abstract", "Body"] and with_ref_map:
+            # the reference map is filled in while parsing text
+            collector()
+
+    if with_ref_map:
+        cleaned_ref_map = _clean_ref_map(paper_root=root, ref_map=ref_map, ids=ids)
+        citations, tables, figures = _split_citations_tables_figs(cleaned_ref_map)
+        ref_fields = {
+            # the serialized tags, as strings, rendered from the records
+            "Ref Map With Tags": (
+                basicBiMap({key: str(ref) for key, ref in ref_map.items()})
+                if "Ref Map With Tags" in fields
+                else None
+            ),
+            "Ref Map": cleaned_ref_map,
+            "Citations": citations,
+            "Tables": tables,
+            "Figures": figures,
+        }
+        for field in REF_MAP_FIELDS:
+            if field in fields:
+                paper_dict[field] = ref_fields[field]
 
     if verbose:
         print(
@@ -259,6 +343,406 @@ def _actually_generate_paper_dict(
     return paper_dict
 
 
+# -------------------------PARALLEL PARSING-----------------------------------
+def paper_dict_from_xml_bytes(
+    pmcid: int,
+    xml_bytes: bytes,
+    validate: bool = True,
+    strip_text_styling: bool = True,
+    verbose: bool = False,
+    suppress_warnings: bool = False,
+    engine: str = "xpath",
+    fields: List[str] = None,
+    strip_method: str = "regex",
+) -> dict:
+    """
+    Parse the raw XML of a PMC article into a picklable paper dictionary.
+
+    Top level so that it can run in worker processes: raw XML bytes are
+    shipped in, and a dictionary without lxml elements or pandas Stylers is
+    shipped back. Restore it with `from_picklable_paper_dict`.
+
+    :param int pmcid: Unique PMCID for the article being parsed.
+    :param bytes xml_bytes: XML of a <pmc-articleset> holding the article.
+    :param bool validate: Whether or not to validate the XML against the
+        NLM articleset 2.0 DTD.
+    :param bool strip_text_styling: Whether or not to clean common HTML text
+        styling from the XML.
+    :param bool verbose: Whether or not to have verbose output for debugging.
+    :param bool suppress_warnings: Whether to suppress warnings while parsing XML.
+    :param str engine: "xpath" or "walk", see `generate_paper_dict`.
+    :param List[str] fields: Fields to extract, see `generate_paper_dict`.
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `scrape.xml_tree_from_string`.
+
+    :return: A picklable dictionary of relevant PMC paper XML information.
+    :rtype: dict
+    """
+    tree = scrape._tree_from_xml_string(
+        pmcid, xml_bytes, validate, strip_text_styling, verbose, strip_method
+    )
+    paper_dict = generate_paper_dict(
+        pmcid,
+        tree.getroot(),
+        verbose=verbose,
+        suppress_warnings=suppress_warnings,
+        suppress_errors=False,
+        engine=engine,
+        fields=fields,
+    )
+    return to_picklable_paper_dict(paper_dict)
+
+
+def paper_dicts_from_xml_bytes(
+    pmcids: List[int],
+    xmls: List[bytes],
+    workers: int = None,
+    validate: bool = True,
+    strip_text_styling: bool = True,
+    verbose: bool = False,
+    suppress_warnings: bool = False,
+    suppress_errors: bool = False,
+    engine: str = "xpath",
+    fields: List[str] = None,
+    strip_method: str = "regex",
+) -> List[dict]:
+    """
+    Parse raw PMC XMLs into paper dictionaries across a pool of processes.
+
+    Order is preserved. A PMCID whose XML is None, or whose parsing fails
+    while errors are suppressed, gets None in place of its dictionary (failures
+    are warned per PMCID via `parseFailureWarning`).
+
+    :param List[int] pmcids: PMCIDs of the articles being parsed.
+    :param List[bytes] xmls: XML of a <pmc-articleset> per PMCID, or None.
+    :param int workers: Number of worker processes. Default is None (one per
+        CPU).
+    :param bool validate: Whether or not to validate the XMLs.
+    :param bool strip_text_styling: Whether or not to clean common HTML text
+        styling from the XMLs.
+    :param bool verbose: Whether or not to have verbose output for debugging.
+    :param bool suppress_warnings: Whether to suppress warnings while parsing XML.
+    :param bool suppress_errors: Whether to return None for failed parsing,
+        instead of raising the worker's error.
+    :param str engine: "xpath" or "walk", see `generate_paper_dict`.
+    :param List[str] fields: Fields to extract, see `generate_paper_dict`.
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `scrape.xml_tree_from_string`.
+
+    :return: List of paper dictionaries (or None), one per PMCID.
+    :rtype: List[dict]
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                paper_dict_from_xml_bytes,
+                pmcid,
+                xml_bytes,
+                validate,
+                strip_text_styling,
+                verbose,
+                suppress_warnings,
+                engine,
+                fields,
+                strip_method,
+            )
+            if xml_bytes is not None
+            else None
+            for pmcid, xml_bytes in zip(pmcids, xmls)
+        ]
+
+        paper_dicts = []
+        for pmcid, future in zip(pmcids, futures):
+            if future is None:
+                paper_dicts.append(None)
+                continue
+            try:
+                paper_dicts.append(from_picklable_paper_dict(future.result()))
+            except Exception as e:
+                if not suppress_errors:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+                warnings.warn(
+                    f"Parsing PMCID {pmcid} failed: {e!r}", parseFailureWarning
+                )
+                paper_dicts.append(None)
+
+    return paper_dicts
+
+
+def to_picklable_paper_dict(paper_dict: dict) -> dict:
+    """
+    Make a paper dictionary picklable. Text elements drop their lxml roots
+    when pickled, and parsed tables are compact tableRecords, which pickle as
+    they are. Styled tables (ie. in paper dictionaries built by hand) are
+    stored as their data and caption.
+
+    :param dict paper_dict: A paper dictionary, from `generate_paper_dict`.
+
+    :return: A shallow copy of the dictionary, safe to pickle.
+    :rtype: dict
+    """
+    if paper_dict is None:
+        return None
+    paper_dict = dict(paper_dict)
+    if "Tables" in paper_dict:
+        paper_dict["Tables"] = [table_to_state(table) for table in paper_dict["Tables"]]
+    return paper_dict
+
+
+def from_picklable_paper_dict(paper_dict: dict) -> dict:
+    """
+    Inverse of `to_picklable_paper_dict`.
+
+    :param dict paper_dict: A dictionary from `to_picklable_paper_dict`.
+
+    :return: The paper dictionary, with styled tables restored.
+    :rtype: dict
+    """
+    if paper_dict is None:
+        return None
+    paper_dict = dict(paper_dict)
+    if "Tables" in paper_dict:
+        paper_dict["Tables"] = [
+            table_from_state(table) for table in paper_dict["Tables"]
+        ]
+    return paper_dict
+
+
+# -----------------------END PARALLEL PARSING---------------------------------
+
+
+# ------------------------SINGLE PASS TREE WALK-------------------------------
+PAPER_DICT_ENGINES = ["xpath", "walk"]
+
+# Tag -> (query, required ancestor tags, nearest first) for each of the
+# queries made by the gather_* functions, so that a single walk of the tree
+# can answer all of them. Queries ending in /text() collect text nodes.
+_TREE_WALK_QUERIES = {
+    "article-title": [("//article-title/text()", ())],
+    "abstract": [("//abstract", ())],
+    "body": [("//body", ())],
+    "journal-id": [("//journal-meta/journal-id", ("journal-meta",))],
+    "journal-title": [("//journal-title", ())],
+    "issn": [("//journal-meta/issn", ("journal-meta",))],
+    "publisher-name": [
+        ("//journal-meta/publisher/publisher-name", ("publisher", "journal-meta"))
+    ],
+    "publisher-loc": [
+        ("//journal-meta/publisher/publisher-loc", ("publisher", "journal-meta"))
+    ],
+    "article-id": [("//article-meta/article-id", ("article-meta",))],
+    "article-categories": [("//article-meta/article-categories", ("article-meta",))],
+    "pub-date": [("//article-meta/pub-date", ("article-meta",))],
+    "volume": [("//article-meta/volume/text()", ("article-meta",))],
+    "issue": [("//article-meta/issue/text()", ("article-meta",))],
+    "fpage": [("//article-meta/fpage/text()", ("article-meta",))],
+    "lpage": [("//article-meta/lpage/text()", ("article-meta",))],
+    "copyright-statement": [
+        (
+            "//article-meta/permissions/copyright-statement/text()",
+            ("permissions", "article-meta"),
+        )
+    ],
+    "license": [
+        ("//article-meta/permissions/license", ("permissions", "article-meta"))
+    ],
+    "funding-group": [("//article-meta/funding-group", ("article-meta",))],
+    "fn": [("//back/fn-group/fn", ("fn-group", "back"))],
+    "ack": [("//ack", ())],
+    "notes": [("//notes", ())],
+    "custom-meta": [("//custom-meta", ())],
+}
+AUTHOR_QUERY = ".//contrib[@contrib-type='author']"
+NON_AUTHOR_QUERY = ".//contrib[not(@contrib-type='author')]"
+
+
+def index_paper_tree(root: ET.Element) -> Dict[str, list]:
+    """
+    Walk a PMC XML tree once, dispatching each element of interest to the
+    XPath queries made by the gather_* functions.
+
+    The returned index holds, for each query, the same matches (in document
+    order) that running the query against `root` would return. Pass it as
+    `index` to the gather_* functions to avoid one full scan of the document
+    per field.
+
+    :param ET.Element root: The root element of the PMC paper XML tree.
+
+    :return: Dict of XPath query to the list of matching elements (or text
+        nodes, for /text() queries).
+    :rtype: Dict[str, list]
+    """
+    index = {
+        query: [] for entries in _TREE_WALK_QUERIES.values() for query, _ in entries
+    }
+    index[AUTHOR_QUERY] = []
+    index[NON_AUTHOR_QUERY] = []
+
+    for element in root.iter("contrib", *_TREE_WALK_QUERIES.keys()):
+        if element.tag == "contrib":
+            if element.get("contrib-type") == "author":
+                index[AUTHOR_QUERY].append(element)
+            else:
+                index[NON_AUTHOR_QUERY].append(element)
+            continue
+
+        for query, ancestors in _TREE_WALK_QUERIES[element.tag]:
+            if not _has_ancestors(element, ancestors):
+                continue
+            if query.endswith("/text()"):
+                index[query].extend(_text_nodes(element))
+            else:
+                index[query].append(element)
+
+    return index
+
+
+def index_ids(root: ET.Element) -> Dict[str, List[ET.Element]]:
+    """
+    Index every element of a PMC XML tree with an @id attribute by its id.
+
+    Built once per document, so that resolving xrefs (citations, tables,
+    figures) and contributor affiliations is a dict lookup rather than a
+    search of the whole document per reference.
+
+    :param ET.Element root: The root element of the PMC paper XML tree.
+
+    :return: Dict of id to the elements with that id, in document order.
+    :rtype: Dict[str, List[ET.Element]]
+    """
+    ids = {}
+    for element in root.iter(tag=ET.Element):
+        element_id = element.get("id")
+        if element_id is not None:
+            ids.setdefault(element_id, []).append(element)
+
+    return ids
+
+
+def _find_by_id(
+    ids: Dict[str, List[ET.Element]],
+    element_id: str,
+    tag: str,
+    parent_tag: str = None,
+) -> List[ET.Element]:
+    """
+    Look up the elements with a given id and tag (and optionally parent tag)
+    in an @id index, as the XPath //parent_tag/tag[@id='element_id'] would.
+    """
+    return [
+        element
+        for element in ids.get(element_id, [])
+        if element.tag == tag
+        and (parent_tag is None or _has_ancestors(element, (parent_tag,)))
+    ]
+
+
+def _find(root: ET.Element, index: Dict[str, list], query: str) -> list:
+    """
+    Run an XPath query against the tree, or look up its matches in a
+    single-pass index of the tree (see `index_paper_tree`), if provided.
+    """
+    if index is not None and query in index:
+        return index[query]
+    return root.xpath(query)
+
+
+def _has_ancestors(element: ET.Element, ancestors: Tuple[str]) -> bool:
+    """
+    Check that an element's nearest ancestors have the given tags, nearest first.
+    """
+    for tag in ancestors:
+        element = element.getparent()
+        if element is None or element.tag != tag:
+            return False
+    return True
+
+
+def _text_nodes(element: ET.Element) -> List[str]:
+    """
+    Get the text nodes directly under an element, as XPath's text() would.
+    """
+    nodes = [element.text] + [child.tail for child in element]
+    return [node for node in nodes if node]
+
+
+# ----------------------END SINGLE PASS TREE WALK-----------------------------
+
+
+# ----------------------SELECTIVE FIELD EXTRACTION----------------------------
+# Every field of a paper dictionary, in order. PMCID is always included.
+PAPER_DICT_FIELDS = [
+    "PMCID",
+    "Title",
+    "Authors",
+    "Non-Author Contributors",
+    "Abstract",
+    "Body",
+    "Journal ID",
+    "Journal Title",
+    "ISSN",
+    "Publisher Name",
+    "Publisher Location",
+    "Article ID",
+    "Article Types",
+    "Article Categories",
+    "Published Date",
+    "Volume",
+    "Issue",
+    "First Page",
+    "Last Page",
+    "Permissions",
+    "Funding",
+    "Footnote",
+    "Acknowledgements",
+    "Notes",
+    "Custom Meta",
+    "Ref Map With Tags",
+    "Ref Map",
+    "Citations",
+    "Tables",
+    "Figures",
+]
+# Fields built from the reference map, which is only filled in while parsing
+# the abstract and body text. Any of them requires parsing the text, and all
+# of them are built together.
+REF_MAP_FIELDS = ["Ref Map With Tags", "Ref Map", "Citations", "Tables", "Figures"]
+# Fields which need no text, table, citation, or figure parsing. Use for
+# metadata-only harvesting.
+METADATA_FIELDS = [
+    field
+    for field in PAPER_DICT_FIELDS
+    if field not in ["Abstract", "Body"] + REF_MAP_FIELDS
+]
+# Article Categories of a paper with none besides its heading categories
+NO_ARTICLE_CATEGORIES = (
+    "No extra article categories found. "
+    "Check paper.article_types for header categories."
+)
+
+
+def resolve_fields(fields: List[str] = None) -> List[str]:
+    """
+    Validate a selection of paper dictionary fields.
+
+    :param List[str] fields: Fields to extract, from `PAPER_DICT_FIELDS`.
+        None selects every field.
+
+    :return: The selected fields, in paper dictionary order, including PMCID.
+    :rtype: List[str]
+    """
+    if fields is None:
+        return list(PAPER_DICT_FIELDS)
+    unknown = [field for field in fields if field not in PAPER_DICT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}. Options: {PAPER_DICT_FIELDS}")
+    return [field for field in PAPER_DICT_FIELDS if field == "PMCID" or field in fields]
+
+
+# --------------------END SELECTIVE FIELD EXTRACTION--------------------------
+
+
 def define_data_dict() -> dict:
     """
     Returns a static definition of each of the elements
@@ -346,6 +830,11 @@ def define_data_dict() -> dict:
             """Dict of custom metadata key, value pairs
             provided with the article."""
         ),
+        "Ref Map With Tags": cleanerdoc(
+            """Dict of Index, Tag value pairs. The raw markup (str) of each
+            data reference pulled out of the text, before cleaning. See
+            Ref Map for the cleaned references."""
+        ),
         "Ref Map": cleanerdoc(
             """Dict of Index, Reference value pairs. Use p.ref_map to decode
             data references within TextSection.text_with_refs text. ie. When
@@ -360,16 +849,18 @@ def define_data_dict() -> dict:
     return data_dict
 
 
-def gather_title(root: ET.Element) -> str:
+def gather_title(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract the title of a PMC paper from its XML root.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: The title of the PMC paper.
     :rtype: str
     """
-    matches = root.xpath("//article-title/text()")
+    matches = _find(root, index, "//article-title/text()")
     if len(matches) > 1:
         warnings.warn(
             (
@@ -389,7 +880,9 @@ def gather_title(root: ET.Element) -> str:
 
 
 def _get_contributor_tuples(
-    root: ET.Element, contributors: List[ET.Element]
+    root: ET.Element,
+    contributors: List[ET.Element],
+    ids: Dict[str, List[ET.Element]] = None,
 ) -> List[Tuple]:
     """
     Helper function to retrieve tuples of contributor information.
@@ -397,11 +890,16 @@ def _get_contributor_tuples(
     :param ET.Element root: The root of the XML tree to search.
     :param List[ET.Element] contributors: A list of lxml Element objects
         containing contributor information.
+    :param Dict[str, List[ET.Element]] ids: Optional @id index of the tree, from
+        `index_ids`. Built on the fly if not provided.
 
     :return: A list of tuples representing contributor information in the form
         (contrib_type, first_name, last_name, address, affiliations).
     :rtype: List[Tuple]
     """
+    if ids is None:
+        ids = index_ids(root)
+
     contributor_tuples = []
     for contributor in contributors:
         contrib_type = contributor.get("contrib-type").capitalize()
@@ -420,9 +918,8 @@ def _get_contributor_tuples(
         aff_paths = contributor.xpath(".//xref[@ref-type='aff']")
         for aff in aff_paths:
             aff_id = aff.get("rid")
-            aff_texts = root.xpath(
-                (f"//contrib-group/aff[@id='{aff_id}']" "/text()[not(parent::label)]")
-            )
+            aff_matches = _find_by_id(ids, aff_id, "aff", parent_tag="contrib-group")
+            aff_texts = [text for match in aff_matches for text in _text_nodes(match)]
             if len(aff_texts) > 1:
                 warnings.warn(
                     (
@@ -434,12 +931,12 @@ def _get_contributor_tuples(
             if len(aff_texts) == 0:
                 aff_texts = ["Affiliation data not found."]
 
-            institutions = root.xpath(
-                (
-                    f"//contrib-group/aff[@id='{aff_id}']"
-                    "/institution-wrap/institution/text()"
-                )
-            )
+            institutions = [
+                text
+                for match in aff_matches
+                for institution in match.iterfind("institution-wrap/institution")
+                for text in _text_nodes(institution)
+            ]
             institutions = " ".join([str(inst) for inst in institutions])
 
             # Generate affiliation text
@@ -456,11 +953,19 @@ def _get_contributor_tuples(
     return contributor_tuples
 
 
-def gather_authors(root: ET.Element) -> pd.DataFrame:
+def gather_authors(
+    root: ET.Element,
+    index: Dict[str, list] = None,
+    ids: Dict[str, List[ET.Element]] = None,
+) -> pd.DataFrame:
     """
     Extract authors, their emails, and affiliations from a PMC XML.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
+    :param Dict[str, List[ET.Element]] ids: Optional @id index of the tree, from
+        `index_ids`. Built on the fly if not provided.
 
     :return: A DataFrame containing author information with columns:
              - Contributor_Type: Type of contributor (e.g., 'author').
@@ -470,7 +975,7 @@ def gather_authors(root: ET.Element) -> pd.DataFrame:
              - Affiliations: Affiliations of the author.
     :rtype: pd.DataFrame
     """
-    authors = root.xpath(".//contrib[@contrib-type='author']")
+    authors = _find(root, index, ".//contrib[@contrib-type='author']")
     if len(authors) == 0:
         warnings.warn(
             "Warning! Authors could not be matched", unexpectedZeroMatchWarning
@@ -478,7 +983,7 @@ def gather_authors(root: ET.Element) -> pd.DataFrame:
         return None
 
     # Extract the first and last names of the authors and store them in a list
-    author_tuples = _get_contributor_tuples(root=root, contributors=authors)
+    author_tuples = _get_contributor_tuples(root=root, contributors=authors, ids=ids)
 
     authors_df = pd.DataFrame(author_tuples)
     authors_df.columns = [
@@ -492,11 +997,19 @@ def gather_authors(root: ET.Element) -> pd.DataFrame:
     return authors_df
 
 
-def gather_non_author_contributors(root: ET.Element) -> Union[str, pd.DataFrame]:
+def gather_non_author_contributors(
+    root: ET.Element,
+    index: Dict[str, list] = None,
+    ids: Dict[str, List[ET.Element]] = None,
+) -> Union[str, pd.DataFrame]:
     """
     Extract non-author contributors from a PMC XML.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
+    :param Dict[str, List[ET.Element]] ids: Optional @id index of the tree, from
+        `index_ids`. Built on the fly if not provided.
 
     :return: Either a string indicating that no non-author contributors were found,
              or a DataFrame containing contributor information with columns:
@@ -510,10 +1023,12 @@ def gather_non_author_contributors(root: ET.Element) -> Union[str, pd.DataFrame]
 
     return_val = "No non-author contributors were found after parsing this paper."
 
-    non_author_contributors = root.xpath(".//contrib[not(@contrib-type='author')]")
+    non_author_contributors = _find(
+        root, index, ".//contrib[not(@contrib-type='author')]"
+    )
     if len(non_author_contributors) > 0:
         non_author_tuples = _get_contributor_tuples(
-            root=root, contributors=non_author_contributors
+            root=root, contributors=non_author_contributors, ids=ids
         )
         non_authors_df = pd.DataFrame(non_author_tuples)
         non_authors_df.columns = [
@@ -529,7 +1044,7 @@ def gather_non_author_contributors(root: ET.Element) -> Union[str, pd.DataFrame]
 
 
 def gather_abstract(
-    root: ET.Element, ref_map: basicBiMap
+    root: ET.Element, ref_map: basicBiMap, index: Dict[str, list] = None
 ) -> List[Union[TextSection, TextParagraph]]:
     """
     Extract all abstract text sections from an XML document and return them as
@@ -538,6 +1053,8 @@ def gather_abstract(
     :param ET.Element root: The root element of the PMC paper XML tree.
     :param basicBiMap ref_map: A reference map used for decoding data references
         within the text.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of TextSections and/or TextParagraphs representing the abstract
              text sections in the XML.
@@ -546,7 +1063,7 @@ def gather_abstract(
     abstract = []
 
     # get abstract subtree from XML
-    matches = root.xpath("//abstract")
+    matches = _find(root, index, "//abstract")
     if len(matches) > 1:
         warnings.warn(
             (
@@ -579,7 +1096,7 @@ def gather_abstract(
 
 
 def gather_body(
-    root: ET.Element, ref_map: basicBiMap
+    root: ET.Element, ref_map: basicBiMap, index: Dict[str, list] = None
 ) -> List[Union[TextSection, TextParagraph]]:
     """
     Extract all body text sections from an XML document and return them as
@@ -588,6 +1105,8 @@ def gather_body(
     :param ET.Element root: The root element of the PMC paper XML tree.
     :param basicBiMap ref_map: A reference map used for decoding data references
         within the text.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of TextSections and/or TextParagraphs representing the body
              text sections in the XML.
@@ -596,7 +1115,7 @@ def gather_body(
     body = []
 
     # get abstract subtree from XML
-    matches = root.xpath("//body")
+    matches = _find(root, index, "//body")
     if len(matches) > 1:
         warnings.warn(
             (
@@ -634,17 +1153,19 @@ def gather_body(
     return body
 
 
-def gather_journal_id(root: ET.Element) -> dict:
+def gather_journal_id(root: ET.Element, index: Dict[str, list] = None) -> dict:
     """
     Extract Journal IDs from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A dictionary containing Journal IDs with the ID type as keys and
              corresponding values as the ID values.
     :rtype: dict
     """
-    journal_ids = root.xpath("//journal-meta/journal-id")
+    journal_ids = _find(root, index, "//journal-meta/journal-id")
     id_dict = {
         journal_id.get("journal-id-type"): journal_id.text for journal_id in journal_ids
     }
@@ -652,11 +1173,15 @@ def gather_journal_id(root: ET.Element) -> dict:
     return id_dict
 
 
-def gather_journal_title(root: ET.Element) -> Union[List[str], str]:
+def gather_journal_title(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Union[List[str], str]:
     """
     Extract Journal Title(s) from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: Either a string representing the Journal Title if there's only one,
              a list of strings representing multiple Journal Titles if there are
@@ -665,7 +1190,7 @@ def gather_journal_title(root: ET.Element) -> Union[List[str], str]:
     """
     return_val = None
     titles = []
-    title_matches = root.xpath("//journal-title")
+    title_matches = _find(root, index, "//journal-title")
     for title in title_matches:
         titles.append(title.text)
     # might have multiple journals & journal titles
@@ -679,27 +1204,33 @@ def gather_journal_title(root: ET.Element) -> Union[List[str], str]:
     return return_val
 
 
-def gather_issn(root: ET.Element) -> dict:
+def gather_issn(root: ET.Element, index: Dict[str, list] = None) -> dict:
     """
     Extract ISSN values from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A dictionary containing ISSN values with the publication type
              as keys and corresponding values as the ISSN numbers.
     :rtype: dict
     """
-    issns = root.xpath("//journal-meta/issn")
+    issns = _find(root, index, "//journal-meta/issn")
     issn_dict = {issn.get("pub-type"): issn.text for issn in issns}
 
     return issn_dict
 
 
-def gather_publisher_name(root: ET.Element) -> Union[str, List[str]]:
+def gather_publisher_name(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Union[str, List[str]]:
     """
     Extract Publisher Name(s) from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: Either a string representing the Publisher Name if there's only one,
              or a list of strings representing multiple Publisher Names if there are
@@ -707,7 +1238,7 @@ def gather_publisher_name(root: ET.Element) -> Union[str, List[str]]:
     :rtype: Union[str, List[str]]
     """
     publisher_name_or_names = None
-    publishers = root.xpath("//journal-meta/publisher/publisher-name")
+    publishers = _find(root, index, "//journal-meta/publisher/publisher-name")
     if len(publishers) == 1:
         publisher_name_or_names = publishers[0].text
     else:
@@ -715,11 +1246,15 @@ def gather_publisher_name(root: ET.Element) -> Union[str, List[str]]:
     return publisher_name_or_names
 
 
-def gather_publisher_location(root: ET.Element) -> Union[str, List[str]]:
+def gather_publisher_location(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Union[str, List[str]]:
     """
     Extract Publisher Location(s) from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: Either a string representing the Publisher Location if there's
             only one, or a list of strings representing multiple Publisher
@@ -727,7 +1262,7 @@ def gather_publisher_location(root: ET.Element) -> Union[str, List[str]]:
     :rtype: Union[str, List[str]]
     """
     publisher_loc_or_locs = None
-    publisher_locs = root.xpath("//journal-meta/publisher/publisher-loc")
+    publisher_locs = _find(root, index, "//journal-meta/publisher/publisher-loc")
     if len(publisher_locs) == 1:
         publisher_loc_or_locs = publisher_locs[0].text
     else:
@@ -735,11 +1270,17 @@ def gather_publisher_location(root: ET.Element) -> Union[str, List[str]]:
     return publisher_loc_or_locs
 
 
-def gather_article_id(root: ET.Element) -> Dict[str, str]:
+def gather_article_id(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Dict[str, str]:
     """
     Gather Article IDs from PMC XML.
+
+    :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
     """
-    article_ids = root.xpath("//article-meta/article-id")
+    article_ids = _find(root, index, "//article-meta/article-id")
     id_dict = {
         article_id.get("pub-id-type"): article_id.text for article_id in article_ids
     }
@@ -747,18 +1288,20 @@ def gather_article_id(root: ET.Element) -> Dict[str, str]:
     return id_dict
 
 
-def gather_article_types(root: ET.Element) -> List[str]:
+def gather_article_types(root: ET.Element, index: Dict[str, list] = None) -> List[str]:
     """
     Extract Article Types from a PMC XML document.
 
     Article Types are article-categories marked by the subj-group-type 'heading'.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of strings representing the Article Types found in the XML.
     :rtype: List[str]
     """
-    matches = root.xpath("//article-meta/article-categories")
+    matches = _find(root, index, "//article-meta/article-categories")
     if len(matches) > 1:
         warnings.warn(
             (
@@ -786,7 +1329,9 @@ def gather_article_types(root: ET.Element) -> List[str]:
     return heading_cats
 
 
-def gather_article_categories(root: ET.Element) -> List[str]:
+def gather_article_categories(
+    root: ET.Element, index: Dict[str, list] = None
+) -> List[str]:
     """
     Extract Other Article Categories from a PMC XML document.
 
@@ -794,13 +1339,15 @@ def gather_article_categories(root: ET.Element) -> List[str]:
     in the subj-group-type attribute.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of dictionaries containing other article categories with
              the subj-group-type as keys and corresponding category values as
              values.
     :rtype: List[Dict[str, str]]
     """
-    matches = root.xpath("//article-meta/article-categories")
+    matches = _find(root, index, "//article-meta/article-categories")
     if len(matches) > 1:
         warnings.warn(
             (
@@ -822,14 +1369,13 @@ def gather_article_categories(root: ET.Element) -> List[str]:
     ]
 
     if not other_cats:
-        other_cats = (
-            "No extra article categories found. "
-            "Check paper.article_types for header categories."
-        )
+        other_cats = NO_ARTICLE_CATEGORIES
     return other_cats
 
 
-def gather_published_date(root: ET.Element) -> Dict[str, datetime]:
+def gather_published_date(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Dict[str, datetime]:
     """
     Extract Publishing Dates from a PMC XML document.
 
@@ -837,6 +1383,8 @@ def gather_published_date(root: ET.Element) -> Dict[str, datetime]:
     dates from the article metadata.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A dictionary containing publishing dates with the publication type
              as keys and corresponding datetime values as values.
@@ -845,7 +1393,7 @@ def gather_published_date(root: ET.Element) -> Dict[str, datetime]:
     # TODO: update for multi-publishing (need to find an example first)
 
     pdate_dict = {}
-    matches = root.xpath("//article-meta/pub-date")
+    matches = _find(root, index, "//article-meta/pub-date")
     for match in matches:
         pub_type = match.get("pub-type")
 
@@ -879,11 +1427,13 @@ def gather_published_date(root: ET.Element) -> Dict[str, datetime]:
     return pdate_dict
 
 
-def gather_volume(root: ET.Element) -> str:
+def gather_volume(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract the Volume # of the Parent Publication from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A string representing the Volume # of the parent publication,
              or None if no Volume # is found.
@@ -891,7 +1441,7 @@ def gather_volume(root: ET.Element) -> str:
     """
     # TODO: update for multi-publishing (need to find an example first)
 
-    matches = root.xpath("//article-meta/volume/text()")
+    matches = _find(root, index, "//article-meta/volume/text()")
     volume = None
     if len(matches) == 0:
         warnings.warn("No Volume # found for Publication.", unexpectedZeroMatchWarning)
@@ -901,11 +1451,13 @@ def gather_volume(root: ET.Element) -> str:
     return volume
 
 
-def gather_issue(root: ET.Element) -> str:
+def gather_issue(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract the Issue # of the Parent Publication from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A string representing the Issue # of the parent publication,
              or None if no Issue # is found.
@@ -913,7 +1465,7 @@ def gather_issue(root: ET.Element) -> str:
     """
     # TODO: update for multi-publishing (need to find an example first)
 
-    matches = root.xpath("//article-meta/issue/text()")
+    matches = _find(root, index, "//article-meta/issue/text()")
     issue = None
     if len(matches) == 0:
         warnings.warn("No Issue # found for Publication.", unexpectedZeroMatchWarning)
@@ -923,12 +1475,14 @@ def gather_issue(root: ET.Element) -> str:
     return issue
 
 
-def gather_fpage(root: ET.Element) -> str:
+def gather_fpage(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract the First Page Number of this article in its parent publication
     from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A string representing the First Page Number of the article
              in its parent publication, or None if no First Page # is found.
@@ -936,7 +1490,7 @@ def gather_fpage(root: ET.Element) -> str:
     """
     # TODO: update for multi-publishing (need to find an example first)
 
-    matches = root.xpath("//article-meta/fpage/text()")
+    matches = _find(root, index, "//article-meta/fpage/text()")
     fpage = None
     if len(matches) == 0:
         warnings.warn(
@@ -948,12 +1502,14 @@ def gather_fpage(root: ET.Element) -> str:
     return fpage
 
 
-def gather_lpage(root: ET.Element) -> str:
+def gather_lpage(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract the Last Page Number of this article in its parent publication
     from a PMC XML document.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A string representing the Last Page Number of the article
              in its parent publication, or None if no Last Page # is found.
@@ -961,7 +1517,7 @@ def gather_lpage(root: ET.Element) -> str:
     """
     # TODO: update for multi-publishing (need to find an example first)
 
-    matches = root.xpath("//article-meta/lpage/text()")
+    matches = _find(root, index, "//article-meta/lpage/text()")
     lpage = None
     if len(matches) == 0:
         warnings.warn(
@@ -973,7 +1529,9 @@ def gather_lpage(root: ET.Element) -> str:
     return lpage
 
 
-def gather_permissions(root: ET.Element) -> Dict[str, str]:
+def gather_permissions(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Dict[str, str]:
     """
     Extract permissions information from a PMC XML document.
 
@@ -981,6 +1539,8 @@ def gather_permissions(root: ET.Element) -> Dict[str, str]:
     text from the article metadata.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A dictionary containing the following keys:
              - "Copyright Statement": A string representing the copyright statement.
@@ -988,8 +1548,8 @@ def gather_permissions(root: ET.Element) -> Dict[str, str]:
              - "License Text": A string containing the license text.
     :rtype: Dict[str, str]
     """
-    copyright_statement_matches = root.xpath(
-        "//article-meta/permissions/copyright-statement/text()"
+    copyright_statement_matches = _find(
+        root, index, "//article-meta/permissions/copyright-statement/text()"
     )
     copyright_statement = "No copyright statement found."
     if len(copyright_statement_matches) == 0:
@@ -1002,7 +1562,7 @@ def gather_permissions(root: ET.Element) -> Dict[str, str]:
     else:
         copyright_statement = copyright_statement_matches[0]
 
-    license_matches = root.xpath("//article-meta/permissions/license")
+    license_matches = _find(root, index, "//article-meta/permissions/license")
     if len(license_matches) == 0:
         warnings.warn("No license found.", unexpectedZeroMatchWarning)
         return None
@@ -1036,7 +1596,7 @@ def gather_permissions(root: ET.Element) -> Dict[str, str]:
     return permissions_dict
 
 
-def gather_funding(root: ET.Element) -> List[str]:
+def gather_funding(root: ET.Element, index: Dict[str, list] = None) -> List[str]:
     """
     Extract funding information from a PMC XML document.
 
@@ -1044,12 +1604,14 @@ def gather_funding(root: ET.Element) -> List[str]:
     article metadata.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of strings representing funding institutions, or None if
              no funding information is found.
     :rtype: List[str] or None
     """
-    matches = root.xpath("//article-meta/funding-group")
+    matches = _find(root, index, "//article-meta/funding-group")
     funding_institutions = []
     for match in matches:
         institutions = match.xpath("award-group/funding-source/institution/text()")
@@ -1060,7 +1622,7 @@ def gather_funding(root: ET.Element) -> List[str]:
     return funding_institutions
 
 
-def gather_footnote(root: ET.Element) -> str:
+def gather_footnote(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract footnote information from a PMC XML document.
 
@@ -1068,12 +1630,14 @@ def gather_footnote(root: ET.Element) -> str:
     back matter.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A string containing the concatenated footnotes, or None if no
              footnotes are found.
     :rtype: str or None
     """
-    matches = root.xpath("//back/fn-group/fn")
+    matches = _find(root, index, "//back/fn-group/fn")
     footnote = ""
     for fn in matches:
         for child in fn:
@@ -1096,7 +1660,9 @@ def gather_footnote(root: ET.Element) -> str:
     return footnote
 
 
-def gather_acknowledgements(root: ET.Element) -> Union[List[str], str]:
+def gather_acknowledgements(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Union[List[str], str]:
     """
     Extract acknowledgements information from a PMC XML document.
 
@@ -1104,31 +1670,35 @@ def gather_acknowledgements(root: ET.Element) -> Union[List[str], str]:
     XML tree.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of strings representing acknowledgements, or a string
              indicating that no acknowledgements were found.
     :rtype: Union[List[str], str]
     """
-    matches = root.xpath("//ack")
+    matches = _find(root, index, "//ack")
     acknowledgements = [" ".join(match.itertext()).strip() for match in matches]
 
     return acknowledgements
 
 
-def gather_notes(root: ET.Element) -> str:
+def gather_notes(root: ET.Element, index: Dict[str, list] = None) -> str:
     """
     Extract notes information from a PMC XML document.
 
     This function retrieves a list of notes found in the article's XML tree.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A list of strings representing notes, or an empty list if no notes
              are found.
     :rtype: List[str]
     """
     notes = []
-    matches = root.xpath("//notes")
+    matches = _find(root, index, "//notes")
     notes = [
         stringify_note(note) for note in matches if not note.getparent().tag == "notes"
     ]
@@ -1165,7 +1735,9 @@ def stringify_note(root: ET.Element) -> str:
 # def _get_note(note_root: ET.Element) ->
 
 
-def gather_custom_metadata(root: ET.Element) -> Dict[str, str]:
+def gather_custom_metadata(
+    root: ET.Element, index: Dict[str, list] = None
+) -> Dict[str, str]:
     """
     Extract custom metadata key-value pairs from a PMC XML document.
 
@@ -1173,13 +1745,15 @@ def gather_custom_metadata(root: ET.Element) -> Dict[str, str]:
     article's XML tree. Custom metadata consists of user-defined key-value pairs.
 
     :param ET.Element root: The root element of the PMC paper XML tree.
+    :param Dict[str, list] index: Optional single-pass index of the tree, from
+        `index_paper_tree`. Used in place of XPath queries when provided.
 
     :return: A dictionary containing custom metadata key-value pairs, or None if
              no custom metadata is found.
     :rtype: Dict[str, str] or None
     """
     custom = {}
-    matches = root.xpath("//custom-meta")
+    matches = _find(root, index, "//custom-meta")
     for custom_meta in matches:
         meta_name = custom_meta.find("meta-name")
         if meta_name is not None:
@@ -1238,7 +1812,7 @@ def _parse_citation(
     # If failed, try to find full citation in mixed-citation format-----------
     mixed_citation = None
     if len(author_matches) == 0:
-        mixed_citation = root.xpath("//mixed-citation/text()")
+        mixed_citation = root.xpath(".//mixed-citation/text()")
         if len(mixed_citation) > 0:
             return str(mixed_citation[0])
     # ------------------------------------------------------------------------
@@ -1321,18 +1895,36 @@ def _find_key_of_xpath(ref_map: basicBiMap, xpath_query: str) -> int:
     :rtype: int or None
     """
 
-    ref_map = copy.deepcopy(ref_map)
     # Iterate through the dictionary and find the key with matching value
     matching_key = None
     for key, value in ref_map.items():
-        if len(ET.fromstring(value).xpath(xpath_query)) > 0:
+        if len(_data_ref_element(value).xpath(xpath_query)) > 0:
             matching_key = key
             break
 
     return matching_key
 
 
-def _clean_ref_map(paper_root: ET.Element, ref_map: basicBiMap) -> basicBiMap:
+def _data_ref_element(data_ref: Union[dataRef, str]) -> ET.Element:
+    """
+    Get the element behind a ref map value, parsing its markup only when the
+    record has no element handle (ie. after unpickling).
+
+    :param Union[dataRef, str] data_ref: A ref map value.
+
+    :return: The referenced element.
+    :rtype: ET.Element
+    """
+    if isinstance(data_ref, dataRef) and data_ref.element is not None:
+        return data_ref.element
+    return ET.fromstring(str(data_ref))
+
+
+def _clean_ref_map(
+    paper_root: ET.Element,
+    ref_map: basicBiMap,
+    ids: Dict[str, List[ET.Element]] = None,
+) -> basicBiMap:
     """
     Process a reference map (ref_map) by replacing various types of references with
     their corresponding information, such as citations, tables, and figures.
@@ -1346,15 +1938,20 @@ def _clean_ref_map(paper_root: ET.Element, ref_map: basicBiMap) -> basicBiMap:
     :param ET.Element paper_root: The root element of the paper's XML.
     :param basicBiMap ref_map: A bidirectional map containing keys and associated
         values that represent different types of references.
+    :param Dict[str, List[ET.Element]] ids: Optional @id index of the paper, from
+        `index_ids`, used to resolve xrefs. Built on the fly if not provided.
 
     :return: A cleaned reference map with references replaced by their respective
         information.
     :rtype: basicBiMap
     """
+    if ids is None:
+        ids = index_ids(paper_root)
+
     cleaned_ref_map = {}
 
     for key, item in ref_map.items():
-        root = ET.fromstring(item)
+        root = _data_ref_element(item)
 
         # -------XREFS LINK TO ACTUAL ITEMS OR FILL WITH BIBR--------------
         # process xrefs to citations, tables, and figures
@@ -1371,10 +1968,8 @@ def _clean_ref_map(paper_root: ET.Element, ref_map: basicBiMap) -> basicBiMap:
                     )
                     continue
 
-                # XPath expression to find the <ref>
-                # element based on the reference ID
-                matching_citation_expr = f"//ref[@id='{ref_id}']"
-                matches = paper_root.xpath(matching_citation_expr)
+                # find the <ref> element based on the reference ID
+                matches = _find_by_id(ids, ref_id, "ref")
                 if len(matches) == 0:
                     warnings.warn(
                         (
@@ -1406,8 +2001,7 @@ def _clean_ref_map(paper_root: ET.Element, ref_map: basicBiMap) -> basicBiMap:
                     )
                     continue
 
-                table_xpath = f"//table-wrap[@id='{table_id}']"
-                matches = paper_root.xpath(table_xpath)
+                matches = _find_by_id(ids, table_id, "table-wrap")
                 if len(matches) == 0:
                     warnings.warn(
                         (f"Table xref with rid={table_id} not " "matched in the XML!"),
@@ -1436,8 +2030,7 @@ def _clean_ref_map(paper_root: ET.Element, ref_map: basicBiMap) -> basicBiMap:
                     )
                     continue
 
-                fig_xpath = f"//fig[@id='{fig_id}']"
-                matches = paper_root.xpath(fig_xpath)
+                matches = _find_by_id(ids, fig_id, "fig")
                 if len(matches) == 0:
                     warnings.warn(
                         (f"Figure xref with rid={fig_id} not matched " "in the XML!"),
@@ -1527,9 +2120,9 @@ def _get_ref_type(value):
     return ref_type
 
 
-def _get_unique_tables(table_list: List[pd.DataFrame]) -> List[dict]:
+def _get_unique_tables(table_list: List[tableRecord]) -> List[tableRecord]:
     """
-    TODO: Given a set of tables (pd.DataFrame or Stylers), return a unique set.
+    TODO: Given a set of tables (tableRecords), return a unique set.
     """
     return table_list
 
@@ -1554,7 +2147,7 @@ def _split_citations_tables_figs(
     ref_map: basicBiMap,
 ) -> Tuple[
     Set[Union[Dict[str, Union[List[str], str]], str]],
-    Set[pd.DataFrame],
+    Set[tableRecord],
     Set[Dict[str, str]],
 ]:
     """
@@ -1562,15 +2155,15 @@ def _split_citations_tables_figs(
 
     This function iterates through the reference map and categorizes each reference
     based on its type (citation, table, or figure). It returns three sets containing
-    citations (as dictionaries or strings), tables (as pandas DataFrames),
-    and figures (as dictionaries).
+    citations (as dictionaries or strings), tables (as compact tableRecords,
+    turned into dataframes by `Paper.tables`), and figures (as dictionaries).
 
     :param ref_map: The reference map to be split into citations, tables, and figures.
     :type ref_map: basicBiMap
 
     :return: A tuple containing three sets:
         - The first set contains citations, each represented as a dictionary or string.
-        - The second set contains tables, each as a pandas DataFrame.
+        - The second set contains tables, each as a tableRecord.
         - The third set contains figures, each represented as a dictionary.
     :rtype: tuple
     """
@@ -1581,7 +2174,7 @@ def _split_citations_tables_figs(
         if _get_ref_type(ref) == "citation":
             citations.append(ref)
         elif _get_ref_type(ref) == "table":
-            tables.append(ref.df)
+            tables.append(ref.record)
         elif _get_ref_type(ref) == "fig":
             figures.append(ref.fig_dict)
         else:
@@ -31,7 +31,11 @@ from scrapemed.utils import basicBiMap
 import scrapemed._morehtml as mhtml
 from itertools import chain
 import warnings
+import sys
+import re
 import pandas as pd
+from pandas.io.parsers import TextParser
+from typing import List, NamedTuple, Tuple
 
 
 # -------------------------------Warnings----------------------------
@@ -111,6 +115,14 @@ class TextElement:
         self.parent = parent
         self.ref_map = ref_map
 
+    def __getstate__(self):
+        """
+        Pickle without the root element, since lxml elements can't be pickled.
+        """
+        state = self.__dict__.copy()
+        state["root"] = None
+        return state
+
     # ------------------Getters and Setters for shared BiMap-------------------
     def get_ref_map(self) -> basicBiMap:
         """
@@ -189,6 +201,7 @@ class TextParagraph(TextElement):
             ref_map=self.get_ref_map(),
             id=self.id,
             on_unknown="keep",
+            root=self.root,
         )
         self.text = mhtml.remove_mhtml_tags(
             self.text_with_refs
@@ -385,8 +398,9 @@ class TextTable(TextElement):
     """
     Initialize and process a table-wrap found in a text element of PMC XML.
 
-    Uses pandas' `read_html` function (which relies on lxml and falls
-    back to html5lib) to process the HTML tables into dataframes.
+    Tables are read straight from the lxml tree into a compact `tableRecord`
+    of their cell text (see `read_table_record`), and only turned into
+    dataframes, as pandas' `read_html` function would, on access to `.df`.
 
     Adds labels and captions if notated in the XML under
     //table-wrap/label and //table-wrap/caption/p tags.
@@ -397,7 +411,10 @@ class TextTable(TextElement):
         in the text.
 
     Attributes:
-        - df (pandas.DataFrame): The dataframe representation of the table.
+        - record (tableRecord): The label, caption, and cell text of the table,
+            or None if the table could not be read.
+        - df (pandas.DataFrame): The dataframe representation of the table,
+            styled with its label and caption. Built from `record` on access.
     """
 
     def __init__(
@@ -406,8 +423,8 @@ class TextTable(TextElement):
         """
         Initialize and process table-wrap found in a text element of PMC XML.
 
-        Use pandas' read_html function (which relies on lxml and falls
-        back to html5lib) to process the HTML tables into dataframes.
+        Tables are read straight from the lxml tree into a compact
+        `tableRecord`, see `read_table_record`.
 
         Adds labels and captions if notated in the XML under
         //table-wrap/label and //table-wrap/caption/p tags.
@@ -432,9 +449,8 @@ class TextTable(TextElement):
         if len(caption_matches) > 0:
             caption = caption_matches[0].text
 
-        table_xml_str = ET.tostring(table_root)
         try:
-            table_df = pd.read_html(table_xml_str)[0]
+            self.record = read_table_record(table_root, label=label, caption=caption)
         except ValueError:
             warnings.warn(
                 (
@@ -443,24 +459,28 @@ class TextTable(TextElement):
                 ),
                 readHTMLFailure,
             )
-            self.df = None
-            return None
-
-        # build title for styled df, if relevant
-        title = None
-        if label and caption:
-            title = f"{label}: {caption}"
-        elif label:
-            title = label
-        elif caption:
-            title = caption
+            self.record = None
+        self._df = None
 
-        if title:
-            table_df = table_df.style.set_caption(title)
+        return None
 
-        self.df = table_df
+    @property
+    def df(self):
+        """
+        The table as a dataframe, styled with its label and caption if it has
+        either. Built from `.record` on first access.
+        """
+        if self._df is None and self.record is not None:
+            self._df = self.record.to_table()
+        return self._df
 
-        return None
+    def __getstate__(self):
+        """
+        Pickle without the root element, or the dataframe built from `.record`.
+        """
+        state = super().__getstate__()
+        state["_df"] = None
+        return state
 
     def __str__(self):
         """
@@ -575,6 +595,360 @@ class TextFigure(TextElement):
 
 
 # ---------------------------------Helpers---------------------------------
+# Options pd.read_html passes to pandas' TextParser, by default
+READ_HTML_PARSER_OPTIONS = {
+    "index_col": None,
+    "skiprows": 0,
+    "parse_dates": False,
+    "thousands": ",",
+    "decimal": ".",
+    "converters": None,
+    "na_values": None,
+    "keep_default_na": True,
+}
+# Whitespace collapsed in cell text, as by pd.read_html
+_CELL_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+
+
+class tableRecord(NamedTuple):
+    """
+    Compact record of a table parsed from PMC XML: its label, caption, and the
+    text of its cells. Turned into a dataframe (or Styler) only when needed,
+    see `to_df` and `to_table`.
+
+    Cells spanning multiple rows or columns are copied into each position they
+    span, and empty cells are "". Rows may be ragged.
+
+    Attributes:
+        - label (str): The table's label, ie. "Table 1", or None.
+        - caption (str): The table's caption, or None.
+        - header (List[List[str]]): The text of the header rows.
+        - rows (List[List[str]]): The text of the body and footer rows.
+        - html (bytes): The serialized table-wrap, for tables read by
+            pd.read_html (see `read_table_record`), otherwise None.
+    """
+
+    label: str
+    caption: str
+    header: List[List[str]]
+    rows: List[List[str]]
+    html: bytes = None
+
+    @property
+    def title(self) -> str:
+        """
+        The table's label and caption, as "label: caption", or None.
+        """
+        if self.label and self.caption:
+            return f"{self.label}: {self.caption}"
+        return self.label or self.caption or None
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Build the table's dataframe, as `pd.read_html` would from the XML.
+
+        :returns: The table as a dataframe.
+        :rtype: pd.DataFrame
+        """
+        if self.html is not None:
+            return pd.read_html(self.html)[0]
+
+        body = self.header + self.rows
+        header = None
+        if len(self.header) == 1:
+            header = 0
+        elif self.header:
+            # header rows with any text
+            header = [i for i, row in enumerate(self.header) if any(row)]
+
+        # pad ragged rows
+        width = max((len(row) for row in body), default=0)
+        body = [row + [""] * (width - len(row)) for row in body]
+
+        with TextParser(body, header=header, **READ_HTML_PARSER_OPTIONS) as parser:
+            return parser.read()
+
+    def to_table(self):
+        """
+        Build the table's dataframe, styled with its title if it has one, as
+        found in `Paper.tables`.
+
+        :returns: The table as a pandas Styler, or a pd.DataFrame if untitled.
+        """
+        table = self.to_df()
+        if self.title:
+            table = table.style.set_caption(self.title)
+        return table
+
+    def to_dict(self) -> dict:
+        """
+        Return the record as a dictionary, as exported by `Paper.to_relational`.
+
+        :returns: The table's "Label", "Caption", "Header", and "Rows".
+        :rtype: dict
+        """
+        return {
+            "Label": self.label,
+            "Caption": self.caption,
+            "Header": self.header,
+            "Rows": self.rows,
+        }
+
+    @classmethod
+    def from_table(
+        cls, table, label: str = None, caption: str = None, html: bytes = None
+    ) -> "tableRecord":
+        """
+        Record a dataframe or Styler table, with its cells as strings.
+
+        :param table: A pd.DataFrame, or pandas Styler.
+        :param str label: The table's label. Default is None.
+        :param str caption: The table's caption. Default is None, (the
+            Styler's caption, for Stylers).
+        :param bytes html: The table's serialized table-wrap, if it was read
+            by pd.read_html. Default is None.
+
+        :returns: A record of the table.
+        :rtype: tableRecord
+        """
+        if is_styler(table):
+            if caption is None:
+                caption = table.caption
+            table = table.data
+
+        columns = table.columns
+        if isinstance(columns, pd.RangeIndex):
+            # no header
+            header = []
+        elif isinstance(columns, pd.MultiIndex):
+            header = [
+                [str(name) for name in columns.get_level_values(level)]
+                for level in range(columns.nlevels)
+            ]
+        else:
+            header = [[str(name) for name in columns]]
+        rows = [
+            ["" if pd.isna(cell) else str(cell) for cell in row]
+            for row in table.itertuples(index=False, name=None)
+        ]
+        return cls(label, caption, header, rows, html)
+
+
+def read_table_record(
+    table_wrap: ET.Element, label: str = None, caption: str = None
+) -> tableRecord:
+    """
+    Read the first table of a PMC <table-wrap> into a `tableRecord`, whose
+    `to_df` gives the same result as `pd.read_html(ET.tostring(table_wrap))[0]`.
+
+    Walks the lxml tree directly, rather than serializing it and parsing it
+    as HTML. Rows are taken from <thead>, <tbody>, and <tfoot>, and cells
+    spanning multiple rows or columns (rowspan, colspan) are copied into each
+    position they span. Typing the cells is left to `tableRecord.to_df`, which
+    uses the same TextParser, with the same options, as read_html.
+
+    Tables the walk does not handle (ie. nested tables, line breaks, hidden
+    elements, malformed spans, or no data) are read by `pd.read_html` instead,
+    and keep their serialized XML to be read again by `to_df`.
+
+    :param ET.Element table_wrap: The table-wrap element from PMC XML.
+    :param str label: The table's label. Default is None.
+    :param str caption: The table's caption. Default is None.
+
+    :raises ValueError: If the table can not be read, as for pd.read_html.
+
+    :returns: A record of the table.
+    :rtype: tableRecord
+    """
+    try:
+        head_and_rows = _walk_table(table_wrap)
+    except ValueError:
+        head_and_rows = None
+    if head_and_rows is None:
+        html = ET.tostring(table_wrap)
+        return tableRecord.from_table(
+            pd.read_html(html)[0], label=label, caption=caption, html=html
+        )
+    return tableRecord(label, caption, *head_and_rows)
+
+
+def read_table(table_wrap: ET.Element) -> pd.DataFrame:
+    """
+    Read the first table of a PMC <table-wrap> into a dataframe, with the same
+    result as `pd.read_html(ET.tostring(table_wrap))[0]`.
+
+    See `read_table_record`.
+
+    :param ET.Element table_wrap: The table-wrap element from PMC XML.
+
+    :raises ValueError: If the table can not be read, as for pd.read_html.
+
+    :returns: The table as a dataframe.
+    :rtype: pd.DataFrame
+    """
+    return read_table_record(table_wrap).to_df()
+
+
+def _walk_table(table_wrap: ET.Element) -> Tuple[List[List[str]], List[List[str]]]:
+    """
+    Get the cell text of a table-wrap's table, as header rows and body and
+    footer rows, or return None if the table needs read_html (see
+    `read_table_record`).
+    """
+    tables = list(table_wrap.iter("table"))
+    if len(tables) != 1:
+        return None
+    table = tables[0]
+    # read_html only reads tables with text, and handles these specially
+    if not table.xpath("string()").strip() or table.xpath(".//br|.//*[@style]"):
+        return None
+
+    header_rows = []
+    for thead in table.xpath(".//thead"):
+        header_rows.extend(thead.xpath("./tr"))
+        # cells directly under <thead>, missing a <tr>
+        if _cells(thead):
+            header_rows.append(thead)
+    body_rows = table.xpath(".//tbody//tr") + table.xpath("./tr")
+    footer_rows = table.xpath(".//tfoot//tr")
+    if not header_rows:
+        # without a <thead>, leading rows of all <th> cells are the header
+        while body_rows and all(cell.tag == "th" for cell in _cells(body_rows[0])):
+            header_rows.append(body_rows.pop(0))
+
+    head = _expand_spans(header_rows)
+    rows = _expand_spans(body_rows) + _expand_spans(footer_rows)
+    if not head and not rows:
+        return None
+    if len(head) > 1 and not any(any(row) for row in head):
+        # multiple header rows without text
+        return None
+
+    # share the text of repeated cells (ie. "", "NA", units) between cells
+    texts = {}
+    head = [[texts.setdefault(text, text) for text in row] for row in head]
+    rows = [[texts.setdefault(text, text) for text in row] for row in rows]
+    return head, rows
+
+
+def _expand_spans(rows: List[ET.Element]) -> List[List[str]]:
+    """
+    Get the cell text of table rows, copying cells with a rowspan or colspan
+    into each position they span, as pd.read_html does.
+    """
+    texts = []
+    # (column index, text, rows left) of cells spanning into the next row
+    remainder = []
+    for row in rows:
+        row_texts = []
+        next_remainder = []
+        index = 0
+        for cell in _cells(row):
+            # cells spanning down from previous rows, before this cell
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                row_texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+
+            text = _cell_text(cell)
+            rowspan = int(cell.get("rowspan") or 1)
+            colspan = int(cell.get("colspan") or 1)
+            for _ in range(colspan):
+                row_texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+
+        # cells spanning down from previous rows, after the last cell
+        for prev_index, prev_text, prev_rowspan in remainder:
+            row_texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        texts.append(row_texts)
+        remainder = next_remainder
+
+    # rows made up only of cells spanning down from previous rows
+    while remainder:
+        next_remainder = []
+        row_texts = []
+        for prev_index, prev_text, prev_rowspan in remainder:
+            row_texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        texts.append(row_texts)
+        remainder = next_remainder
+
+    return texts
+
+
+def _cell_text(cell: ET.Element) -> str:
+    """
+    Get the text of a table cell, with whitespace collapsed as by pd.read_html.
+    """
+    text = "".join(cell.itertext()) if len(cell) else cell.text or ""
+    return _CELL_WHITESPACE.sub(" ", text.strip())
+
+
+def _cells(row: ET.Element) -> List[ET.Element]:
+    """
+    Get the <td> and <th> cells directly under a row.
+    """
+    return [cell for cell in row if cell.tag == "td" or cell.tag == "th"]
+
+
+def is_styler(table) -> bool:
+    """
+    Check whether a table is a pandas Styler (ie. a captioned table), without
+    importing pandas' styling module, which is slow to import. If it was never
+    imported, no Stylers exist.
+
+    :param table: Any object.
+
+    :returns: Whether the table is a pandas Styler.
+    :rtype: bool
+    """
+    style = sys.modules.get("pandas.io.formats.style")
+    return style is not None and isinstance(table, style.Styler)
+
+
+class styledTableState(NamedTuple):
+    """
+    Picklable stand-in for a pandas Styler table (ie. a captioned table).
+    """
+
+    data: pd.DataFrame
+    caption: str
+
+
+def table_to_state(table):
+    """
+    Convert a parsed table to a picklable form. Stylers hold unpicklable
+    render functions, so only their data and caption are kept.
+
+    :param table: A pd.DataFrame, pandas Styler, or None.
+
+    :returns: The table, or a styledTableState if it was styled.
+    """
+    if is_styler(table):
+        return styledTableState(table.data, table.caption)
+    return table
+
+
+def table_from_state(state):
+    """
+    Inverse of `table_to_state`.
+
+    :param state: A pd.DataFrame, styledTableState, or None.
+
+    :returns: The table, restyled with its caption if it was styled.
+    """
+    if isinstance(state, styledTableState):
+        return state.data.style.set_caption(state.caption)
+    return state
+
+
 def stringify_children(node, encoding="utf-8"):
     """
     Returns a string representation of a node and all its children
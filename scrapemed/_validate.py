@@ -5,6 +5,12 @@ ScrapeMed's ``_validate`` Module
 Validation module for determining whether XML conforms to a format
 supported by the scrapemed package (NLM Articleset 2.0 DTD).
 
+Supported DTDs are compiled once per thread and shared via a registry keyed
+by DTD URL. A DTD's error log belongs to its last validation, so DTDs are not
+shared across threads, ie. those validating downloads for `scrape.aget_xmls`.
+Use ``validate_xmls`` to validate many documents at once and get back
+per-document validity and error logs.
+
 **Custom Exception**:
     - ``noDTDFoundError``: Raised when no DTD specification can be found in the
         downloaded XML.
@@ -13,7 +19,8 @@ supported by the scrapemed package (NLM Articleset 2.0 DTD).
 import re
 import lxml.etree as ET
 import os
-from io import StringIO
+import threading
+from typing import List, NamedTuple
 from scrapemed.utils import cleanerdoc
 
 SUPPORTED_DTD_URLS = [
@@ -23,6 +30,9 @@ SUPPORTED_DTD_URLS = [
 DTD_URL_PATTERN = re.compile(r'"(https?://\S+)"')
 END_OF_URL_PATTERN = re.compile(r"[^/]+$")
 
+# Per-thread registries of compiled DTDs, keyed by DTD URL
+_dtd_registries = threading.local()
+
 
 class noDTDFoundError(Exception):
     """
@@ -33,6 +43,18 @@ class noDTDFoundError(Exception):
     pass
 
 
+class validationResult(NamedTuple):
+    """
+    Validity of a single XML document, and the DTD errors found (if any).
+
+    :param bool valid: True if the XML validated against its DTD.
+    :param List[str] errors: Messages from the DTD validation error log.
+    """
+
+    valid: bool
+    errors: List[str]
+
+
 # ---------------------------DATA VALIDATION-------------------------------
 def validate_xml(xml: ET.ElementTree) -> bool:
     """
@@ -44,6 +66,8 @@ def validate_xml(xml: ET.ElementTree) -> bool:
     in the 'scrapemed/data/DTDs' directory. Currently only NLM Articleset 2.0
     (The DTD used by PubMed Central) is supported.
 
+    Each DTD is compiled once per thread, see :func:`get_dtd`.
+
     :param ET.ElementTree xml: An XML ElementTree to be validated.
 
     :return: True if the XML is validated successfully against a supported DTD,
@@ -53,13 +77,87 @@ def validate_xml(xml: ET.ElementTree) -> bool:
     :raises noDTDFoundError: If no DTD is specified for validation in the
         XML doctype.
     """
-    # Find DTD and confirm its supported
+    dtd = get_dtd(_get_dtd_url(xml))
+
+    return dtd.validate(xml)
+
+
+def validate_xmls(xmls: List[ET.ElementTree]) -> List[validationResult]:
+    """
+    Validate a batch of XML ElementTrees against their supported DTDs.
+
+    Unlike :func:`validate_xml`, a document without a DTD specification does
+    not raise, but is reported as invalid so the rest of the batch is still
+    validated.
+
+    :param List[ET.ElementTree] xmls: XML ElementTrees to be validated.
+
+    :return: A validationResult (validity and DTD error messages) per XML, in
+        the order provided.
+    :rtype: List[validationResult]
+    """
+    results = []
+    for xml in xmls:
+        try:
+            dtd = get_dtd(_get_dtd_url(xml))
+        except noDTDFoundError as e:
+            results.append(validationResult(False, [str(e)]))
+            continue
+        valid = dtd.validate(xml)
+        results.append(validationResult(valid, [str(e) for e in dtd.error_log]))
+
+    return results
+
+
+def get_dtd(url: str) -> ET.DTD:
+    """
+    Get the compiled DTD for a supported DTD URL, loading it from the
+    'scrapemed/data/DTDs' directory on first use.
+
+    :param str url: URL of the DTD, as specified in an XML doctype.
+
+    :return: The compiled DTD, shared within the calling thread.
+    :rtype: ET.DTD
+
+    :raises noDTDFoundError: If the DTD is not shipped with the scrapemed package.
+    """
+    registry = getattr(_dtd_registries, "registry", None)
+    if registry is None:
+        registry = _dtd_registries.registry = {}
+    if url not in registry:
+        dtd_filename = END_OF_URL_PATTERN.search(url).group(0)
+        dtd_filepath = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "data",
+            "DTDs",
+            dtd_filename,
+        )
+        if not os.path.exists(dtd_filepath):
+            raise noDTDFoundError(
+                cleanerdoc(
+                    """DTD not found in scrapemed package. Ensure you are
+                    using the latest package version."""
+                )
+            )
+        registry[url] = ET.DTD(dtd_filepath)
+
+    return registry[url]
+
+
+def _get_dtd_url(xml: ET.ElementTree) -> str:
+    """
+    Find the URL of the DTD specified in an XML doctype, and confirm it
+    is supported.
+
+    :param ET.ElementTree xml: An XML ElementTree specifying a DTD.
+
+    :return: The DTD URL.
+    :rtype: str
+
+    :raises noDTDFoundError: If no DTD is specified in the XML doctype.
+    """
     match = DTD_URL_PATTERN.search(xml.docinfo.doctype)
-    url = None
-    if match:
-        url = match.group(1)
-        assert url in SUPPORTED_DTD_URLS
-    else:
+    if not match:
         raise noDTDFoundError(
             cleanerdoc(
                 """A DTD must be specified for validation. Set
@@ -67,27 +165,10 @@ def validate_xml(xml: ET.ElementTree) -> bool:
                        validation."""
             )
         )
+    url = match.group(1)
+    assert url in SUPPORTED_DTD_URLS
 
-    match = END_OF_URL_PATTERN.search(url)
-    dtd_filename = match.group(0)
-    dtd_filepath = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "data", "DTDs", dtd_filename
-    )
-
-    dtd_doc = None
-    with open(dtd_filepath, "r") as f:
-        dtd_doc = f.read()
-    if dtd_doc is None:
-        raise noDTDFoundError(
-            cleanerdoc(
-                """DTD not found in scrapemed package. Ensure you are using the
-                latest package version."""
-            )
-        )
-
-    dtd = ET.DTD(StringIO(dtd_doc))
-
-    return dtd.validate(xml)
+    return url
 
 
 # -------------------------END DATA VALIDATION-------------------------------
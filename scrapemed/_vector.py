@@ -0,0 +1,788 @@
+"""
+ScrapeMed's ``_vector`` Module
+==============================
+
+Chroma vector indexes of Paper text, used by `Paper.vectorize` and
+`paperSet.vectorize`.
+
+Papers are split into overlapping chunks of their full text, each tagged with
+the PMCID, part (abstract or body), and section title it comes from, and added
+to a Chroma collection in batches. Chroma clients are shared per path, so that
+the Papers of a paperSet go into one persistent collection, which can be
+queried across the whole corpus. Batches of queries are answered with one call
+to Chroma, and the chunks around all of their matches looked up with one more.
+Chunks can also be retrieved lexically, from a BM25 index built alongside the
+collection (see `scrapemed._lexical`), or by fusing both rankings.
+
+Chunks are embedded by Chroma's default embedding function (which downloads a
+model on first use), or by any local embedding function, such as the offline
+`hashingEmbedder` or a preloaded sentence-transformer's `encode`. Local
+embedding functions are called on batches of texts, on a shared thread pool.
+
+chromadb and langchain are slow to import, so they are only imported on use.
+"""
+
+import os
+import zlib
+import numpy as np
+import scrapemed._lexical as _lexical
+from scrapemed.utils import pmcid_as_int
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# default location of a paperSet's persistent vector index, next to the
+# default paperStore database
+DEFAULT_VECTOR_PATH = os.path.join("data", "chroma")
+DEFAULT_COLLECTION_NAME = "scrapemed-papers"
+# number of chunks embedded and added to a collection per call
+DEFAULT_BATCH_SIZE = 256
+# number of texts per call to an embedding function
+DEFAULT_EMBED_BATCH_SIZE = 32
+
+# retrieval modes of query_collection: Chroma embedding similarity, BM25, or
+# both, merged by reciprocal rank fusion
+QUERY_MODES = ("dense", "lexical", "fused")
+# number of chunks each retriever ranks before fusion
+DEFAULT_FUSION_DEPTH = 50
+# reciprocal rank fusion constant, damping the weight of the top ranks
+RRF_K = 60
+
+# shared Chroma clients, keyed by absolute path (None for the in-memory client)
+_CLIENTS = {}
+# shared thread pool running embedding functions, created on first use
+_EMBED_EXECUTOR = None
+
+
+# -------------------------------Clients---------------------------------
+def get_client(path: str = None):
+    """
+    Get the shared Chroma client of a path, creating it on first use.
+
+    :param str path: Directory of a persistent Chroma index, created if it
+        does not exist. Default is None, the in-memory client.
+
+    :return: The Chroma client.
+    :rtype: chromadb.ClientAPI
+    """
+    import chromadb
+
+    key = None if path is None else os.path.abspath(path)
+    if key not in _CLIENTS:
+        if key is None:
+            _CLIENTS[key] = chromadb.EphemeralClient()
+        else:
+            _CLIENTS[key] = chromadb.PersistentClient(path=key)
+    return _CLIENTS[key]
+
+
+def get_collection(
+    path: str = None, name: str = DEFAULT_COLLECTION_NAME, refresh=False
+):
+    """
+    Get (or create) a collection of the shared Chroma client of a path.
+
+    :param str path: Directory of a persistent Chroma index, or None for the
+        in-memory client. Default is None.
+    :param str name: Name of the collection. Default is "scrapemed-papers".
+    :param bool refresh: Whether to delete and recreate the collection.
+        Default is False.
+
+    :return: The Chroma collection.
+    :rtype: chromadb.Collection
+    """
+    client = get_client(path)
+    if refresh and name in [
+        collection.name for collection in client.list_collections()
+    ]:
+        client.delete_collection(name)
+    return client.get_or_create_collection(name)
+
+
+# -----------------------------End Clients-------------------------------
+
+
+# ------------------------------Embedding--------------------------------
+class hashingEmbedder:
+    """
+    Offline embedding function, which needs no model: hashes the lowercased
+    words of each text into a fixed number of signed features (the hashing
+    trick), and L2 normalizes them. Texts sharing words, ie. exact biomedical
+    terms, are embedded close together.
+
+    :param int n_features: Number of features (dimensions). Default is 512.
+
+    :Example:
+
+    >>> paper.vectorize(embedding_fn=hashingEmbedder())
+    """
+
+    def __init__(self, n_features: int = 512):
+        """
+        Initialize a hashingEmbedder.
+
+        :param int n_features: Number of features (dimensions). Default is 512.
+        """
+        self.n_features = n_features
+
+    def name(self) -> str:
+        """
+        Name of the embedder and its settings, recorded with the collections
+        it embeds.
+        """
+        return f"hashingEmbedder-{self.n_features}"
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        :param List[str] texts: The texts to embed.
+
+        :return: One L2 normalized row per text.
+        :rtype: np.ndarray
+        """
+        embeddings = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.array(
+                [zlib.crc32(word.encode()) for word in _lexical.tokenize(text)],
+                dtype=np.int64,
+            )
+            # low bits pick the feature, the top bit its sign
+            signs = np.where(hashes >> 31, -1.0, 1.0)
+            np.add.at(embeddings[row], hashes % self.n_features, signs)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms == 0, 1, norms)
+
+
+def embed(
+    texts: List[str],
+    embedding_fn: Callable,
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+) -> List[np.ndarray]:
+    """
+    Embed texts with a local embedding function, batch_size texts per call,
+    running the batches on a shared thread pool.
+
+    :param List[str] texts: The texts to embed.
+    :param Callable embedding_fn: Called with a list of texts, returning one
+        embedding (a sequence of floats) per text.
+    :param int batch_size: Number of texts per call to embedding_fn. Default
+        is 32.
+
+    :return: One embedding per text, in order.
+    :rtype: List[np.ndarray]
+    """
+    global _EMBED_EXECUTOR
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    if len(batches) <= 1:
+        results = [embedding_fn(batch) for batch in batches]
+    else:
+        if _EMBED_EXECUTOR is None:
+            _EMBED_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="scrapemed-embed")
+        results = _EMBED_EXECUTOR.map(embedding_fn, batches)
+    return [
+        embedding
+        for result in results
+        for embedding in np.asarray(result, dtype=np.float32)
+    ]
+
+
+def query_arguments(
+    queries: List[str],
+    embedding_fn: Callable = None,
+    batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+) -> Dict:
+    """
+    Arguments for `collection.query`: the query texts, for Chroma to embed,
+    or, given a local embedding function, their embeddings.
+
+    :param List[str] queries: The query texts.
+    :param Callable embedding_fn: A local embedding function, see `embed`.
+        Default is None, Chroma's default embedding function.
+    :param int batch_size: Number of texts per call to embedding_fn.
+
+    :return: The query_texts or query_embeddings keyword argument.
+    :rtype: dict
+    """
+    if embedding_fn is None:
+        return {"query_texts": queries}
+    return {"query_embeddings": embed(queries, embedding_fn, batch_size)}
+
+
+# ----------------------------End Embedding------------------------------
+
+
+# -------------------------------Chunking--------------------------------
+def chunk_id(pmcid, index: int) -> str:
+    """
+    Generate the ID of a text chunk from the PMCID of its Paper and its index.
+
+    :param pmcid: The PMCID of the Paper.
+    :param int index: The index of the chunk in the Paper's text.
+
+    :return: A chunk ID, unique across Papers.
+    :rtype: str
+    """
+    return f"pmcid-{pmcid}-chunk-{str(index)}"
+
+
+def neighbour_ids(id: str, n_before: int, n_after: int) -> List[str]:
+    """
+    Generate the IDs of a chunk and the chunks around it, in order.
+
+    :param str id: A chunk ID, as generated by `chunk_id`.
+    :param int n_before: Number of chunks before it.
+    :param int n_after: Number of chunks after it.
+
+    :return: The chunk IDs, some of which may be out of range of the Paper.
+    :rtype: List[str]
+    """
+    pmcid, _, index = id[len("pmcid-") :].rpartition("-chunk-")
+    index = int(index)
+    return [chunk_id(pmcid, i) for i in range(index - n_before, index + n_after + 1)]
+
+
+def split_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Split text into chunks of about chunk_size characters, overlapping by about
+    chunk_overlap characters, at newlines, periods, or whitespace.
+
+    :param str text: The text to split.
+    :param int chunk_size: Approximate chunk size, in characters.
+    :param int chunk_overlap: Approximate chunk overlap, in characters.
+
+    :return: The chunks, in order.
+    :rtype: List[str]
+    """
+    from langchain.text_splitter import CharacterTextSplitter
+
+    chunk_model = CharacterTextSplitter(
+        separator="\\n\\n|\\n|\\.|\\s",
+        is_separator_regex=True,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        keep_separator=True,
+    )
+    return chunk_model.split_text(text)
+
+
+def section_spans(paper) -> List[Tuple[int, int, str, str]]:
+    """
+    Find the abstract and body sections of a Paper in `paper.full_text()`,
+    which joins them under "Abstract: " and "Body: " headings.
+
+    :param Paper paper: The Paper.
+
+    :return: The (start, end, part, title) of each section, in order, where
+        part is "abstract" or "body", and title is the section's title, if any.
+    :rtype: List[Tuple[int, int, str, str]]
+    """
+    spans = []
+    offset = 0
+    for part, heading, sections in [
+        ("abstract", "Abstract: \n", paper.abstract),
+        ("body", "Body: \n", paper.body),
+    ]:
+        if not sections:
+            continue
+        offset += len(heading)
+        for section in sections:
+            offset += len("\n")
+            length = len(str(section))
+            spans.append(
+                (offset, offset + length, part, getattr(section, "title", None))
+            )
+            offset += length
+    return spans
+
+
+def chunk_paper(
+    paper, chunk_size: int, chunk_overlap: int
+) -> Tuple[List[str], List[str], List[Dict]]:
+    """
+    Split the full text of a Paper into chunks, with IDs and metadata.
+
+    Each chunk's metadata holds the Paper's "pmcid" (as an integer, as in
+    the chunk IDs, whatever form `paper.pmcid` is in), the "start" and "end"
+    offsets of the chunk in `paper.full_text()`, and the "part" (abstract or
+    body) and "section" title of the section the chunk starts in (or, for
+    chunks starting at a heading, the section following it), if any.
+
+    :param Paper paper: The Paper to chunk.
+    :param int chunk_size: Approximate chunk size, in characters.
+    :param int chunk_overlap: Approximate chunk overlap, in characters.
+
+    :return: The chunk IDs, chunk texts, and chunk metadatas.
+    :rtype: Tuple[List[str], List[str], List[dict]]
+    """
+    text = paper.full_text()
+    chunks = split_text(text, chunk_size, chunk_overlap)
+    spans = section_spans(paper)
+    span_starts = [start for start, _, _, _ in spans]
+
+    pmcid = pmcid_as_int(paper.pmcid)
+    ids, metadatas = [], []
+    start = 0
+    previous_length = 0
+    for i, chunk in enumerate(chunks):
+        # chunks are in order, and overlap by at most chunk_overlap characters
+        found = text.find(chunk, max(0, start + previous_length - chunk_overlap))
+        if found == -1:
+            found = text.find(chunk, start)
+        start, previous_length = max(found, start), len(chunk)
+
+        metadata = {"pmcid": pmcid}
+        if found != -1:
+            metadata["start"], metadata["end"] = start, start + len(chunk)
+        span = bisect_right(span_starts, start) - 1
+        if span < 0 or start >= spans[span][1]:
+            # starts in a heading between sections, so tag the next section
+            span += 1
+        if found != -1 and span < len(spans) and spans[span][0] < start + len(chunk):
+            _, _, metadata["part"], metadata["section"] = spans[span]
+        ids.append(chunk_id(pmcid, i))
+        # Chroma metadata can not hold None
+        metadatas.append(
+            {key: value for key, value in metadata.items() if value is not None}
+        )
+    return ids, chunks, metadatas
+
+
+def stitch(text: str, metadatas: List[Dict]) -> str:
+    """
+    Join consecutive chunks back into the text they were split from, as one
+    slice of the text, from the start of the first chunk to the end of the
+    last. Exact, however the chunks overlap.
+
+    :param str text: The text the chunks were split from, ie.
+        `paper.full_text()`.
+    :param List[dict] metadatas: The metadatas of the chunks, with the
+        "start" and "end" offsets set by `chunk_paper`.
+
+    :return: The text spanned by the chunks, or None if none have offsets.
+    :rtype: str
+    """
+    offsets = [
+        (metadata["start"], metadata["end"])
+        for metadata in metadatas
+        if metadata and "start" in metadata
+    ]
+    if not offsets:
+        return None
+    return text[min(start for start, _ in offsets) : max(end for _, end in offsets)]
+
+
+# ------------------------------End Chunking-----------------------------
+
+
+# ------------------------------Collections------------------------------
+def add_papers(
+    collection,
+    papers: Iterable,
+    chunk_size: int,
+    chunk_overlap: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embedding_fn: Callable = None,
+    embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+    lexical_index: _lexical.bm25Index = None,
+) -> int:
+    """
+    Chunk Papers and add the chunks to a collection, embedding batch_size
+    chunks per call to Chroma.
+
+    Papers whose chunks are already in the collection (ie. from an earlier
+    run against a persistent index) are skipped. A Paper counts as present
+    once its last chunk is, since a Paper's chunks are added in order. So
+    that skipped Papers' chunks match, the chunk settings and embedding
+    function are recorded in the metadata of a new collection, and must
+    match those of an existing one.
+
+    :param chromadb.Collection collection: The collection to add to.
+    :param Iterable[Paper] papers: The Papers to add. Papers without text are
+        skipped.
+    :param int chunk_size: Approximate chunk size, in characters.
+    :param int chunk_overlap: Approximate chunk overlap, in characters.
+    :param int batch_size: Number of chunks to embed per call to Chroma, and
+        number of Papers to check for per lookup. Default is 256.
+    :param Callable embedding_fn: A local embedding function, see `embed`.
+        Default is None, Chroma's default embedding function.
+    :param int embed_batch_size: Number of chunks per call to embedding_fn.
+        Default is 32.
+    :param bm25Index lexical_index: Optional BM25 index to add the chunks of
+        every Paper to, including those skipped as already in the collection.
+
+    :return: The number of Papers added.
+    :rtype: int
+
+    :raises ValueError: If the collection holds chunks made with other chunk
+        settings or another embedding function. Recreate it to re-vectorize.
+    """
+    _check_settings(collection, chunk_size, chunk_overlap, embedding_fn)
+    added = 0
+    seen = set()
+    pending = ([], [], [])
+    paper_batch = []
+
+    def flush(partial: bool):
+        _flush(collection, pending, batch_size, partial, embedding_fn, embed_batch_size)
+
+    for paper in papers:
+        paper_batch.append(paper)
+        if len(paper_batch) < batch_size:
+            continue
+        added += _add_paper_batch(
+            collection,
+            paper_batch,
+            chunk_size,
+            chunk_overlap,
+            seen,
+            pending,
+            lexical_index,
+        )
+        flush(partial=False)
+        paper_batch = []
+    added += _add_paper_batch(
+        collection, paper_batch, chunk_size, chunk_overlap, seen, pending, lexical_index
+    )
+    flush(partial=True)
+    return added
+
+
+def query_collection(
+    collection,
+    query: str,
+    n_results: int = 5,
+    pmcids: List[int] = None,
+    embedding_fn: Callable = None,
+    mode: str = "dense",
+    lexical_index: _lexical.bm25Index = None,
+) -> List[Dict]:
+    """
+    Find the chunks of a collection most relevant to a query.
+
+    :param chromadb.Collection collection: The collection to query.
+    :param str query: The natural language query.
+    :param int n_results: Number of chunks to return. Default is 5.
+    :param List[int] pmcids: Only return chunks of these PMCIDs. Default is
+        None, any Paper in the collection.
+    :param Callable embedding_fn: The local embedding function the collection
+        was embedded with, if any, see `embed`. Default is None.
+    :param str mode: "dense" to rank chunks by embedding similarity, "lexical"
+        by BM25 score in lexical_index, or "fused" by reciprocal rank fusion
+        of both. Default is "dense".
+    :param bm25Index lexical_index: BM25 index of the collection's chunks,
+        needed by the "lexical" and "fused" modes.
+
+    :return: The matching chunks, most relevant first, with their "Chunk_ID",
+        "PMCID", "Part", "Section", "Start" and "End" offsets in the Paper's
+        full text, "Text", and "Distance" (None for chunks only matched
+        lexically). Outside the "dense" mode, chunks also have the "Score"
+        they are ranked by, the BM25 or fused score.
+    :rtype: List[dict]
+    """
+    return query_collection_many(
+        collection,
+        [query],
+        n_results,
+        pmcids=pmcids,
+        embedding_fn=embedding_fn,
+        mode=mode,
+        lexical_index=lexical_index,
+    )[0]
+
+
+def query_collection_many(
+    collection,
+    queries: List[str],
+    n_results: int = 5,
+    pmcids: List[int] = None,
+    embedding_fn: Callable = None,
+    mode: str = "dense",
+    lexical_index: _lexical.bm25Index = None,
+) -> List[List[Dict]]:
+    """
+    Find the chunks of a collection most relevant to each of several queries,
+    with one call to Chroma per retriever, and one more to look up chunks only
+    matched lexically.
+
+    :param chromadb.Collection collection: The collection to query.
+    :param List[str] queries: The natural language queries.
+    :param int n_results: Number of chunks to return per query. Default is 5.
+    :param List[int] pmcids: Only return chunks of these PMCIDs. Default is
+        None, any Paper in the collection.
+    :param Callable embedding_fn: The local embedding function the collection
+        was embedded with, if any, see `embed`. Default is None.
+    :param str mode: "dense", "lexical", or "fused", see `query_collection`.
+        Default is "dense".
+    :param bm25Index lexical_index: BM25 index of the collection's chunks,
+        needed by the "lexical" and "fused" modes.
+
+    :return: For each query, in order, its matching chunks, as returned by
+        `query_collection`.
+    :rtype: List[List[dict]]
+    """
+    if mode not in QUERY_MODES:
+        raise ValueError(f"mode must be one of {QUERY_MODES}, not {mode!r}.")
+    if mode != "dense" and lexical_index is None:
+        raise ValueError(f"The {mode!r} mode needs a lexical_index.")
+    if not queries:
+        return []
+    if mode == "dense":
+        return _dense_hits(collection, queries, n_results, pmcids, embedding_fn)
+
+    depth = n_results if mode == "lexical" else max(n_results, DEFAULT_FUSION_DEPTH)
+    lexical = [
+        [
+            (chunk_id(pmcid, index), score)
+            for pmcid, index, score in lexical_index.search(query, depth, pmcids)
+        ]
+        for query in queries
+    ]
+    dense = [[] for _ in queries]
+    if mode == "fused":
+        dense = _dense_hits(collection, queries, depth, pmcids, embedding_fn)
+
+    rankings = []
+    for lexical_ranks, dense_hits in zip(lexical, dense):
+        if mode == "lexical":
+            rankings.append(lexical_ranks)
+            continue
+        # reciprocal rank fusion, each retriever's rank r adding 1 / (k + r)
+        scores = {}
+        for ranking in [
+            [hit["Chunk_ID"] for hit in dense_hits],
+            [id for id, _ in lexical_ranks],
+        ]:
+            for rank, id in enumerate(ranking, start=1):
+                scores[id] = scores.get(id, 0) + 1 / (RRF_K + rank)
+        fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        rankings.append(fused[:n_results])
+
+    # look up the chunks not already returned by Chroma for their query, in
+    # one call (distances are per query, so only reused within it)
+    dense = [{hit["Chunk_ID"]: hit for hit in dense_hits} for dense_hits in dense]
+    missing = list(
+        dict.fromkeys(
+            id
+            for ranking, dense_hits in zip(rankings, dense)
+            for id, _ in ranking
+            if id not in dense_hits
+        )
+    )
+    looked_up = {}
+    if missing:
+        result = collection.get(ids=missing, include=["documents", "metadatas"])
+        for id, document, metadata in zip(
+            result["ids"], result["documents"], result["metadatas"]
+        ):
+            looked_up[id] = _hit(id, document, metadata, None)
+    return [
+        [
+            {**(dense_hits.get(id) or looked_up[id]), "Score": score}
+            for id, score in ranking
+            if id in dense_hits or id in looked_up
+        ]
+        for ranking, dense_hits in zip(rankings, dense)
+    ]
+
+
+def neighbour_metadatas(
+    collection, ids: Iterable[str], n_before: int, n_after: int
+) -> Dict[str, List[Dict]]:
+    """
+    Look up the metadatas of the chunks around each of several chunks, in one
+    call to Chroma.
+
+    :param chromadb.Collection collection: The collection the chunks are in.
+    :param Iterable[str] ids: The chunk IDs, ie. the matches of queries.
+    :param int n_before: Number of chunks before each chunk to include.
+    :param int n_after: Number of chunks after each chunk to include.
+
+    :return: For each chunk ID, the metadatas of it and its neighbouring
+        chunks in the collection, in order. Pass them to `stitch` to get the
+        text they span.
+    :rtype: Dict[str, List[dict]]
+    """
+    expanded = {id: neighbour_ids(id, n_before, n_after) for id in ids}
+    wanted = list(dict.fromkeys(i for group in expanded.values() for i in group))
+    if not wanted:
+        return {}
+    result = collection.get(ids=wanted, include=["metadatas"])
+    found = dict(zip(result["ids"], result["metadatas"]))
+    return {
+        id: [found[i] for i in group if i in found] for id, group in expanded.items()
+    }
+
+
+# ----------------------------End Collections----------------------------
+
+
+# --------------------------------Helpers--------------------------------
+def _hit(id: str, document: str, metadata: Dict, distance: float) -> Dict:
+    """
+    A chunk matching a query, as returned by `query_collection`.
+    """
+    return {
+        "Chunk_ID": id,
+        "PMCID": metadata.get("pmcid"),
+        "Part": metadata.get("part"),
+        "Section": metadata.get("section"),
+        "Start": metadata.get("start"),
+        "End": metadata.get("end"),
+        "Text": document,
+        "Distance": distance,
+    }
+
+
+def _dense_hits(
+    collection,
+    queries: List[str],
+    n_results: int,
+    pmcids: List[int],
+    embedding_fn: Callable,
+) -> List[List[Dict]]:
+    """
+    Find the chunks of a collection most semantically similar to each query,
+    in one call to Chroma.
+    """
+    where = None
+    if pmcids is not None:
+        where = {"pmcid": {"$in": [pmcid_as_int(pmcid) for pmcid in pmcids]}}
+    result = collection.query(
+        **query_arguments(list(queries), embedding_fn),
+        n_results=n_results,
+        where=where,
+        include=["documents", "metadatas", "distances"],
+    )
+    return [
+        [
+            _hit(id, document, metadata, distance)
+            for id, document, metadata, distance in zip(
+                ids, documents, metadatas, distances
+            )
+        ]
+        for ids, documents, metadatas, distances in zip(
+            result["ids"],
+            result["documents"],
+            result["metadatas"],
+            result["distances"],
+        )
+    ]
+
+
+def _embedding_name(embedding_fn: Callable) -> str:
+    """
+    Name identifying an embedding function: its `name` (ie. of a Chroma
+    embedding function), or else its qualified name (of its class, for
+    callable objects). None is Chroma's default embedding function.
+    """
+    if embedding_fn is None:
+        return "chroma-default"
+    name = getattr(embedding_fn, "name", None)
+    if callable(name):
+        name = name()
+    if isinstance(name, str):
+        return name
+    qualname = getattr(embedding_fn, "__qualname__", None)
+    if qualname is None:
+        qualname = type(embedding_fn).__qualname__
+    module = getattr(embedding_fn, "__module__", None) or type(embedding_fn).__module__
+    return f"{module}.{qualname}"
+
+
+def _check_settings(
+    collection, chunk_size: int, chunk_overlap: int, embedding_fn: Callable
+) -> None:
+    """
+    Record the chunk settings and embedding function of an empty collection in
+    its metadata, or check that they match those recorded in a non-empty one.
+    """
+    settings = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "embedding_fn": _embedding_name(embedding_fn),
+    }
+    metadata = dict(collection.metadata or {})
+    recorded = {key: metadata[key] for key in settings if key in metadata}
+    if recorded == settings:
+        return None
+    if collection.count() == 0:
+        collection.modify(metadata={**metadata, **settings})
+        return None
+    raise ValueError(
+        f"Collection {collection.name!r} holds chunks made with "
+        f"{recorded or 'unrecorded settings'}, not {settings}. Pass "
+        "refresh=True to vectorize() to rebuild it."
+    )
+
+
+def _add_paper_batch(
+    collection,
+    papers: List,
+    chunk_size: int,
+    chunk_overlap: int,
+    seen: set,
+    pending: Tuple[List, List, List],
+    lexical_index: _lexical.bm25Index = None,
+) -> int:
+    """
+    Chunk a batch of Papers, add them to the lexical index, if any, and queue
+    the chunks of those not yet in the collection (or seen earlier) onto
+    pending. Returns the number queued.
+    """
+    chunked = []
+    for paper in papers:
+        if not paper or pmcid_as_int(paper.pmcid) in seen:
+            continue
+        seen.add(pmcid_as_int(paper.pmcid))
+        chunked.append(chunk_paper(paper, chunk_size, chunk_overlap))
+        if lexical_index is not None:
+            lexical_index.add(paper.pmcid, chunked[-1][1])
+    last_ids = [ids[-1] for ids, _, _ in chunked if ids]
+    present = set()
+    if last_ids:
+        present = set(collection.get(ids=last_ids, include=[])["ids"])
+
+    added = 0
+    for chunks in chunked:
+        ids = chunks[0]
+        if not ids or ids[-1] in present:
+            continue
+        for queue, values in zip(pending, chunks):
+            queue.extend(values)
+        added += 1
+    return added
+
+
+def _flush(
+    collection,
+    pending: Tuple[List, List, List],
+    batch_size: int,
+    partial: bool,
+    embedding_fn: Callable,
+    embed_batch_size: int,
+) -> None:
+    """
+    Upsert the pending chunks to the collection, batch_size at a time. Unless
+    partial, a final partial batch is left pending.
+    """
+    ids, documents, metadatas = pending
+    end = len(ids) if partial else len(ids) - len(ids) % batch_size
+    for start in range(0, end, batch_size):
+        batch = slice(start, start + batch_size)
+        embeddings = None
+        if embedding_fn is not None:
+            embeddings = embed(documents[batch], embedding_fn, embed_batch_size)
+        collection.upsert(
+            ids=ids[batch],
+            documents=documents[batch],
+            metadatas=metadatas[batch],
+            embeddings=embeddings,
+        )
+    for queue in pending:
+        del queue[:end]
+    return None
+
+
+# ------------------------------End Helpers------------------------------
@@ -0,0 +1,394 @@
+"""
+ScrapeMed's Cache Module
+============================
+
+ScrapeMed's `cache` module provides a content-addressed, on-disk cache for
+XML downloaded from PubMed Central.
+
+Raw XML payloads are compressed (gzip, or zstd if the optional `zstandard`
+package is installed) and stored under sharded directories named by the
+SHA-256 hash of their contents. A small SQLite index maps each PMCID to the
+hash of its payload and the time it was fetched.
+
+Pass an :class:`xmlCache` to `scrape.get_xml`, `scrape.get_xmls`,
+`Paper.from_pmc`, or `paperSet.from_pmcid_list` to avoid downloading the
+same article twice. An offline cache serves only from disk, so a corpus can
+be re-parsed (ie. after a parser upgrade) without any network access.
+
+..exceptions::
+    - :class:`cacheMissError` - Raised when an offline cache does not hold a
+        requested PMCID.
+"""
+
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Union
+from scrapemed.utils import normalize_pmcid
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+COMPRESSION_EXTENSIONS = {"gzip": ".xml.gz", "zstd": ".xml.zst"}
+
+
+class cacheMissError(Exception):
+    """
+    Raised when an offline cache does not hold a requested PMCID.
+    """
+
+    pass
+
+
+class xmlCache:
+    """
+    Content-addressed on-disk cache of raw PMC XML, keyed by PMCID.
+
+    :param str path: Directory holding the cache. Created if it does not exist.
+        Default is "data/xml_cache".
+    :param str compression: Compression for newly cached payloads, either
+        "gzip" or "zstd" (requires the `zstandard` package). Default is "gzip".
+    :param float ttl: Seconds after fetching that a cached XML is considered
+        stale and is fetched again. Default is None (never stale).
+    :param int max_bytes: Maximum total size of cached payloads on disk. Least
+        recently used entries are evicted past this size. Default is None
+        (unbounded).
+    :param bool offline: Serve only from the cache, never from PMC. Stale
+        entries are still served when offline. Default is False.
+
+    Example:
+    ```
+    cache = xmlCache("data/xml_cache")
+    pset = paperSet.from_pmcid_list(pmcids, email, cache=cache)
+    # later, reparse the same corpus without touching the network
+    pset = paperSet.from_pmcid_list(pmcids, email, cache=xmlCache(offline=True))
+    ```
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join("data", "xml_cache"),
+        compression: str = "gzip",
+        ttl: float = None,
+        max_bytes: int = None,
+        offline: bool = False,
+    ):
+        """
+        Open (or create) an on-disk XML cache.
+
+        :param str path: Directory holding the cache.
+        :param str compression: Compression for newly cached payloads.
+        :param float ttl: Seconds until a cached XML is considered stale.
+        :param int max_bytes: Maximum total size of cached payloads on disk.
+        :param bool offline: Serve only from the cache, never from PMC.
+        """
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(
+                f"Unknown compression {compression}. Options: "
+                f"{list(COMPRESSION_EXTENSIONS.keys())}"
+            )
+        if compression == "zstd" and zstandard is None:
+            raise ImportError(
+                "zstd compression requires the zstandard package. "
+                "Install it via `pip install zstandard`, or use gzip."
+            )
+
+        self.path = path
+        self.compression = compression
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), check_same_thread=False
+        )
+        with self._db:
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    pmcid TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    object TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_object ON entries (object)"
+            )
+
+        return None
+
+    # ------------------------Reading and Writing-----------------------------
+    def get(self, pmcid: Union[int, str]) -> str:
+        """
+        Get the cached XML text of a PMCID.
+
+        :param Union[int, str] pmcid: The PMCID to look up.
+
+        :return: The cached XML text, or None if not cached (or stale, when
+            online).
+        :rtype: str
+        """
+        pmcid = normalize_pmcid(pmcid)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT object, fetched_at FROM entries WHERE pmcid = ?", (pmcid,)
+            ).fetchone()
+        if row is None:
+            return None
+        object_path, fetched_at = row
+        if not self.offline and self._is_stale(fetched_at):
+            return None
+
+        try:
+            xml_text = self._read_object(object_path)
+        except FileNotFoundError:
+            # payload removed from under the index, drop the entry
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM entries WHERE pmcid = ?", (pmcid,))
+            return None
+
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE pmcid = ?",
+                (time.time(), pmcid),
+            )
+        return xml_text
+
+    def put(self, pmcid: Union[int, str], xml_text: str) -> str:
+        """
+        Cache the XML text of a PMCID, replacing any previous entry.
+
+        :param Union[int, str] pmcid: The PMCID the XML was retrieved for.
+        :param str xml_text: The raw XML text retrieved from PMC.
+
+        :return: The SHA-256 content hash the XML is stored under.
+        :rtype: str
+        """
+        pmcid = normalize_pmcid(pmcid)
+        payload = xml_text.encode("utf-8")
+        content_hash = hashlib.sha256(payload).hexdigest()
+        object_path = self._object_path(content_hash)
+
+        full_path = os.path.join(self.path, object_path)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            tmp_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self._compress(payload))
+            os.replace(tmp_path, full_path)
+        size = os.path.getsize(full_path)
+
+        now = time.time()
+        with self._lock, self._db:
+            old = self._db.execute(
+                "SELECT object FROM entries WHERE pmcid = ?", (pmcid,)
+            ).fetchone()
+            self._db.execute(
+                """INSERT OR REPLACE INTO entries
+                (pmcid, hash, object, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (pmcid, content_hash, object_path, size, now, now),
+            )
+            if old is not None and old[0] != object_path:
+                self._remove_unreferenced([old[0]])
+
+        if self.max_bytes is not None:
+            self.evict(max_bytes=self.max_bytes)
+
+        return content_hash
+
+    def __contains__(self, pmcid: Union[int, str]) -> bool:
+        """
+        Check whether a PMCID is cached (stale or not).
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM entries WHERE pmcid = ?", (normalize_pmcid(pmcid),)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """
+        Get the number of PMCIDs in the cache.
+        """
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def pmcids(self) -> List[str]:
+        """
+        List every PMCID held in the cache.
+
+        :return: List of cached PMCIDs.
+        :rtype: List[str]
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT pmcid FROM entries").fetchall()
+        return [row[0] for row in rows]
+
+    def size(self) -> int:
+        """
+        Get the total size on disk of the cached payloads, in bytes.
+
+        Payloads shared by multiple PMCIDs are counted once.
+
+        :return: Total size of cached payloads.
+        :rtype: int
+        """
+        with self._lock:
+            return self._total_size()
+
+    # ----------------------End Reading and Writing---------------------------
+
+    # -------------------------------Eviction---------------------------------
+    def evict(self, ttl: float = None, max_bytes: int = None) -> int:
+        """
+        Evict stale and least recently used entries from the cache.
+
+        :param float ttl: Evict entries fetched more than `ttl` seconds ago.
+            Default is None (uses the cache's ttl, if any).
+        :param int max_bytes: Evict least recently used entries until the
+            cached payloads total at most `max_bytes`. Default is None (uses
+            the cache's max_bytes, if any).
+
+        :return: The number of PMCIDs evicted.
+        :rtype: int
+        """
+        ttl = self.ttl if ttl is None else ttl
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        evicted = []
+        with self._lock, self._db:
+            if ttl is not None:
+                evicted.extend(
+                    self._db.execute(
+                        "SELECT pmcid, object FROM entries WHERE fetched_at < ?",
+                        (time.time() - ttl,),
+                    ).fetchall()
+                )
+                self._db.executemany(
+                    "DELETE FROM entries WHERE pmcid = ?",
+                    [(pmcid,) for pmcid, _ in evicted],
+                )
+                self._remove_unreferenced([obj for _, obj in evicted])
+
+            if max_bytes is not None:
+                total = self._total_size()
+                lru = self._db.execute(
+                    """SELECT pmcid, object FROM entries
+                    ORDER BY accessed_at ASC"""
+                )
+                for pmcid, object_path in lru.fetchall():
+                    if total <= max_bytes:
+                        break
+                    self._db.execute("DELETE FROM entries WHERE pmcid = ?", (pmcid,))
+                    total -= self._remove_unreferenced([object_path])
+                    evicted.append((pmcid, object_path))
+
+        return len(evicted)
+
+    def clear(self) -> None:
+        """
+        Remove every entry and payload from the cache.
+        """
+        with self._lock, self._db:
+            objects = self._db.execute("SELECT DISTINCT object FROM entries")
+            objects = [row[0] for row in objects.fetchall()]
+            self._db.execute("DELETE FROM entries")
+            self._remove_unreferenced(objects)
+        return None
+
+    def close(self) -> None:
+        """
+        Close the cache index.
+        """
+        self._db.close()
+        return None
+
+    # -----------------------------End Eviction-------------------------------
+
+    # --------------------------------Helpers---------------------------------
+    def _is_stale(self, fetched_at: float) -> bool:
+        """
+        Check whether an entry fetched at `fetched_at` has outlived the ttl.
+        """
+        return self.ttl is not None and time.time() - fetched_at > self.ttl
+
+    def _object_path(self, content_hash: str) -> str:
+        """
+        Get the sharded path, relative to the cache directory, of a payload.
+        """
+        return os.path.join(
+            "objects",
+            content_hash[0:2],
+            content_hash[2:4],
+            content_hash + COMPRESSION_EXTENSIONS[self.compression],
+        )
+
+    def _compress(self, payload: bytes) -> bytes:
+        """
+        Compress a payload with the cache's compression.
+        """
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(payload)
+        return gzip.compress(payload)
+
+    def _read_object(self, object_path: str) -> str:
+        """
+        Read and decompress a payload, based on its file extension.
+        """
+        with open(os.path.join(self.path, object_path), "rb") as f:
+            payload = f.read()
+        if object_path.endswith(COMPRESSION_EXTENSIONS["zstd"]):
+            if zstandard is None:
+                raise ImportError(
+                    "Reading zstd compressed cache entries requires the "
+                    "zstandard package. Install it via `pip install zstandard`."
+                )
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            payload = gzip.decompress(payload)
+        return payload.decode("utf-8")
+
+    def _total_size(self) -> int:
+        """
+        Total size of distinct payloads in the index. Caller holds the lock.
+        """
+        row = self._db.execute(
+            """SELECT SUM(size) FROM
+            (SELECT size FROM entries GROUP BY object)"""
+        ).fetchone()
+        return row[0] or 0
+
+    def _remove_unreferenced(self, object_paths: List[str]) -> int:
+        """
+        Delete payload files no longer referenced by any entry. Caller holds
+        the lock.
+
+        :return: The number of bytes freed.
+        :rtype: int
+        """
+        freed = 0
+        for object_path in set(object_paths):
+            referenced = self._db.execute(
+                "SELECT 1 FROM entries WHERE object = ? LIMIT 1", (object_path,)
+            ).fetchone()
+            if referenced:
+                continue
+            full_path = os.path.join(self.path, object_path)
+            try:
+                freed += os.path.getsize(full_path)
+                os.remove(full_path)
+            except FileNotFoundError:
+                pass
+        return freed
+
+    # ------------------------------End Helpers-------------------------------
@@ -6,7 +6,9 @@ The scrapemed `paper` module is intended as the primary point of contact for
 scrapemed end users.
 
 Paper objects are defined here, as well end-user functionality for scraping
-data from PubMed Central without stressing about the details.
+data from PubMed Central without stressing about the details. LazyPapers
+parse only their metadata up front, and the rest of their fields on first
+access.
 
 ..warnings::
     - :class:`emptyTextWarning` - Warned when trying to perform a text
@@ -17,13 +19,14 @@ data from PubMed Central without stressing about the details.
 """
 
 import scrapemed._parse as parse
+import scrapemed.scrape as scrape
+import scrapemed._vector as _vector
+import scrapemed._lexical as _lexical
+from scrapemed._text import tableRecord
 import lxml.etree as ET
 import pandas as pd
 import datetime
-import chromadb
-from langchain.text_splitter import CharacterTextSplitter
-from typing import Union, Dict
-from difflib import SequenceMatcher
+from typing import Callable, Union, Dict, List
 import uuid
 import re
 import warnings
@@ -49,6 +52,33 @@ class pubmedHTTPError(Warning):
     pass
 
 
+def _retrieve_from_pmc(pmcid: int, retrieve: Callable):
+    """
+    Call retrieve, which downloads (and parses) a PMCID from PMC, retrying
+    with backoff on HTTP errors. Warns and returns None if every try fails.
+    """
+    NUM_TRIES = 3
+    result = None
+    for i in range(NUM_TRIES):
+        try:
+            result = retrieve()
+            break
+        except HTTPError:
+            if i < NUM_TRIES - 1:
+                time.sleep(scrape._backoff_delay(i))
+    if not result:
+        warnings.warn(
+            (
+                f"Unable to retrieve PMCID {pmcid} from PMC. May be due to "
+                "HTTP traffic or broken XML formatting, try again later if "
+                "the former."
+            ),
+            pubmedHTTPError,
+        )
+        return None
+    return result
+
+
 # --------------------PAPER OBJECT SCHEMA-------------------------------------
 class Paper:
     """
@@ -98,47 +128,56 @@ class Paper:
         current_day = current_datetime.day
         self.last_updated = (current_month, current_day, current_year)
 
-        # read in the Paper data from the parsed paper_dict
+        # read in the Paper data from the parsed paper_dict. Fields which were
+        # not extracted (see parse.PAPER_DICT_FIELDS) are left as None.
+        self.fields = [
+            field for field in parse.PAPER_DICT_FIELDS if field in paper_dict
+        ]
         self.pmcid = paper_dict["PMCID"]
-        self.title = paper_dict["Title"]
-        self.authors = paper_dict["Authors"]
-        self.non_author_contributors = paper_dict["Non-Author Contributors"]
-        self.abstract = paper_dict["Abstract"]
-        self.body = paper_dict["Body"]
-        self.journal_id = paper_dict["Journal ID"]
-        self.journal_title = paper_dict["Journal Title"]
-        self.issn = paper_dict["ISSN"]
-        self.publisher_name = paper_dict["Publisher Name"]
-        self.publisher_location = paper_dict["Publisher Location"]
-        self.article_id = paper_dict["Article ID"]
-        self.article_types = paper_dict["Article Types"]
-        self.article_categories = paper_dict["Article Categories"]
-        self.published_date = paper_dict["Published Date"]
-        self.volume = paper_dict["Volume"]
-        self.issue = paper_dict["Issue"]
-        self.fpage = paper_dict["First Page"]
-        self.lpage = paper_dict["Last Page"]
-        self.permissions = paper_dict["Permissions"]
+        self.title = paper_dict.get("Title")
+        self.authors = paper_dict.get("Authors")
+        self.non_author_contributors = paper_dict.get("Non-Author Contributors")
+        self.abstract = paper_dict.get("Abstract")
+        self.body = paper_dict.get("Body")
+        self.journal_id = paper_dict.get("Journal ID")
+        self.journal_title = paper_dict.get("Journal Title")
+        self.issn = paper_dict.get("ISSN")
+        self.publisher_name = paper_dict.get("Publisher Name")
+        self.publisher_location = paper_dict.get("Publisher Location")
+        self.article_id = paper_dict.get("Article ID")
+        self.article_types = paper_dict.get("Article Types")
+        self.article_categories = paper_dict.get("Article Categories")
+        self.published_date = paper_dict.get("Published Date")
+        self.volume = paper_dict.get("Volume")
+        self.issue = paper_dict.get("Issue")
+        self.fpage = paper_dict.get("First Page")
+        self.lpage = paper_dict.get("Last Page")
+        self.permissions = paper_dict.get("Permissions")
         if self.permissions:
             self.copyright = self.permissions["Copyright Statement"]
             self.license = self.permissions["License Type"]
         else:
             self.copyright = None
             self.license = None
-        self.funding = paper_dict["Funding"]
-        self.footnote = paper_dict["Footnote"]
-        self.acknowledgements = paper_dict["Acknowledgements"]
-        self.notes = paper_dict["Notes"]
-        self.custom_meta = paper_dict["Custom Meta"]
-        self.ref_map = paper_dict["Ref Map"]
-        self._ref_map_with_tags = paper_dict["Ref Map With Tags"]
-        self.citations = paper_dict["Citations"]
-        self.tables = paper_dict["Tables"]
-        self.figures = paper_dict["Figures"]
+        self.funding = paper_dict.get("Funding")
+        self.footnote = paper_dict.get("Footnote")
+        self.acknowledgements = paper_dict.get("Acknowledgements")
+        self.notes = paper_dict.get("Notes")
+        self.custom_meta = paper_dict.get("Custom Meta")
+        self.ref_map = paper_dict.get("Ref Map")
+        self._ref_map_with_tags = paper_dict.get("Ref Map With Tags")
+        self.citations = paper_dict.get("Citations")
+        self.tables = paper_dict.get("Tables")
+        self.figures = paper_dict.get("Figures")
 
         self.data_dict = parse.define_data_dict()
 
         self.vector_collection = None
+        # BM25 index of the vector collection's chunks, for lexical queries
+        self.lexical_index = None
+        self._embedding_fn = None
+        # full text the vector collection's chunk offsets point into
+        self._vector_text = None
 
         return None
 
@@ -152,6 +191,10 @@ class Paper:
         verbose: bool = False,
         suppress_warnings: bool = False,
         suppress_errors: bool = False,
+        cache: scrape.xmlCache = None,
+        fields: List[str] = None,
+        strip_text_styling: bool = True,
+        strip_method: str = "regex",
     ):
         """
         Generate a Paper from a PMCID with optional parameters.
@@ -167,36 +210,38 @@ class Paper:
             XML data. Recommended to suppress when parsing many XMLs at once.
         :param bool suppress_errors: Return None on failed XML parsing, instead of
             raising an error.
+        :param xmlCache cache: Optional on-disk cache to serve the XML from, and
+            to store a newly downloaded XML in.
+        :param List[str] fields: Fields to extract, from
+            `parse.PAPER_DICT_FIELDS`, ie. `parse.METADATA_FIELDS` to skip text,
+            table, citation, and figure parsing. Fields not extracted are None.
+            Default is None (every field).
+        :param bool strip_text_styling: Whether or not to clean common HTML
+            text styling from the XML (HIGHLY RECOMMENDED).
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string`. Default is "regex".
 
         :return: A Paper object initialized via the passed PMCID and
             optional parameters.
         :rtype: Paper
         """
-        NUM_TRIES = 3
-        paper_dict = None
-        for i in range(NUM_TRIES):
-            try:
-                paper_dict = parse.paper_dict_from_pmc(
-                    pmcid=pmcid,
-                    email=email,
-                    download=download,
-                    validate=validate,
-                    verbose=verbose,
-                    suppress_warnings=suppress_warnings,
-                    suppress_errors=suppress_errors,
-                )
-                break
-            except HTTPError:
-                time.sleep(5)
-        if not paper_dict:
-            warnings.warn(
-                (
-                    f"Unable to retrieve PMCID {pmcid} from PMC. May be due to "
-                    "HTTP traffic or broken XML formatting, try again later if "
-                    "the former."
-                ),
-                pubmedHTTPError,
-            )
+        paper_dict = _retrieve_from_pmc(
+            pmcid,
+            lambda: parse.paper_dict_from_pmc(
+                pmcid=pmcid,
+                email=email,
+                download=download,
+                validate=validate,
+                verbose=verbose,
+                suppress_warnings=suppress_warnings,
+                suppress_errors=suppress_errors,
+                cache=cache,
+                fields=fields,
+                strip_text_styling=strip_text_styling,
+                strip_method=strip_method,
+            ),
+        )
+        if paper_dict is None:
             return None
         return cls(paper_dict)
 
@@ -208,6 +253,8 @@ class Paper:
         verbose: bool = False,
         suppress_warnings: bool = False,
         suppress_errors: bool = False,
+        engine: str = "xpath",
+        fields: List[str] = None,
     ):
         """
         Generate a Paper straight from PMC XML.
@@ -225,6 +272,12 @@ class Paper:
             instead of raising an error.
             Recommended to suppress when parsing many XMLs at once, unless
             failure is not an option.
+        :param str engine: "xpath" to query the tree once per field, or "walk"
+            to walk the tree once for all fields (faster on large papers).
+        :param List[str] fields: Fields to extract, from
+            `parse.PAPER_DICT_FIELDS`, ie. `parse.METADATA_FIELDS` to skip text,
+            table, citation, and figure parsing. Fields not extracted are None.
+            Default is None (every field).
 
         :returns: A Paper object initialized via the passed XML.
         :rtype: Paper
@@ -235,9 +288,78 @@ class Paper:
             verbose=verbose,
             suppress_warnings=suppress_warnings,
             suppress_errors=suppress_errors,
+            engine=engine,
+            fields=fields,
         )
         return cls(paper_dict)
 
+    # ---------------------------Tables-------------------------------------
+    @property
+    def tables(self) -> List:
+        """
+        The paper's tables, as pandas Stylers captioned with each table's
+        label and caption (or pd.DataFrames, if a table has neither). Tables
+        which could not be read are None.
+
+        Tables are kept as compact `table_records`, and only turned into
+        dataframes on first access.
+        """
+        if self._tables is None and self._table_records is not None:
+            self._tables = [
+                None if record is None else record.to_table()
+                for record in self._table_records
+            ]
+        return self._tables
+
+    @tables.setter
+    def tables(self, tables: List) -> None:
+        """
+        Set the paper's tables, from tableRecords (built into dataframes on
+        access), or from pd.DataFrames or Stylers (kept as they are, and
+        recorded with their cells as strings).
+        """
+        if tables is None:
+            self._table_records = None
+            self._tables = None
+            return None
+
+        tables = list(tables)
+        self._table_records = [
+            table
+            if table is None or isinstance(table, tableRecord)
+            else tableRecord.from_table(table)
+            for table in tables
+        ]
+        self._tables = None
+        if any(
+            table is not None and not isinstance(table, tableRecord) for table in tables
+        ):
+            self._tables = [
+                table.to_table() if isinstance(table, tableRecord) else table
+                for table in tables
+            ]
+        return None
+
+    @property
+    def table_records(self) -> List[tableRecord]:
+        """
+        The paper's tables, as compact tableRecords of their label, caption,
+        and cell text. Used by the export paths, which never build dataframes.
+        """
+        return self._table_records
+
+    def __getstate__(self):
+        """
+        Pickle without the dataframes built from `table_records`, which are
+        rebuilt on access.
+        """
+        state = self.__dict__.copy()
+        if state.get("_table_records") is not None:
+            state["_tables"] = None
+        return state
+
+    # -------------------------End Tables-----------------------------------
+
     def info(self) -> Dict[str, str]:
         """
         Return the data definition dictionary.
@@ -431,12 +553,14 @@ class Paper:
             "Custom_Meta": self.custom_meta,
             "Ref_Map": self.ref_map,
             "Citations": [
-                self._serialize_dict(c) for c in self.citations if isinstance(c, dict)
+                self._serialize_dict(c)
+                for c in self.citations or []
+                if isinstance(c, dict)
             ],
             "Tables": [
-                self._serialize_df(t)
-                for t in self.tables
-                if isinstance(t, (pd.io.formats.style.Styler, pd.DataFrame))
+                record.to_dict()
+                for record in self.table_records or []
+                if record is not None
             ],
             "Figures": self.figures,
         }
@@ -467,36 +591,42 @@ class Paper:
         """
         return "; ".join([f"{key}: {value}" for key, value in data_dict.items()])
 
-    def _serialize_df(self, df):
-        """
-        Serialize a DataFrame into an HTML string.
-
-        :param df: The DataFrame to serialize.
-        :type df: pd.DataFrame
-        :return: An HTML representation of the serialized DataFrame.
-        :rtype: str
-        """
-
-        return df.to_html()
-
     # ---------------End Helper functions for to_relational--------------------
 
     def vectorize(
-        self, chunk_size: int = 100, chunk_overlap: int = 20, refresh: bool = False
+        self,
+        chunk_size: int = 100,
+        chunk_overlap: int = 20,
+        refresh: bool = False,
+        embedding_fn: Callable = None,
+        embed_batch_size: int = _vector.DEFAULT_EMBED_BATCH_SIZE,
     ):
         """
         Generate an in-memory vector database representation of the paper.
 
         This method generates an in-memory vector database representation of the
         paper, stored in `paper.vector_collection`. It focuses on vectorizing the
-        abstract and body text.
+        abstract and body text. Papers share one in-memory Chroma client, see
+        `paperSet.vectorize` for a persistent index across Papers. A BM25 index
+        of the same chunks is stored in `paper.lexical_index`, for lexical and
+        fused queries.
 
         :param int chunk_size: An approximate chunk size to split the paper into
             (measured in characters).
         :param int chunk_overlap: An approximate desired chunk overlap
             (measured in characters).
         :param bool refresh: Whether or not to clear and re-vectorize the paper
-            with new settings.
+            with new settings. Required to change the chunk settings or
+            embedding function of a vectorized paper, otherwise a ValueError
+            is raised.
+        :param Callable embedding_fn: A local embedding function, called with
+            lists of chunk texts and returning one embedding per text, ie.
+            `scrapemed._vector.hashingEmbedder()` (offline) or a preloaded
+            sentence-transformer's `encode`. Also used by `Paper.query()`.
+            Default is None, Chroma's default embedding function, which
+            downloads a model on first use.
+        :param int embed_batch_size: Number of chunks per call to
+            embedding_fn. Batches run on a shared thread pool. Default is 32.
 
         :return: None
         """
@@ -510,46 +640,37 @@ class Paper:
             return None
 
         print("Vectorizing Paper (This may take a little while)...")
-        if len(self.full_text()) == 0:
+        self._vector_text = self.full_text()
+        if len(self._vector_text) == 0:
             warnings.warn(
                 "Attempted to vectorize a Paper with no text. Aborting.",
                 emptyTextWarning,
             )
             return None
 
-        # Set up an in-memory chromadb collection for this paper
-        client = chromadb.Client()
+        # Set up a collection for this paper, on the shared in-memory client
         try:
-            self.vector_collection = client.get_or_create_collection(
-                f"Paper-PMCID-{self.pmcid}"
-            )
+            collection_name = f"Paper-PMCID-{self.pmcid}"
         except AttributeError:
-            self.vector_collection = client.get_or_create_collection(
-                f"Paper-Random-UUID-{uuid.uuid4()}"
-            )
+            collection_name = f"Paper-Random-UUID-{uuid.uuid4()}"
+        self.vector_collection = _vector.get_collection(
+            name=collection_name, refresh=refresh
+        )
 
-        # setup chunk model
-        chunk_model = CharacterTextSplitter(
-            separator="\\n\\n|\\n|\\.|\\s",
-            is_separator_regex=True,
+        # chunk the text, tagging each chunk with the PMCID and section it
+        # originates from, and its offsets into the text, and upload the
+        # chunks into the vector collection and the lexical index
+        self.lexical_index = _lexical.bm25Index()
+        _vector.add_papers(
+            self.vector_collection,
+            [self],
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
-            keep_separator=True,
+            embedding_fn=embedding_fn,
+            embed_batch_size=embed_batch_size,
+            lexical_index=self.lexical_index,
         )
-
-        # chunk the text, add metadata for the PMCID each chunk
-        # originates from, add unique chunk ids
-        p_chunks = chunk_model.split_text(self.full_text())
-        p_metadatas = [{"pmcid": self.pmcid}] * len(p_chunks)
-        try:
-            pmcid = self.pmcid
-        except AttributeError:
-            pmcid = uuid.uuid4()
-        p_ids = [self._generate_chunk_id(pmcid, i) for i in range(len(p_chunks))]
-
-        # upload the chunked texts into the vector collection
-        self.vector_collection.add(documents=p_chunks, metadatas=p_metadatas, ids=p_ids)
+        self._embedding_fn = embedding_fn
 
         print(
             (
@@ -572,7 +693,7 @@ class Paper:
         :return: A unique chunk ID.
         :rtype: str
         """
-        return f"pmcid-{pmcid}-chunk-{str(index)}"
+        return _vector.chunk_id(pmcid, index)
 
     def _get_chunk_index_from_chunk_id(self, chunk_id: str) -> str:
         """
@@ -609,7 +730,13 @@ class Paper:
     # -----------------end helper funcs for self.vectorize-----------------
 
     def query(
-        self, query: str, n_results: int = 1, n_before: int = 2, n_after: int = 2
+        self,
+        query: str,
+        n_results: int = 1,
+        n_before: int = 2,
+        n_after: int = 2,
+        embedding_fn: Callable = None,
+        mode: str = "dense",
     ) -> Dict[str, str]:
         """
         Query the paper with natural language questions.
@@ -621,6 +748,13 @@ class Paper:
             in the combined output.
         :param int n_after: The number of chunks after the match to include in
             the combined output.
+        :param Callable embedding_fn: The local embedding function to embed
+            the query with. Default is None, the one passed to
+            `self.vectorize()`, if any.
+        :param str mode: How to match chunks: "dense" by embedding similarity,
+            "lexical" by BM25 score (best for exact terms, ie. gene names and
+            drug codes), or "fused", by reciprocal rank fusion of both.
+            Default is "dense".
 
         :return: A dictionary with keys representing the most semantically
             similar result chunk(s) and values representing the paper text(s)
@@ -631,14 +765,99 @@ class Paper:
         """
 
         result = self.expanded_query(
-            query=query, n_results=n_results, n_before=n_before, n_after=n_after
+            query=query,
+            n_results=n_results,
+            n_before=n_before,
+            n_after=n_after,
+            embedding_fn=embedding_fn,
+            mode=mode,
         )
 
         return result
 
+    def query_many(
+        self,
+        queries: List[str],
+        n_results: int = 1,
+        n_before: int = 2,
+        n_after: int = 2,
+        embedding_fn: Callable = None,
+        mode: str = "dense",
+    ) -> List[Dict[str, str]]:
+        """
+        Query the paper with a batch of natural language questions/queries.
+
+        All queries are matched in one call to the vector collection, and the
+        chunks around all of their matches are looked up in one more, so this
+        is much faster than calling `self.query()` per query.
+
+        :param List[str] queries: The natural language queries.
+        :param int n_results: The number of most semantically similar paper
+            sections to retrieve per query.
+        :param int n_before: The number of chunks before each match to include
+            in the combined output.
+        :param int n_after: The number of chunks after each match to include
+            in the combined output.
+        :param Callable embedding_fn: The local embedding function to embed
+            the queries with. Default is None, the one passed to
+            `self.vectorize()`, if any.
+        :param str mode: "dense", "lexical", or "fused", see `self.query()`.
+            Default is "dense".
+
+        :return: For each query, in order, the result of `self.query()` for
+            it: a dictionary with keys representing the most semantically
+            similar result chunk(s) and values representing the expanded paper
+            text(s) around the result chunk(s).
+        :rtype: List[dict[str, str]]
+        """
+        # if the paper has not already been vectorized, vectorize
+        if not self.vector_collection:
+            self.vectorize(embedding_fn=embedding_fn)
+        # if vectorization fails, abort
+        if not self.vector_collection:
+            return None
+        if embedding_fn is None:
+            embedding_fn = self._embedding_fn
+
+        matches = _vector.query_collection_many(
+            self.vector_collection,
+            queries,
+            n_results=n_results,
+            embedding_fn=embedding_fn,
+            mode=mode,
+            lexical_index=self.lexical_index,
+        )
+        # the chunks before and after every match, in one lookup
+        expanded = _vector.neighbour_metadatas(
+            self.vector_collection,
+            [hit["Chunk_ID"] for hits in matches for hit in hits],
+            n_before,
+            n_after,
+        )
+
+        results = []
+        for hits in matches:
+            cleaned_results = {}
+            # the expanded text is one slice of the vectorized text, spanning
+            # the offsets of the chunks
+            for hit in hits:
+                id = hit["Chunk_ID"]
+                combined_result = _vector.stitch(self._vector_text, expanded[id])
+                if combined_result is not None:
+                    cleaned_results[f"Match on {id}"] = "..." + combined_result + "..."
+            results.append(cleaned_results)
+
+        return results
+
     # -----------------helper funcs for self.query----------------------
     def expanded_query(
-        self, query: str, n_results: int = 1, n_before: int = 2, n_after: int = 2
+        self,
+        query: str,
+        n_results: int = 1,
+        n_before: int = 2,
+        n_after: int = 2,
+        embedding_fn: Callable = None,
+        mode: str = "dense",
     ) -> Dict[str, str]:
         """
         Query the paper with an expanded natural language question/query.
@@ -654,89 +873,302 @@ class Paper:
             in the combined output.
         :param int n_after: The number of chunks after the match to include
             in the combined output.
+        :param Callable embedding_fn: The local embedding function to embed
+            the query with. Default is None, the one passed to
+            `self.vectorize()`, if any.
+        :param str mode: "dense", "lexical", or "fused", see `self.query()`.
+            Default is "dense".
 
         :return: A dictionary with keys representing the most semantically
             similar result chunk(s) and values representing the expanded paper
             text(s) around the result chunk(s).
         :rtype: dict[str, str]
         """
-        # if the paper has not already been vectorized, vectorize
-        if not self.vector_collection:
-            self.vectorize()
-        # if vectorization fails, abort
-        if not self.vector_collection:
+        results = self.query_many(
+            [query],
+            n_results=n_results,
+            n_before=n_before,
+            n_after=n_after,
+            embedding_fn=embedding_fn,
+            mode=mode,
+        )
+        if results is None:
             return None
+        return results[0]
+
+
+# --------------------END PAPER OBJECT SCHEMA-------------------------------
+
+
+# --------------------LAZY PAPER---------------------------------------------
+# Paper attributes set from each paper dict field
+FIELD_ATTRIBUTES = {
+    "PMCID": ["pmcid"],
+    "Title": ["title"],
+    "Authors": ["authors"],
+    "Non-Author Contributors": ["non_author_contributors"],
+    "Abstract": ["abstract"],
+    "Body": ["body"],
+    "Journal ID": ["journal_id"],
+    "Journal Title": ["journal_title"],
+    "ISSN": ["issn"],
+    "Publisher Name": ["publisher_name"],
+    "Publisher Location": ["publisher_location"],
+    "Article ID": ["article_id"],
+    "Article Types": ["article_types"],
+    "Article Categories": ["article_categories"],
+    "Published Date": ["published_date"],
+    "Volume": ["volume"],
+    "Issue": ["issue"],
+    "First Page": ["fpage"],
+    "Last Page": ["lpage"],
+    "Permissions": ["permissions", "copyright", "license"],
+    "Funding": ["funding"],
+    "Footnote": ["footnote"],
+    "Acknowledgements": ["acknowledgements"],
+    "Notes": ["notes"],
+    "Custom Meta": ["custom_meta"],
+    "Ref Map With Tags": ["_ref_map_with_tags"],
+    "Ref Map": ["ref_map"],
+    "Citations": ["citations"],
+    "Tables": ["_table_records", "_tables"],
+    "Figures": ["figures"],
+}
+_LAZY_ATTRIBUTES = {
+    attribute for attributes in FIELD_ATTRIBUTES.values() for attribute in attributes
+}
+
+
+class LazyPaper(Paper):
+    """
+    A Paper which parses only some fields up front (by default, the cheap
+    metadata fields), and keeps its XML, serialized, to parse the rest on
+    first access.
 
-        result = self.vector_collection.query(
-            query_texts=[query], include=["documents"], n_results=n_results
+    Accessing any field which was not parsed up front, ie. `paper.body` or
+    `paper.tables`, parses all of the remaining fields at once. They are then
+    kept like any other Paper attribute, and the XML is released. Listing or
+    filtering many LazyPapers by metadata never pays for text, table,
+    citation, or figure parsing.
+
+    Note that `to_relational` (and so adding a LazyPaper to a paperSet)
+    accesses every field.
+
+    :Example:
+
+    >>> paper = LazyPaper.from_xml(pmcid, root)
+    >>> paper.title  # parsed up front
+    >>> paper.tables  # parses the remaining fields
+    """
+
+    def __init__(
+        self,
+        paper_dict: dict,
+        xml: bytes = None,
+        verbose: bool = False,
+        suppress_warnings: bool = False,
+        suppress_errors: bool = False,
+        engine: str = "xpath",
+    ) -> None:
+        """
+        Initialize a LazyPaper with the fields parsed so far.
+
+        :param dict paper_dict: A dictionary of the fields parsed so far,
+            typically from parse.generate_paper_dict with `fields` set.
+        :param bytes xml: The serialized XML of the paper, to parse the
+            remaining fields from. If None, fields not in paper_dict are None,
+            as for a Paper.
+        :param bool verbose: Whether to have verbose output when parsing the
+            remaining fields.
+        :param bool suppress_warnings: Whether to suppress warnings when
+            parsing the remaining fields.
+        :param bool suppress_errors: Whether to leave the remaining fields as
+            None if parsing them fails, instead of raising an error.
+        :param str engine: "xpath" or "walk", see parse.generate_paper_dict.
+        """
+        super().__init__(paper_dict)
+        if not self.has_data or xml is None:
+            self._xml = None
+            return None
+
+        self._xml = xml
+        self._parse_options = {
+            "verbose": verbose,
+            "suppress_warnings": suppress_warnings,
+            "suppress_errors": suppress_errors,
+            "engine": engine,
+        }
+        # unset the fields which were not parsed, so that accessing them
+        # falls through to __getattr__
+        for field in self._missing_fields():
+            for attribute in FIELD_ATTRIBUTES[field]:
+                del self.__dict__[attribute]
+
+        return None
+
+    @classmethod
+    def from_xml(
+        cls,
+        pmcid: int,
+        root: ET.Element,
+        verbose: bool = False,
+        suppress_warnings: bool = False,
+        suppress_errors: bool = False,
+        engine: str = "xpath",
+        fields: List[str] = None,
+    ):
+        """
+        Generate a LazyPaper straight from PMC XML.
+
+        :param int pmcid: PMCID for the XML.
+        :param ET.Element root: Root element of the PMC XML tree.
+        :param bool verbose: Report verbose output or not.
+        :param bool suppress_warnings: Suppress warnings while parsing XML or not.
+        :param bool suppress_errors: Return None on failed XML parsing,
+            instead of raising an error.
+        :param str engine: "xpath" or "walk", see `Paper.from_xml`.
+        :param List[str] fields: Fields to parse up front, from
+            `parse.PAPER_DICT_FIELDS`. The rest are parsed on first access.
+            Default is None (`parse.METADATA_FIELDS`).
+
+        :returns: A LazyPaper object initialized via the passed XML.
+        :rtype: LazyPaper
+        """
+        paper_dict = parse.generate_paper_dict(
+            pmcid,
+            root,
+            verbose=verbose,
+            suppress_warnings=suppress_warnings,
+            suppress_errors=suppress_errors,
+            engine=engine,
+            fields=fields if fields is not None else parse.METADATA_FIELDS,
+        )
+        return cls(
+            paper_dict,
+            ET.tostring(root),
+            verbose=verbose,
+            suppress_warnings=suppress_warnings,
+            suppress_errors=suppress_errors,
+            engine=engine,
         )
 
-        expanded_results = {}
-        for id in result["ids"][0]:
-            chunk_index = self._get_chunk_index_from_chunk_id(id)
-            pmcid = self._get_pmcid_from_chunk_id(id)
-            # get the texts before and after the result chunk
-            expanded_ids = []
-            for i in range(1, n_before + 1):
-                expanded_ids.append(
-                    self._generate_chunk_id(pmcid, int(chunk_index) - i)
-                )
-            expanded_ids.append(id)
-            for i in range(1, n_after + 1):
-                expanded_ids.append(
-                    self._generate_chunk_id(pmcid, int(chunk_index) + i)
-                )
+    @classmethod
+    def from_pmc(
+        cls,
+        pmcid: int,
+        email: str,
+        download: bool = False,
+        validate: bool = True,
+        verbose: bool = False,
+        suppress_warnings: bool = False,
+        suppress_errors: bool = False,
+        cache: scrape.xmlCache = None,
+        fields: List[str] = None,
+        strip_text_styling: bool = True,
+        strip_method: str = "regex",
+    ):
+        """
+        Generate a LazyPaper from a PMCID, keeping its XML to parse the
+        remaining fields on first access.
 
-            expanded_results[f"Match on {id}"] = self.vector_collection.get(
-                ids=expanded_ids,
-            )["documents"]
-
-        cleaned_results = {}
-        # append docs together two at a time, removing overlap
-        for match, docs in expanded_results.items():
-            combined_result = ""
-            # combined docs together
-            if len(docs) == 0:
-                combined_result = None
-            elif len(docs) == 1:
-                combined_result = docs[0]
-            else:
-                # combine first two docs, removing overlap, to
-                # start the combined result
-                substring_match = SequenceMatcher(
-                    None, docs[0], docs[1]
-                ).find_longest_match(0, len(docs[0]), 0, len(docs[1]))
-                combined_docs = (
-                    docs[0][: substring_match.a] + docs[1][substring_match.b :]
-                )
-                combined_result += combined_docs
-                # eat these first two docs
-                if len(docs) >= 3:
-                    docs = docs[2:]
-                else:
-                    docs = []
-                # continue eating the rest one by one
-                while len(docs) >= 1:
-                    substring_match = SequenceMatcher(None, combined_result, docs[0])
+        :param int pmcid: Unique PMCID for the article to parse.
+        :param str email: Provide your email address for authentication with PMC.
+        :param bool download: Whether or not to download the XML retrieved from PMC.
+        :param bool validate: Whether or not to validate the XML from PMC against NLM
+            articleset 2.0 DTD (HIGHLY RECOMMENDED).
+        :param bool verbose: Whether or not to have verbose output for testing.
+        :param bool suppress_warnings: Whether to suppress warnings while parsing XML.
+        :param bool suppress_errors: Return None on failed XML parsing, instead of
+            raising an error.
+        :param xmlCache cache: Optional on-disk cache to serve the XML from, and
+            to store a newly downloaded XML in.
+        :param List[str] fields: Fields to parse up front, from
+            `parse.PAPER_DICT_FIELDS`. The rest are parsed on first access.
+            Default is None (`parse.METADATA_FIELDS`).
+        :param bool strip_text_styling: Whether or not to clean common HTML
+            text styling from the XML (HIGHLY RECOMMENDED).
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string`. Default is "regex".
+
+        :return: A LazyPaper object initialized via the passed PMCID and
+            optional parameters.
+        :rtype: LazyPaper
+        """
+        tree = _retrieve_from_pmc(
+            pmcid,
+            lambda: scrape.get_xml(
+                pmcid=pmcid,
+                email=email,
+                download=download,
+                validate=validate,
+                strip_text_styling=strip_text_styling,
+                verbose=verbose,
+                cache=cache,
+                strip_method=strip_method,
+            ),
+        )
+        if tree is None:
+            return None
+        return cls.from_xml(
+            pmcid,
+            tree.getroot(),
+            verbose=verbose,
+            suppress_warnings=suppress_warnings,
+            suppress_errors=suppress_errors,
+            fields=fields,
+        )
 
-                    substring_match = substring_match.find_longest_match(
-                        0, len(combined_result), 0, len(docs[0])
-                    )
+    def __getattr__(self, name: str):
+        """
+        Parse the remaining fields on first access to any of them.
+        """
+        # only called for attributes which are not set
+        if name not in _LAZY_ATTRIBUTES or self.__dict__.get("_xml") is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        self.load()
+        return self.__dict__[name]
 
-                    combined_result = (
-                        combined_result[: substring_match.a]
-                        + docs[0][substring_match.b :]
-                    )
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Whether every field has been parsed.
+        """
+        return self._xml is None
 
-                    # eat the processed doc
-                    if len(docs) >= 2:
-                        docs = docs[1:]
-                    else:
-                        docs = []
+    def load(self) -> None:
+        """
+        Parse every field which has not been parsed yet, from the kept XML,
+        then release the XML.
 
-                cleaned_results[match] = "..." + combined_result + "..."
+        :return: None
+        """
+        if self.is_loaded:
+            return None
+
+        missing = self._missing_fields()
+        paper_dict = parse.generate_paper_dict(
+            self.pmcid,
+            ET.fromstring(self._xml),
+            fields=missing,
+            **self._parse_options,
+        )
+        # parse the fields as a Paper would, leaving them None on a failed parse
+        loaded = Paper(paper_dict or {"PMCID": self.pmcid})
+        for field in missing:
+            for attribute in FIELD_ATTRIBUTES[field]:
+                setattr(self, attribute, getattr(loaded, attribute))
+        self.fields = list(parse.PAPER_DICT_FIELDS)
+        self._xml = None
 
-        return cleaned_results
+        return None
 
+    def _missing_fields(self) -> List[str]:
+        """
+        Fields of the paper dict which have not been parsed yet.
+        """
+        return [field for field in parse.PAPER_DICT_FIELDS if field not in self.fields]
 
-# --------------------END PAPER OBJECT SCHEMA-------------------------------
+
+# --------------------END LAZY PAPER-----------------------------------------
@@ -8,14 +8,32 @@ This is the main endpoint for ScrapeMed users like data scientists and data engi
 Functions for structured data generation, scraping PMC via both PMCID lists and
 advanced PMC term searches.
 
+Corpora too large to hold in memory can be streamed with
+`paperSet.iter_from_pmcid_list`, writing relational rows to an on-disk
+:class:`paperSink` in bounded-size chunks, or persisted to a SQL database
+with :class:`scrapemed.store.paperStore`. The text of a paperSet's Papers can
+be added to one persistent vector index with `paperSet.vectorize`, and queried
+across the whole corpus with `paperSet.query`.
+
 """
 
 import scrapemed.scrape as scrape
-from scrapemed.paper import Paper
+import scrapemed._parse as parse
+import scrapemed._arrow as _arrow
+import scrapemed._vector as _vector
+import scrapemed._lexical as _lexical
+from scrapemed.paper import Paper, LazyPaper
+from scrapemed.utils import pmcid_as_int
 import pandas as pd
-from typing import Union, List
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
+import os
+import warnings
+from typing import Callable, Union, List, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:  # sqlalchemy is slow to import, and only needed with a store
+    from scrapemed.store import paperStore
+
+# file name prefix of paperSink chunk files
+SINK_CHUNK_PREFIX = "papers-chunk-"
 
 
 class paperSet:
@@ -30,20 +48,46 @@ class paperSet:
 
     Methods:
     - from_search(email, term, retmax=10, verbose=False,
-        suppress_warnings=True, suppress_errors=True): Generate a paperSet
-        via a PMC search.
+        suppress_warnings=True, suppress_errors=True, cache=None,
+        fields=None): Generate a paperSet via a PMC search.
     - from_pmcid_list(pmcids, email, download=False, validate=True,
         strip_text_styling=True, verbose=False, suppress_warnings=True,
-        suppress_errors=True): Generate a paperSet via a list of PMCIDs.
+        suppress_errors=True, batch_size=None, cache=None, workers=None,
+        fields=None, strip_method="regex"): Generate a paperSet via a list
+        of PMCIDs.
+    - iter_from_pmcid_list(pmcids, email, ..., as_rows=False, sink=None,
+        fields=None, lazy=False, strip_method="regex"):
+        Stream Papers (or relational rows) one at a time, optionally writing
+        rows to an on-disk paperSink.
+    - from_store(store, query=None): Generate a paperSet from Papers
+        persisted in a paperStore.
+    - iter_from_store(store, query=None): Stream Papers persisted in a
+        paperStore one batch at a time, without building a paperSet.
     - to_df(): Return a pandas DataFrame representation of the paperSet.
+    - to_arrow(): Return typed Arrow tables of the papers and their tables.
+    - to_parquet(path): Write typed Parquet files of the papers and their
+        tables.
+    - to_store(store): Bulk upsert the Papers into a paperStore.
+    - vectorize(path="data/chroma", collection_name="scrapemed-papers",
+        chunk_size=100, chunk_overlap=20, batch_size=256, refresh=False,
+        embedding_fn=None, embed_batch_size=32): Add every Paper's text to
+        one persistent vector collection.
+    - query(query, n_results=5, pmcids=None, n_before=0, n_after=0,
+        embedding_fn=None, mode="dense"): Natural language query across the
+        vectorized Papers.
+    - query_many(queries, n_results=5, pmcids=None, n_before=0, n_after=0,
+        embedding_fn=None, mode="dense"): Natural language queries, in one
+        batch.
     - add_paper(paper): Add a Paper to the paperSet.
     - add_papers(papers): Add multiple Papers to the paperSet.
     - add_pmcid(pmcid, email, download=False, validate=True,
         strip_text_styling=True, verbose=False, suppress_warnings=True,
-        suppress_errors=True): Add a Paper to the paperSet via a PMCID.
+        suppress_errors=True, cache=None, strip_method="regex"): Add a Paper
+        to the paperSet via a PMCID.
     - add_pmcids(pmcids, email, download=False, validate=True,
         strip_text_styling=True, verbose=False, suppress_warnings=True,
-        suppress_errors=True): Add Papers to the paperSet via a list of PMCIDs.
+        suppress_errors=True, cache=None, strip_method="regex"): Add Papers
+        to the paperSet via a list of PMCIDs.
     - visualize(): Generate a general visualization of the paperSet.
     - visualize_unique_values(columns_to_visualize=["Last_Updated",
         "Journal_Title"]): Visualize unique values in specified columns.
@@ -60,10 +104,21 @@ class paperSet:
         for paper in papers:
             if paper:
                 self.papers.append(paper)
+        # (PMCID, last updated) of each paper, matching Paper.__eq__, for
+        # constant time duplicate checks
+        self._paper_keys = {_paper_key(paper) for paper in self.papers}
 
-        # Make a df of the papers
+        # Make a df of the papers. Rows of papers added later are buffered,
+        # and appended in one block when the df is next accessed.
         paper_series_list = [paper.to_relational() for paper in self.papers]
-        self.df = pd.DataFrame(paper_series_list)
+        self._df = pd.DataFrame(paper_series_list)
+        self._pending_rows = []
+
+        # shared vector collection of the papers, see paperSet.vectorize()
+        self.vector_collection = None
+        # BM25 index of the collection's chunks, for lexical queries
+        self.lexical_index = None
+        self._embedding_fn = None
 
         self.index = 0
 
@@ -80,6 +135,8 @@ class paperSet:
         verbose: bool = False,
         suppress_warnings: bool = True,
         suppress_errors: bool = True,
+        cache: scrape.xmlCache = None,
+        fields: List[str] = None,
     ):
         """
         Generate a paperSet via a PMC search.
@@ -92,6 +149,12 @@ class paperSet:
             parsing XML (default is True).
         :param bool suppress_errors: Whether to return None on failed XML
             parsing, instead of raising an error (default is True).
+        :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+            store newly downloaded XMLs in (default is None, no caching).
+        :param List[str] fields: Fields to extract, from
+            `parse.PAPER_DICT_FIELDS`, ie. `parse.METADATA_FIELDS` to skip
+            text, table, citation, and figure parsing (default is None,
+            every field).
 
         :returns: A paperSet generated from the PMC search results.
         :rtype: paperSet
@@ -112,6 +175,8 @@ class paperSet:
                 verbose=verbose,
                 suppress_warnings=suppress_warnings,
                 suppress_errors=suppress_errors,
+                cache=cache,
+                fields=fields,
             )
             for pmcid in pmcid_list
         ]
@@ -129,6 +194,11 @@ class paperSet:
         verbose: bool = False,
         suppress_warnings: bool = True,
         suppress_errors: bool = True,
+        batch_size: int = None,
+        cache: scrape.xmlCache = None,
+        workers: int = None,
+        fields: List[str] = None,
+        strip_method: str = "regex",
     ):
         """
         Generate a paperSet via a list of PMCIDs.
@@ -146,6 +216,20 @@ class paperSet:
             parsing XML (default is True).
         :param bool suppress_errors: Whether to return None on failed XML
             parsing, instead of raising an error (default is True).
+        :param int batch_size: Number of PMCIDs to download per PMC request
+            (default is None, one request per PMCID).
+        :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+            store newly downloaded XMLs in (default is None, no caching).
+        :param int workers: Number of processes to parse the XMLs in, after
+            downloading. Raw XML is shipped to each process and parsed paper
+            data shipped back, in order. Parsing failures are warned per PMCID
+            if errors are suppressed (default is None, parse serially).
+        :param List[str] fields: Fields to extract, from
+            `parse.PAPER_DICT_FIELDS`, ie. `parse.METADATA_FIELDS` to skip
+            text, table, citation, and figure parsing (default is None,
+            every field).
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string` (default is "regex").
 
         :returns: A paperSet generated from the list of PMCIDs.
         :rtype: paperSet
@@ -157,6 +241,33 @@ class paperSet:
             )
         )
 
+        if workers:
+            xml_texts = scrape.get_xml_strings(
+                pmcids=pmcids,
+                email=email,
+                download=download,
+                verbose=verbose,
+                batch_size=batch_size,
+                cache=cache,
+            )
+            paper_dicts = parse.paper_dicts_from_xml_bytes(
+                pmcids,
+                [
+                    xml_text.encode("utf-8") if xml_text is not None else None
+                    for xml_text in xml_texts
+                ],
+                workers=workers,
+                validate=validate,
+                strip_text_styling=strip_text_styling,
+                verbose=verbose,
+                suppress_warnings=suppress_warnings,
+                suppress_errors=suppress_errors,
+                fields=fields,
+                strip_method=strip_method,
+            )
+            paper_list = [Paper(paper_dict) for paper_dict in paper_dicts if paper_dict]
+            return cls(papers=paper_list)
+
         xml_list = scrape.get_xmls(
             pmcids=pmcids,
             email=email,
@@ -164,6 +275,9 @@ class paperSet:
             validate=validate,
             strip_text_styling=strip_text_styling,
             verbose=verbose,
+            batch_size=batch_size,
+            cache=cache,
+            strip_method=strip_method,
         )
         paper_list = [
             Paper.from_xml(
@@ -172,11 +286,215 @@ class paperSet:
                 verbose=verbose,
                 suppress_warnings=suppress_warnings,
                 suppress_errors=suppress_errors,
+                fields=fields,
             )
             for pmcid, xml_root in zip(pmcids, xml_list)
+            if xml_root is not None
         ]
         return cls(papers=paper_list)
 
+    @classmethod
+    def iter_from_pmcid_list(
+        cls,
+        pmcids: List[int],
+        email: str,
+        download: bool = False,
+        validate: bool = True,
+        strip_text_styling: bool = True,
+        verbose: bool = False,
+        suppress_warnings: bool = True,
+        suppress_errors: bool = True,
+        batch_size: int = None,
+        cache: scrape.xmlCache = None,
+        as_rows: bool = False,
+        sink: "paperSink" = None,
+        fields: List[str] = None,
+        lazy: bool = False,
+        strip_method: str = "regex",
+    ) -> Iterator[Union[Paper, pd.Series]]:
+        """
+        Stream Papers from a list of PMCIDs, one at a time, without building
+        a paperSet.
+
+        PMCIDs are downloaded and parsed `batch_size` at a time, so only one
+        batch of XML and Papers is held in memory. Optionally, each Paper's
+        relational row is written to a `paperSink`, which flushes to disk in
+        bounded-size chunks.
+
+        :param List[int] pmcids: List of PMCIDs to stream.
+        :param str email: Use your email to authenticate with PMC.
+        :param bool download: Whether or not to download the XMLs corresponding
+            to PMCIDs (default is False).
+        :param bool validate: Whether or not to validate the XMLs corresponding
+            to PMCIDs (default is True).
+        :param bool strip_text_styling: Whether or not to clean common HTML and
+            other text styling out of the XMLs (default is True).
+        :param bool verbose: Whether to display verbose output (default is False).
+        :param bool suppress_warnings: Whether to suppress warnings while
+            parsing XML (default is True).
+        :param bool suppress_errors: Whether to skip PMCIDs whose XML fails to
+            download, validate, or parse, warning per PMCID, instead of raising
+            an error (default is True).
+        :param int batch_size: Number of PMCIDs to download per PMC request
+            (default is None, one request per PMCID).
+        :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+            store newly downloaded XMLs in (default is None, no caching).
+        :param bool as_rows: Yield relational rows (`Paper.to_relational()`)
+            instead of Papers (default is False).
+        :param paperSink sink: Optional on-disk sink to write each Paper's
+            relational row to. Flushed when the stream ends (default is None).
+        :param List[str] fields: Fields to extract, from
+            `parse.PAPER_DICT_FIELDS`, ie. `parse.METADATA_FIELDS` to skip
+            text, table, citation, and figure parsing (default is None,
+            every field).
+        :param bool lazy: Yield LazyPapers, which parse only `fields` (default
+            `parse.METADATA_FIELDS`) up front, and the rest on first access
+            (default is False). Rows (as_rows or sink) need every field.
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string` (default is "regex").
+
+        :returns: Generator of Papers (or rows), in PMCID order. PMCIDs that
+            could not be retrieved or parsed are skipped.
+        :rtype: Iterator[Union[Paper, pd.Series]]
+
+        Example:
+        ```
+        with paperSink("data/corpus") as sink:
+            for paper in paperSet.iter_from_pmcid_list(pmcids, email, sink=sink):
+                pass  # rows are on disk, read back chunk by chunk
+        for chunk_df in sink.iter_chunks():
+            ...
+        ```
+        """
+        step = batch_size or 1
+        try:
+            for start in range(0, len(pmcids), step):
+                batch = pmcids[start : start + step]
+                try:
+                    xml_texts = scrape.get_xml_strings(
+                        pmcids=batch,
+                        email=email,
+                        download=download,
+                        verbose=verbose,
+                        batch_size=batch_size,
+                        cache=cache,
+                    )
+                except Exception as e:
+                    if not suppress_errors:
+                        raise
+                    for pmcid in batch:
+                        warnings.warn(
+                            f"Retrieving PMCID {pmcid} failed: {e!r}",
+                            scrape.fetchFailureWarning,
+                        )
+                    continue
+                for pmcid, xml_text in zip(batch, xml_texts):
+                    if xml_text is None:
+                        continue
+                    try:
+                        xml_root = scrape._tree_from_xml_string(
+                            pmcid,
+                            xml_text,
+                            validate,
+                            strip_text_styling,
+                            verbose,
+                            strip_method,
+                        )
+                    except Exception as e:
+                        if not suppress_errors:
+                            raise
+                        warnings.warn(
+                            f"Parsing PMCID {pmcid} failed: {e!r}",
+                            parse.parseFailureWarning,
+                        )
+                        continue
+                    if lazy:
+                        paper = LazyPaper.from_xml(
+                            pmcid,
+                            xml_root,
+                            verbose=verbose,
+                            suppress_warnings=suppress_warnings,
+                            suppress_errors=suppress_errors,
+                            fields=fields,
+                        )
+                    else:
+                        paper = Paper.from_xml(
+                            pmcid,
+                            xml_root,
+                            verbose=verbose,
+                            suppress_warnings=suppress_warnings,
+                            suppress_errors=suppress_errors,
+                            fields=fields,
+                        )
+                    if not paper:
+                        continue
+                    if not as_rows and sink is None:
+                        yield paper
+                        continue
+                    row = paper.to_relational()
+                    if sink is not None:
+                        sink.write(row)
+                    yield row if as_rows else paper
+        finally:
+            if sink is not None:
+                sink.flush()
+
+    @classmethod
+    def from_store(cls, store: "paperStore", query=None, batch_size: int = 500):
+        """
+        Generate a paperSet from Papers persisted in a paperStore.
+
+        Every matching Paper is loaded into memory. To stream Papers from a
+        large store instead, use `paperSet.iter_from_store`.
+
+        :param paperStore store: The store to load Papers from.
+        :param query: Optional SQLAlchemy filter on the store's papers table,
+            ie. `store.papers.c.journal_title == "Drugs in R&D"` (default is
+            None, all Papers).
+        :param int batch_size: Number of Papers to read from the store at a
+            time (default is 500).
+
+        :returns: A paperSet of the matching Papers, in PMCID order.
+        :rtype: paperSet
+        """
+        return cls(papers=list(cls.iter_from_store(store, query, batch_size)))
+
+    @classmethod
+    def iter_from_store(
+        cls, store: "paperStore", query=None, batch_size: int = 500
+    ) -> Iterator[Paper]:
+        """
+        Stream Papers persisted in a paperStore, one at a time, without
+        building a paperSet.
+
+        Papers are read from the store `batch_size` at a time, so only one
+        batch of rows and Papers is held in memory.
+
+        :param paperStore store: The store to stream Papers from.
+        :param query: Optional SQLAlchemy filter on the store's papers table,
+            ie. `store.papers.c.journal_title == "Drugs in R&D"` (default is
+            None, all Papers).
+        :param int batch_size: Number of Papers to read from the store at a
+            time (default is 500).
+
+        :returns: Generator of the matching Papers, in PMCID order.
+        :rtype: Iterator[Paper]
+        """
+        yield from store.iter_papers(query, batch_size=batch_size)
+
+    def to_store(self, store: "paperStore", batch_size: int = 500) -> int:
+        """
+        Bulk upsert the paperSet's Papers into a paperStore, keyed by PMCID.
+        Papers whose content is already stored unchanged are skipped.
+
+        :param paperStore store: The store to write Papers to.
+        :param int batch_size: Number of Papers per transaction (default is 500).
+
+        :returns: The number of Papers inserted or updated.
+        :rtype: int
+        """
+        return store.upsert(self.papers, batch_size=batch_size)
+
     def __iter__(self):
         """
         Implement iteration for the paperSet.
@@ -209,6 +527,25 @@ class paperSet:
         else:
             raise IndexError("Index out of range")
 
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        DataFrame of the paperSet, one relational row per Paper.
+
+        Rows of added Papers are appended here lazily, in one block.
+        """
+        if self._pending_rows:
+            self._df = pd.concat(
+                [self._df, pd.DataFrame(self._pending_rows)], ignore_index=True
+            )
+            self._pending_rows = []
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._pending_rows = []
+
     def to_df(self):
         """
         Return a pandas DataFrame representation of the paperSet.
@@ -218,6 +555,282 @@ class paperSet:
         """
         return self.df
 
+    def to_arrow(self, row_group_size: int = _arrow.DEFAULT_ROW_GROUP_SIZE):
+        """
+        Return typed Apache Arrow tables of the paperSet. Requires pyarrow.
+
+        Authors and citations are lists of structs, identifiers and dates are
+        maps, and journal and publisher names are dictionary encoded. Tables
+        found in the Papers are returned as a separate table of tables, one row
+        per table keyed by PMCID.
+
+        :param int row_group_size: Number of Papers per record batch
+            (default is 1000).
+        :returns: A table of papers, and a table of the papers' tables.
+        :rtype: Tuple[pa.Table, pa.Table]
+        """
+        return _arrow.to_arrow(self.papers, row_group_size=row_group_size)
+
+    def to_parquet(
+        self,
+        path: str,
+        tables_path: str = None,
+        row_group_size: int = _arrow.DEFAULT_ROW_GROUP_SIZE,
+    ):
+        """
+        Write the paperSet to typed Parquet files, one row group per
+        `row_group_size` Papers. Requires pyarrow.
+
+        See `to_arrow` for the schema. To export a corpus too large for
+        memory, pass `paperSet.iter_from_pmcid_list(...)` to
+        `scrapemed._arrow.write_parquet` instead.
+
+        :param str path: Path of the papers Parquet file.
+        :param str tables_path: Path of the table of tables Parquet file
+            (default is None, `path` with ".parquet" replaced by
+            ".tables.parquet").
+        :param int row_group_size: Number of Papers per row group
+            (default is 1000).
+        :returns: The paths of the papers and tables Parquet files.
+        :rtype: Tuple[str, str]
+        """
+        return _arrow.write_parquet(
+            self.papers, path, tables_path=tables_path, row_group_size=row_group_size
+        )
+
+    def vectorize(
+        self,
+        path: str = _vector.DEFAULT_VECTOR_PATH,
+        collection_name: str = _vector.DEFAULT_COLLECTION_NAME,
+        chunk_size: int = 100,
+        chunk_overlap: int = 20,
+        batch_size: int = _vector.DEFAULT_BATCH_SIZE,
+        refresh: bool = False,
+        embedding_fn: Callable = None,
+        embed_batch_size: int = _vector.DEFAULT_EMBED_BATCH_SIZE,
+    ) -> int:
+        """
+        Add the abstract and body text of every Paper to one persistent vector
+        collection, stored in `paperSet.vector_collection`, for natural
+        language queries across the paperSet via `paperSet.query()`.
+
+        Chunks are tagged with the PMCID, part (abstract or body), and section
+        title they come from, and embedded `batch_size` at a time. Papers whose
+        chunks are already in the collection, ie. from an earlier run, are
+        skipped, so a growing corpus can be vectorized incrementally. The
+        collection records its chunk settings and embedding function, and
+        vectorizing into it with others raises a ValueError, unless
+        refreshed. Every Paper's chunks go into an in-memory BM25 index,
+        `paperSet.lexical_index`, for lexical and fused queries.
+
+        :param str path: Directory of the persistent Chroma index (default is
+            "data/chroma"). None keeps the index in memory.
+        :param str collection_name: Name of the collection (default is
+            "scrapemed-papers").
+        :param int chunk_size: An approximate chunk size to split the papers
+            into, measured in characters (default is 100).
+        :param int chunk_overlap: An approximate chunk overlap, measured in
+            characters (default is 20).
+        :param int batch_size: Number of chunks to embed per call to Chroma
+            (default is 256).
+        :param bool refresh: Whether to clear the collection and re-vectorize
+            every Paper, ie. with new chunk settings or embedding function
+            (default is False).
+        :param Callable embedding_fn: A local embedding function, called with
+            lists of chunk texts and returning one embedding per text, ie.
+            `scrapemed._vector.hashingEmbedder()` (offline) or a preloaded
+            sentence-transformer's `encode`. Also used by `paperSet.query()`.
+            Default is None, Chroma's default embedding function, which
+            downloads a model on first use.
+        :param int embed_batch_size: Number of chunks per call to
+            embedding_fn. Batches run on a shared thread pool (default is 32).
+
+        :returns: The number of Papers added to the collection.
+        :rtype: int
+
+        :raises ValueError: If the collection was vectorized with other chunk
+            settings or another embedding function, and refresh is False.
+        """
+        print("Vectorizing paperSet (This may take a little while)...")
+        self.vector_collection = _vector.get_collection(
+            path, collection_name, refresh=refresh
+        )
+        self.lexical_index = _lexical.bm25Index()
+        added = _vector.add_papers(
+            self.vector_collection,
+            self.papers,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            batch_size=batch_size,
+            embedding_fn=embedding_fn,
+            embed_batch_size=embed_batch_size,
+            lexical_index=self.lexical_index,
+        )
+        self._embedding_fn = embedding_fn
+        print(
+            f"Done Vectorizing paperSet! Added {added} Papers. Natural language "
+            "query with paperSet.query() now available."
+        )
+        return added
+
+    def query(
+        self,
+        query: str,
+        n_results: int = 5,
+        pmcids: List[int] = None,
+        n_before: int = 0,
+        n_after: int = 0,
+        embedding_fn: Callable = None,
+        mode: str = "dense",
+    ):
+        """
+        Query the paperSet with natural language questions, returning the most
+        semantically similar text chunks across all of its Papers. If the
+        paperSet has not been vectorized yet, it is vectorized into an
+        in-memory collection first; call `paperSet.vectorize()` beforehand to
+        use a persistent one.
+
+        :param str query: The natural language question/query.
+        :param int n_results: The number of chunks to retrieve (default is 5).
+        :param List[int] pmcids: Only retrieve chunks of these PMCIDs (default
+            is None, the paperSet's own Papers, even if the collection is
+            shared with other paperSets).
+        :param int n_before: The number of chunks before each match to include
+            in its Context (default is 0).
+        :param int n_after: The number of chunks after each match to include
+            in its Context (default is 0).
+        :param Callable embedding_fn: The local embedding function to embed
+            the query with (default is None, the one passed to
+            `paperSet.vectorize()`, if any).
+        :param str mode: How to match chunks: "dense" by embedding similarity,
+            "lexical" by BM25 score (best for exact terms, ie. gene names and
+            drug codes), or "fused", by reciprocal rank fusion of both
+            (default is "dense").
+
+        :returns: The matching chunks, most similar first, with columns
+            Chunk_ID, PMCID, Part, Section, Start, End, Text, and Distance.
+            Start and End are the chunk's offsets in `paper.full_text()`.
+            Outside the "dense" mode, a Score column holds the BM25 or fused
+            score the chunks are ranked by, and Distance is None for chunks
+            only matched lexically.
+            If n_before or n_after is set, a Context column holds the text
+            of the match and the chunks around it, or None if the matching
+            Paper is not in the paperSet.
+        :rtype: pd.DataFrame
+        """
+        return self.query_many(
+            [query],
+            n_results=n_results,
+            pmcids=pmcids,
+            n_before=n_before,
+            n_after=n_after,
+            embedding_fn=embedding_fn,
+            mode=mode,
+        )[0]
+
+    def query_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        pmcids: List[int] = None,
+        n_before: int = 0,
+        n_after: int = 0,
+        embedding_fn: Callable = None,
+        mode: str = "dense",
+    ) -> List[pd.DataFrame]:
+        """
+        Query the paperSet with a batch of natural language questions. All
+        queries are matched in one call to the vector collection, and the
+        chunks around all of their matches (if requested) looked up in one
+        more. Vectorizes the paperSet (in memory) first, if needed.
+
+        :param List[str] queries: The natural language questions/queries.
+        :param int n_results: The number of chunks to retrieve per query
+            (default is 5).
+        :param List[int] pmcids: Only retrieve chunks of these PMCIDs (default
+            is None, the paperSet's own Papers, even if the collection is
+            shared with other paperSets).
+        :param int n_before: The number of chunks before each match to include
+            in its Context (default is 0).
+        :param int n_after: The number of chunks after each match to include
+            in its Context (default is 0).
+        :param Callable embedding_fn: The local embedding function to embed
+            the queries with (default is None, the one passed to
+            `paperSet.vectorize()`, if any).
+        :param str mode: "dense", "lexical", or "fused", see
+            `paperSet.query()` (default is "dense").
+
+        :returns: For each query, in order, its matching chunks, as returned
+            by `paperSet.query()`.
+        :rtype: List[pd.DataFrame]
+        """
+        if self.vector_collection is None:
+            self.vectorize(path=None, embedding_fn=embedding_fn)
+        if embedding_fn is None:
+            embedding_fn = self._embedding_fn
+        if pmcids is None:
+            pmcids = [pmcid_as_int(paper.pmcid) for paper in self.papers]
+
+        matches = _vector.query_collection_many(
+            self.vector_collection,
+            queries,
+            n_results=n_results,
+            pmcids=pmcids,
+            embedding_fn=embedding_fn,
+            mode=mode,
+            lexical_index=self.lexical_index,
+        )
+        columns = [
+            "Chunk_ID",
+            "PMCID",
+            "Part",
+            "Section",
+            "Start",
+            "End",
+            "Text",
+            "Distance",
+        ]
+        if mode != "dense":
+            columns.append("Score")
+        if n_before or n_after:
+            self._add_context(matches, n_before, n_after)
+            columns.append("Context")
+        return [pd.DataFrame(hits, columns=columns) for hits in matches]
+
+    # -----------------helper funcs for self.query_many--------------------
+    def _add_context(self, matches: List[List[dict]], n_before: int, n_after: int):
+        """
+        Set the "Context" of each hit to the text spanned by it and the chunks
+        around it, stitched from the full text of its Paper.
+
+        :param List[List[dict]] matches: Hits, as returned by
+            `_vector.query_collection_many`.
+        :param int n_before: The number of chunks before each hit to include.
+        :param int n_after: The number of chunks after each hit to include.
+        """
+        expanded = _vector.neighbour_metadatas(
+            self.vector_collection,
+            [hit["Chunk_ID"] for hits in matches for hit in hits],
+            n_before,
+            n_after,
+        )
+        matched = {hit["PMCID"] for hits in matches for hit in hits}
+        # full text is built once per matching Paper
+        texts = {
+            pmcid_as_int(paper.pmcid): paper.full_text()
+            for paper in self.papers
+            if pmcid_as_int(paper.pmcid) in matched
+        }
+        for hits in matches:
+            for hit in hits:
+                text = texts.get(hit["PMCID"])
+                hit["Context"] = None
+                if text is not None:
+                    hit["Context"] = _vector.stitch(text, expanded[hit["Chunk_ID"]])
+        return None
+
+    # -----------------end helper funcs for self.query_many----------------
+
     def add_paper(self, paper: Paper):
         """
         Add a Paper to the paperSet directly. Returns True if the paper was
@@ -228,12 +841,13 @@ class paperSet:
             the paperSet.
         :rtype: bool
         """
-        if paper not in self.papers:
+        key = _paper_key(paper)
+        if key not in self._paper_keys:
             # caution: comparison of papers is sketchy! Be careful to not
             # duplicate papers in your paperSet
+            self._pending_rows.append(paper.to_relational())
             self.papers.append(paper)
-            new_row = paper.to_relational()
-            self.df = pd.concat([self.df, new_row.to_frame().T], ignore_index=True)
+            self._paper_keys.add(key)
             return True
         print(f"Paper with pmcid={paper.pmcid} already in paperSet.papers.")
         return False
@@ -262,6 +876,8 @@ class paperSet:
         verbose: bool = False,
         suppress_warnings: bool = True,
         suppress_errors: bool = True,
+        cache: scrape.xmlCache = None,
+        strip_method: str = "regex",
     ):
         """
         Add a Paper to the paperSet via PMCID. Returns True if the paper was
@@ -280,6 +896,10 @@ class paperSet:
             parsing XML (default is True).
         :param bool suppress_errors: Whether to return None on failed XML
             parsing, instead of raising an error (default is True).
+        :param xmlCache cache: Optional on-disk cache to serve the XML from, and
+            to store a newly downloaded XML in (default is None, no caching).
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string` (default is "regex").
         :returns: True if the paper was added, False if it was already in
             the paperSet.
         :rtype: bool
@@ -292,6 +912,9 @@ class paperSet:
             verbose=verbose,
             suppress_warnings=suppress_warnings,
             suppress_errors=suppress_errors,
+            cache=cache,
+            strip_text_styling=strip_text_styling,
+            strip_method=strip_method,
         )
         return self.add_paper(paper)
 
@@ -305,6 +928,8 @@ class paperSet:
         verbose: bool = False,
         suppress_warnings: bool = True,
         suppress_errors: bool = True,
+        cache: scrape.xmlCache = None,
+        strip_method: str = "regex",
     ):
         """
         Add Papers to the paperSet via a list of PMCIDs. Returns the number
@@ -324,6 +949,10 @@ class paperSet:
             parsing XML (default is True).
         :param bool suppress_errors: Whether to return None on failed XML
             parsing, instead of raising an error (default is True).
+        :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+            store newly downloaded XMLs in (default is None, no caching).
+        :param str strip_method: How text styling is stripped, "regex" or
+            "tree", see `scrape.xml_tree_from_string` (default is "regex").
         :returns: The number of papers added.
         :rtype: int
         """
@@ -334,9 +963,12 @@ class paperSet:
                 email,
                 download=download,
                 validate=validate,
+                strip_text_styling=strip_text_styling,
                 verbose=verbose,
                 suppress_warnings=suppress_warnings,
                 suppress_errors=suppress_errors,
+                cache=cache,
+                strip_method=strip_method,
             ):
                 count_added += 1
         return count_added
@@ -360,6 +992,9 @@ class paperSet:
         :param List[str] columns_to_visualize: A list of column names to
             visualize (default is ["Last_Updated", "Journal_Title"]).
         """
+        # matplotlib is slow to import, so only import it when used
+        import matplotlib.pyplot as plt
+
         for column in columns_to_visualize:
             if column not in self.df.columns:
                 print(f"Column '{column}' not found in paperSet.df.")
@@ -391,6 +1026,9 @@ class paperSet:
         """
         Visualize a wordcloud of all the Paper titles in the paperSet
         """
+        # visualization dependencies are slow to import, so only import them when used
+        import matplotlib.pyplot as plt
+        from wordcloud import WordCloud
 
         titles = [p.title for p in self.papers]
         text = " ".join(titles)
@@ -410,3 +1048,127 @@ class paperSet:
         return None
 
     # TODO: Add deletion methods if requested by ScrapeMed users.
+
+
+def _paper_key(paper: Paper) -> tuple:
+    """
+    Hashable identity of a Paper, by the same fields as `Paper.__eq__`.
+    """
+    return (paper.pmcid, paper.last_updated)
+
+
+class paperSink:
+    """
+    Append-only on-disk sink of paperSet relational rows, written in
+    bounded-size chunks so that a corpus is limited by disk rather than RAM.
+
+    Rows are buffered until `chunk_size` rows are held, then written as one
+    pickled DataFrame chunk file. Reopening an existing sink appends after its
+    existing chunks.
+
+    :param str path: Directory holding the chunk files. Created if it does
+        not exist.
+    :param int chunk_size: Number of rows per chunk file. Default is 1000.
+
+    Example:
+    ```
+    with paperSink("data/corpus", chunk_size=500) as sink:
+        for paper in paperSet.iter_from_pmcid_list(pmcids, email, sink=sink):
+            pass
+    df = sink.to_df()
+    ```
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1000):
+        """
+        Open (or create) an on-disk paperSet sink.
+
+        :param str path: Directory holding the chunk files.
+        :param int chunk_size: Number of rows per chunk file.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.path = path
+        self.chunk_size = chunk_size
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+        self._n_chunks = len(self.chunk_paths())
+
+        return None
+
+    def write(self, row: pd.Series) -> None:
+        """
+        Buffer a relational row, flushing a chunk once `chunk_size` rows are
+        buffered.
+
+        :param pd.Series row: A row, ie. from `Paper.to_relational()`.
+        """
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+        return None
+
+    def flush(self) -> None:
+        """
+        Write any buffered rows to a new chunk file.
+        """
+        if not self._rows:
+            return None
+        chunk_path = os.path.join(
+            self.path, f"{SINK_CHUNK_PREFIX}{self._n_chunks:06d}.pkl"
+        )
+        tmp_path = f"{chunk_path}.{os.getpid()}.tmp"
+        pd.DataFrame(self._rows).to_pickle(tmp_path)
+        os.replace(tmp_path, chunk_path)
+        self._n_chunks += 1
+        self._rows = []
+        return None
+
+    def chunk_paths(self) -> List[str]:
+        """
+        List the sink's chunk files, in write order.
+
+        :returns: Paths of the chunk files.
+        :rtype: List[str]
+        """
+        return sorted(
+            os.path.join(self.path, filename)
+            for filename in os.listdir(self.path)
+            if filename.startswith(SINK_CHUNK_PREFIX) and filename.endswith(".pkl")
+        )
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Read the flushed rows back one chunk at a time.
+
+        :returns: Generator of DataFrames, one per chunk file.
+        :rtype: Iterator[pd.DataFrame]
+        """
+        for chunk_path in self.chunk_paths():
+            yield pd.read_pickle(chunk_path)
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Read every flushed row back into a single DataFrame. Only use this
+        when the corpus fits in memory.
+
+        :returns: DataFrame of all flushed rows.
+        :rtype: pd.DataFrame
+        """
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def __enter__(self):
+        """
+        Use the sink as a context manager, flushing on exit.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Flush any buffered rows.
+        """
+        self.flush()
+        return False
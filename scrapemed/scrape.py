@@ -5,21 +5,42 @@ ScrapeMed's Scrape Module
 ScrapeMed's `scrape` module handles PubMed Central data searching
 and downloads.
 
+Downloads can be made serially (`get_xml`, `get_xmls`), or concurrently via
+asyncio (`aget_xmls`), in which case requests are rate limited to NCBI's
+allowance via a shared :class:`tokenBucket`.
+
 This module also handles conversion of raw XML data to
 lxml.etree.ElementTree objects.
 
 ..warnings::
     - :class:`validationWarning` - Warned when downloading PMC XML without
         validating.
+    - :class:`missingArticleWarning` - Warned when a PMCID requested in a
+        batched download is not present in the returned articleset.
+    - :class:`fetchFailureWarning` - Warned when a download from PMC still
+        fails after retrying with backoff.
 """
 
 
 import scrapemed._clean as _clean
 import scrapemed._validate as _validate
+from scrapemed.cache import xmlCache, cacheMissError
+from scrapemed.utils import normalize_pmcid
 import lxml.etree as ET
 from Bio import Entrez
 import warnings
-from typing import List
+import asyncio
+import random
+import time
+import weakref
+from urllib.error import HTTPError, URLError
+from typing import List, Dict, Union, Tuple, AsyncIterator
+
+# NCBI E-utilities request allowance, in requests per second
+NCBI_RATE_LIMIT = 3
+NCBI_API_KEY_RATE_LIMIT = 10
+# ways of stripping text styling in xml_tree_from_string
+STRIP_METHODS = ["regex", "tree"]
 
 
 class validationWarning(Warning):
@@ -30,6 +51,105 @@ class validationWarning(Warning):
     pass
 
 
+class missingArticleWarning(Warning):
+    """
+    Warned when a PMCID requested in a batched download is not present in the
+    returned articleset.
+    """
+
+    pass
+
+
+class fetchFailureWarning(Warning):
+    """
+    Warned when a download from PMC still fails after retrying with backoff.
+    """
+
+    pass
+
+
+# ---------------------Rate Limiting for PubMed Central-----------------------
+class tokenBucket:
+    """
+    Asyncio token bucket limiting the rate at which requests are started.
+
+    Tokens refill continuously at `rate` tokens per second, up to `capacity`.
+    Each request consumes one token, waiting for a refill if none are left.
+
+    :param float rate: Tokens added per second, ie. allowed requests per second.
+    :param float capacity: Maximum number of tokens held at once, ie. the
+        largest allowed burst of requests. Default is 1 (no bursting).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Initialize a full token bucket.
+
+        :param float rate: Tokens added per second.
+        :param float capacity: Maximum number of tokens held at once.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available, then consume it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return None
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# token buckets shared by all downloads running in the same event loop
+_shared_limiters = weakref.WeakKeyDictionary()
+
+
+def _get_shared_limiter(rate: float) -> tokenBucket:
+    """
+    Get the token bucket shared by all downloads at `rate` in the running
+    event loop.
+
+    :param float rate: Allowed requests per second.
+
+    :return: The shared token bucket.
+    :rtype: tokenBucket
+    """
+    limiters = _shared_limiters.setdefault(asyncio.get_running_loop(), {})
+    if rate not in limiters:
+        limiters[rate] = tokenBucket(rate)
+    return limiters[rate]
+
+
+def _backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """
+    Exponential backoff delay with jitter for a retry attempt.
+
+    :param int attempt: Zero-indexed number of the failed attempt.
+    :param float base: Delay in seconds before jitter for the first retry.
+    :param float cap: Maximum delay in seconds before jitter.
+
+    :return: Seconds to wait, uniformly drawn from [delay / 2, delay] where
+        delay = min(cap, base * 2**attempt).
+    :rtype: float
+    """
+    delay = min(cap, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# ------------------End Rate Limiting for PubMed Central----------------------
+
+
 # ---------------------Download Funcs for PubMed Central-----------------------
 def search_pmc(email: str, term: str, retmax: int = 10, verbose: bool = False) -> dict:
     """
@@ -64,11 +184,20 @@ def get_xmls(
     validate=True,
     strip_text_styling=True,
     verbose=False,
+    batch_size: int = None,
+    cache: xmlCache = None,
+    strip_method: str = "regex",
 ) -> List[ET.ElementTree]:
     """
     Retrieve XMLs of research papers from PMC, given a list of PMCIDs.
     Also validates and cleans the XMLs by default.
 
+    By default one efetch request is made per PMCID. Pass `batch_size` to
+    instead request comma-joined batches of PMCIDs in a single efetch call
+    each, splitting the returned <pmc-articleset> back into one ElementTree
+    per article. PMCIDs missing from a batch response, or from an offline
+    cache, are returned as None.
+
     :param List[int] pmcids: List of PMCIDs of articles to retrieve.
     :param str email: Use your email to authenticate with PMC.
     :param bool download: Whether or not to download the XMLs. Default is False.
@@ -77,15 +206,99 @@ def get_xmls(
     :param bool strip_text_styling: Whether or not to clean common HTML text
         styling from the text (HIGHLY RECOMMENDED). Default is True.
     :param bool verbose: Whether to display verbose output. Default is False.
+    :param int batch_size: Number of PMCIDs to request per efetch call. NCBI
+        handles batches of 100-200 IDs well. Default is None (one request per
+        PMCID).
+    :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+        store newly downloaded XMLs in. Default is None (no caching).
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `xml_tree_from_string`. Default is "regex".
 
     :return: List of ElementTrees of the XMLs corresponding to
         the provided PMCIDs.
     :rtype: List[ET.ElementTree]
     """
-    return [
-        get_xml(pmcid, email, download, validate, strip_text_styling, verbose)
-        for pmcid in pmcids
-    ]
+    xml_texts = get_xml_strings(
+        pmcids, email, download, verbose, batch_size=batch_size, cache=cache
+    )
+    trees = []
+    for pmcid, xml_text in zip(pmcids, xml_texts):
+        if xml_text is None:
+            trees.append(None)
+            continue
+        trees.append(
+            _tree_from_xml_string(
+                pmcid, xml_text, validate, strip_text_styling, verbose, strip_method
+            )
+        )
+    return trees
+
+
+def get_xml_strings(
+    pmcids: List[int],
+    email: str,
+    download=False,
+    verbose=False,
+    batch_size: int = None,
+    cache: xmlCache = None,
+) -> List[str]:
+    """
+    Retrieve raw XML text of research papers from PMC, given a list of PMCIDs.
+
+    Like `get_xmls`, but without parsing, cleaning, or validating, ie. to hand
+    the XML off to worker processes for parsing.
+
+    :param List[int] pmcids: List of PMCIDs of articles to retrieve.
+    :param str email: Use your email to authenticate with PMC.
+    :param bool download: Whether or not to download the XMLs. Default is False.
+    :param bool verbose: Whether to display verbose output. Default is False.
+    :param int batch_size: Number of PMCIDs to request per efetch call. Default
+        is None (one request per PMCID).
+    :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+        store newly downloaded XMLs in. Default is None (no caching).
+
+    :return: List of XML texts corresponding to the provided PMCIDs, with None
+        for PMCIDs that could not be retrieved.
+    :rtype: List[str]
+
+    WARNING: THIS FUNCTION DOES NOT VALIDATE THE XML.
+    """
+    if not batch_size:
+        xml_texts = []
+        for pmcid in pmcids:
+            try:
+                xml_texts.append(
+                    _get_xml_string(pmcid, email, download, verbose, cache=cache)
+                )
+            except cacheMissError:
+                warnings.warn(
+                    f"PMCID {pmcid} was not found in the offline cache.",
+                    missingArticleWarning,
+                )
+                xml_texts.append(None)
+        return xml_texts
+
+    batch_xml_texts = {}
+    for start in range(0, len(pmcids), batch_size):
+        batch_xml_texts.update(
+            _get_xml_strings_batch(
+                pmcids[start : start + batch_size], email, download, verbose, cache
+            )
+        )
+
+    xml_texts = []
+    for pmcid in pmcids:
+        xml_text = batch_xml_texts.get(normalize_pmcid(pmcid))
+        if xml_text is None:
+            warnings.warn(
+                (
+                    f"PMCID {pmcid} was not found in the batched efetch "
+                    "response or offline cache."
+                ),
+                missingArticleWarning,
+            )
+        xml_texts.append(xml_text)
+    return xml_texts
 
 
 def get_xml(
@@ -95,6 +308,8 @@ def get_xml(
     validate=True,
     strip_text_styling=True,
     verbose=False,
+    cache: xmlCache = None,
+    strip_method: str = "regex",
 ) -> ET.ElementTree:
     """
     Retrieve XML of a research paper from PMC, given a PMCID.
@@ -108,13 +323,214 @@ def get_xml(
     :param bool strip_text_styling: Whether or not to clean common HTML
         text styling from the text (HIGHLY RECOMMENDED). Default is True.
     :param bool verbose: Whether to display verbose output. Default is False.
+    :param xmlCache cache: Optional on-disk cache to serve the XML from, and to
+        store a newly downloaded XML in. Default is None (no caching).
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `xml_tree_from_string`. Default is "regex".
 
     :return: ElementTree of the validated XML record.
     :rtype: ET.ElementTree
+
+    :raises cacheMissError: If `cache` is offline and does not hold the PMCID.
+    """
+    xml_text = _get_xml_string(pmcid, email, download, verbose, cache=cache)
+    return _tree_from_xml_string(
+        pmcid, xml_text, validate, strip_text_styling, verbose, strip_method
+    )
+
+
+async def aget_xmls(
+    pmcids: List[Union[int, str]],
+    email: str,
+    api_key: str = None,
+    validate=True,
+    strip_text_styling=True,
+    verbose=False,
+    batch_size: int = None,
+    max_concurrency: int = 10,
+    max_tries: int = 5,
+    limiter: tokenBucket = None,
+    cache: xmlCache = None,
+    strip_method: str = "regex",
+) -> AsyncIterator[Tuple[Union[int, str], ET.ElementTree]]:
+    """
+    Concurrently retrieve XMLs of research papers from PMC, given a list of
+    PMCIDs, yielding each one as soon as it is downloaded.
+
+    Requests are started no faster than NCBI allows (3 requests per second,
+    or 10 with an API key) via a token bucket shared by all downloads in the
+    running event loop. Failed requests are retried with exponential backoff
+    and jitter. XMLs already held in `cache` are yielded first, without any
+    request.
+
+    Example:
+    ```
+    async for pmcid, tree in scrape.aget_xmls(pmcids, email):
+        ...
+    ```
+
+    :param List[Union[int, str]] pmcids: List of PMCIDs of articles to retrieve.
+    :param str email: Use your email to authenticate with PMC.
+    :param str api_key: NCBI API key, sent with this call's requests only.
+        Raises the allowed request rate. Default is None (uses
+        `Bio.Entrez.api_key` if already set).
+    :param bool validate: Whether or not to validate the retrieved XMLs
+        (HIGHLY RECOMMENDED). Default is True.
+    :param bool strip_text_styling: Whether or not to clean common HTML text
+        styling from the text (HIGHLY RECOMMENDED). Default is True.
+    :param bool verbose: Whether to display verbose output. Default is False.
+    :param int batch_size: Number of PMCIDs to request per efetch call.
+        Default is None (one request per PMCID).
+    :param int max_concurrency: Maximum number of requests in flight at once.
+        Default is 10.
+    :param int max_tries: Number of attempts per request before giving up.
+        Default is 5.
+    :param tokenBucket limiter: Optionally provide your own rate limiter.
+    :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+        store newly downloaded XMLs in. Default is None (no caching).
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `xml_tree_from_string`. Default is "regex".
+
+    :return: Async iterator of (pmcid, ElementTree) tuples, in order of
+        completion. The ElementTree is None if the download failed.
+    :rtype: AsyncIterator[Tuple[Union[int, str], ET.ElementTree]]
+    """
+    Entrez.email = email
+    if limiter is None:
+        has_key = api_key or Entrez.api_key
+        rate = NCBI_API_KEY_RATE_LIMIT if has_key else NCBI_RATE_LIMIT
+        limiter = _get_shared_limiter(rate)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(batch: List[Union[int, str]]) -> Tuple[list, Dict[str, str]]:
+        async with semaphore:
+            for attempt in range(max_tries):
+                await limiter.acquire()
+                try:
+                    if batch_size:
+                        xml_texts = await asyncio.to_thread(
+                            _get_xml_strings_batch,
+                            batch,
+                            email,
+                            False,
+                            verbose,
+                            cache,
+                            api_key,
+                        )
+                    else:
+                        xml_text = await asyncio.to_thread(
+                            _get_xml_string,
+                            batch[0],
+                            email,
+                            False,
+                            verbose,
+                            cache,
+                            api_key,
+                        )
+                        xml_texts = {normalize_pmcid(batch[0]): xml_text}
+                    return batch, xml_texts
+                except (HTTPError, URLError) as e:
+                    if attempt == max_tries - 1:
+                        warnings.warn(
+                            (
+                                f"Unable to retrieve PMCID(s) {batch} from PMC "
+                                f"after {max_tries} tries: {e}"
+                            ),
+                            fetchFailureWarning,
+                        )
+                        return batch, None
+                    await asyncio.sleep(_backoff_delay(attempt))
+
+    cached_xml_texts = {}
+    if cache is not None:
+        # cache reads block (a sqlite query and a gzip read per PMCID), so
+        # they run in one worker thread, like the cache writes
+        xml_texts = await asyncio.to_thread(
+            lambda: [cache.get(pmcid) for pmcid in pmcids]
+        )
+        for pmcid, xml_text in zip(pmcids, xml_texts):
+            if xml_text is not None:
+                cached_xml_texts[pmcid] = xml_text
+            elif cache.offline:
+                warnings.warn(
+                    f"PMCID {pmcid} was not found in the offline cache.",
+                    missingArticleWarning,
+                )
+                cached_xml_texts[pmcid] = None
+    to_fetch = [pmcid for pmcid in pmcids if pmcid not in cached_xml_texts]
+
+    async def to_tree(pmcid: Union[int, str], xml_text: str) -> ET.ElementTree:
+        # parsing, cleaning and validating are CPU bound, so they run in a
+        # worker thread, leaving the event loop free for in-flight requests
+        return await asyncio.to_thread(
+            _tree_from_xml_string,
+            pmcid,
+            xml_text,
+            validate,
+            strip_text_styling,
+            verbose,
+            strip_method,
+        )
+
+    step = batch_size if batch_size else 1
+    tasks = [
+        asyncio.create_task(fetch(to_fetch[start : start + step]))
+        for start in range(0, len(to_fetch), step)
+    ]
+    try:
+        for pmcid, xml_text in cached_xml_texts.items():
+            if xml_text is None:
+                yield pmcid, None
+                continue
+            yield pmcid, await to_tree(pmcid, xml_text)
+        for next_done in asyncio.as_completed(tasks):
+            batch, xml_texts = await next_done
+            for pmcid in batch:
+                if xml_texts is None:
+                    yield pmcid, None
+                    continue
+                xml_text = xml_texts.get(normalize_pmcid(pmcid))
+                if xml_text is None:
+                    warnings.warn(
+                        f"PMCID {pmcid} was not found in the efetch response.",
+                        missingArticleWarning,
+                    )
+                    yield pmcid, None
+                    continue
+                yield pmcid, await to_tree(pmcid, xml_text)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _tree_from_xml_string(
+    pmcid: Union[int, str],
+    xml_text: str,
+    validate=True,
+    strip_text_styling=True,
+    verbose=False,
+    strip_method: str = "regex",
+) -> ET.ElementTree:
+    """
+    Convert retrieved XML text to a cleaned, optionally validated, ElementTree.
+
+    :param Union[int, str] pmcid: PMCID of the article, used for warnings.
+    :param str xml_text: XML text of a <pmc-articleset> holding the article.
+    :param bool validate: Whether or not to validate the XML. Default is True.
+    :param bool strip_text_styling: Whether or not to clean common HTML
+        text styling from the text. Default is True.
+    :param bool verbose: Whether to display verbose output. Default is False.
+    :param str strip_method: How text styling is stripped, "regex" or "tree",
+        see `xml_tree_from_string`. Default is "regex".
+
+    :return: ElementTree of the XML record.
+    :rtype: ET.ElementTree
     """
-    xml_text = _get_xml_string(pmcid, email, download, verbose)
     tree = xml_tree_from_string(
-        xml_string=xml_text, strip_text_styling=strip_text_styling, verbose=verbose
+        xml_string=xml_text,
+        strip_text_styling=strip_text_styling,
+        verbose=verbose,
+        strip_method=strip_method,
     )
 
     if validate:
@@ -133,27 +549,52 @@ def get_xml(
     return tree
 
 
-def _get_xml_string(pmcid: int, email: str, download=False, verbose=False) -> str:
+def _get_xml_string(
+    pmcid: Union[int, str],
+    email: str,
+    download=False,
+    verbose=False,
+    cache: xmlCache = None,
+    api_key: str = None,
+) -> str:
     """
     Retrieve XML text of a research paper from PMC.
 
-    :param int pmcid: PMCID of the article to retrieve.
+    :param Union[int, str] pmcid: PMCID of the article to retrieve. A string of
+        comma-joined PMCIDs retrieves all of them in one <pmc-articleset>.
     :param str email: Email of the user requesting data from PMC.
     :param bool download: Whether or not to download the XML. Default is False.
     :param bool verbose: Whether to display verbose output. Default is False.
+    :param xmlCache cache: Optional on-disk cache to serve the XML from, and to
+        store a newly downloaded XML in. Only use with a single PMCID.
+    :param str api_key: NCBI API key to send with the request. Default is None
+        (uses `Bio.Entrez.api_key` if set).
 
     :return: XML Text of the record.
     :rtype: str
 
+    :raises cacheMissError: If `cache` is offline and does not hold the PMCID.
+
     WARNING: THIS FUNCTION DOES NOT VALIDATE THE XML.
     """
+    if cache is not None:
+        xml_text = cache.get(pmcid)
+        if xml_text is not None:
+            return xml_text
+        if cache.offline:
+            raise cacheMissError(f"PMCID {pmcid} not found in the offline cache.")
+
     DB = "pmc"
     RETTYPE = "full"
     RETMODE = "xml"
     Entrez.email = email
 
-    # Actually fetch from PMC
-    handle = Entrez.efetch(db=DB, id=pmcid, rettype=RETTYPE, retmode=RETMODE)
+    # Actually fetch from PMC. A None api_key would override Entrez.api_key,
+    # so it is only passed when given
+    keywords = {"api_key": api_key} if api_key else {}
+    handle = Entrez.efetch(
+        db=DB, id=pmcid, rettype=RETTYPE, retmode=RETMODE, **keywords
+    )
     xml_record = handle.read()
     xml_text = xml_record.decode(encoding="utf-8")
     handle.close()
@@ -167,15 +608,112 @@ def _get_xml_string(pmcid: int, email: str, download=False, verbose=False) -> st
         with open(f"data/entrez_download_PMCID={pmcid}.{RETMODE}", "w+") as f:
             f.write(xml_text)
 
+    if cache is not None:
+        cache.put(pmcid, xml_text)
+
     return xml_text
 
 
+def _get_xml_strings_batch(
+    pmcids: List[Union[int, str]],
+    email: str,
+    download=False,
+    verbose=False,
+    cache: xmlCache = None,
+    api_key: str = None,
+) -> Dict[str, str]:
+    """
+    Retrieve XML text for a batch of research papers from PMC in a single
+    efetch request.
+
+    :param List[Union[int, str]] pmcids: PMCIDs of the articles to retrieve.
+    :param str email: Email of the user requesting data from PMC.
+    :param bool download: Whether or not to download the XMLs. Default is False.
+    :param bool verbose: Whether to display verbose output. Default is False.
+    :param xmlCache cache: Optional on-disk cache to serve XMLs from, and to
+        store newly downloaded XMLs in. Only cache misses are requested.
+    :param str api_key: NCBI API key to send with the request. Default is None
+        (uses `Bio.Entrez.api_key` if set).
+
+    :return: Dict of PMCID (str, without a "PMC" prefix) to the XML text of a
+        single-article <pmc-articleset> for that PMCID. PMCIDs that could not
+        be retrieved are left out.
+    :rtype: Dict[str, str]
+
+    WARNING: THIS FUNCTION DOES NOT VALIDATE THE XML.
+    """
+    xml_texts = {}
+    to_fetch = []
+    for pmcid in pmcids:
+        xml_text = cache.get(pmcid) if cache is not None else None
+        if xml_text is None:
+            to_fetch.append(normalize_pmcid(pmcid))
+        else:
+            xml_texts[normalize_pmcid(pmcid)] = xml_text
+
+    if not to_fetch or (cache is not None and cache.offline):
+        return xml_texts
+
+    fetched_xml_texts = _split_articleset(
+        _get_xml_string(",".join(to_fetch), email, verbose=verbose, api_key=api_key)
+    )
+    for pmcid, xml_text in fetched_xml_texts.items():
+        if download:
+            with open(f"data/entrez_download_PMCID={pmcid}.xml", "w+") as f:
+                f.write(xml_text)
+        if cache is not None:
+            cache.put(pmcid, xml_text)
+    xml_texts.update(fetched_xml_texts)
+
+    return xml_texts
+
+
+def _split_articleset(xml_text: str) -> Dict[str, str]:
+    """
+    Split the XML text of a multi-article <pmc-articleset> into one
+    single-article <pmc-articleset> document per article.
+
+    Each resulting document keeps the doctype of the original articleset, so
+    it can be validated exactly like an XML retrieved for a single PMCID.
+
+    :param str xml_text: XML text of a <pmc-articleset> as returned by efetch.
+
+    :return: Dict of PMCID (str, taken from
+        article-meta/article-id[@pub-id-type='pmc']) to the XML text of the
+        single-article <pmc-articleset>.
+    :rtype: Dict[str, str]
+    """
+    root = ET.fromstring(xml_text.encode("utf-8"))
+    doctype = root.getroottree().docinfo.doctype
+
+    xml_texts = {}
+    for article in root.iterchildren("article"):
+        pmcid = article.findtext("front/article-meta/article-id[@pub-id-type='pmc']")
+        if pmcid is None:
+            pmcid = article.findtext(
+                "front/article-meta/article-id[@pub-id-type='pmcid']"
+            )
+        if pmcid is None:
+            warnings.warn(
+                "Article without a PMC article-id found in a batched efetch "
+                "response. Skipping.",
+                missingArticleWarning,
+            )
+            continue
+        article_text = ET.tostring(article, encoding="unicode", with_tail=False)
+        xml_texts[normalize_pmcid(pmcid)] = (
+            f'<?xml version="1.0" ?>\n{doctype}\n'
+            f"<pmc-articleset>{article_text}</pmc-articleset>"
+        )
+    return xml_texts
+
+
 # ----------------End Download Funcs for PubMed Central---------------------
 
 
 # --------------------Convert XML strings -> Trees---------------------
 def xml_tree_from_string(
-    xml_string: str, strip_text_styling, verbose=False
+    xml_string: str, strip_text_styling, verbose=False, strip_method: str = "regex"
 ) -> ET.ElementTree:
     """
     Converts a string representing XML to an lxml ElementTree.
@@ -183,11 +721,32 @@ def xml_tree_from_string(
     :param str xml_string: A string or bytestream representing XML.
     :param bool strip_text_styling: Whether to remove HTML text styling tags or not.
     :param bool verbose: Whether to display verbose output. Default is False.
+    :param str strip_method: How text styling is stripped. "regex" cleans the
+        string before parsing. "tree" parses first, then strips styling
+        elements from the tree, leaving CDATA and comments untouched. Default
+        is "regex".
 
     :return: An lxml.etree.ElementTree of the passed string.
     :rtype: ET.ElementTree
     """
-    xml_string = _clean.clean_xml_string(xml_string, strip_text_styling)
+    if strip_method not in STRIP_METHODS:
+        raise ValueError(
+            f"Unknown strip_method {strip_method}. Options: {STRIP_METHODS}"
+        )
+    if strip_method == "tree":
+        root = ET.fromstring(xml_string)
+        return ET.ElementTree(
+            _clean.clean_xml_tree(root, strip_text_styling, verbose=verbose)
+        )
+
+    if isinstance(xml_string, bytes):
+        # styling is cleaned from text, then parsed as UTF-8 bytes, so an
+        # encoding declaration is still allowed
+        xml_string = _clean.clean_xml_string(
+            xml_string.decode("utf-8"), strip_text_styling
+        ).encode("utf-8")
+    else:
+        xml_string = _clean.clean_xml_string(xml_string, strip_text_styling)
     tree = ET.ElementTree(ET.fromstring(xml_string))
     return tree
 
@@ -0,0 +1,605 @@
+"""
+ScrapeMed's Store Module
+============================
+
+ScrapeMed's `store` module persists Papers to a relational database through
+SQLAlchemy, in normalized tables of papers, authors, sections, citations,
+tables, and figures, keyed by PMCID.
+
+Any SQLAlchemy database URL is supported; SQLite works out of the box.
+Papers are upserted in bulk (one `executemany` per table per batch), and each
+paper row stores a hash of its content, so re-ingesting an updated corpus only
+rewrites the rows of papers whose content changed.
+
+Stream papers back with :meth:`paperStore.iter_papers` (or
+`paperSet.iter_from_store`), or load them into a paperSet via
+`paperSet.from_store`.
+"""
+
+import os
+import json
+import hashlib
+import datetime
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Dict, Iterable, Iterator, List, Tuple
+from scrapemed.paper import Paper
+from scrapemed.utils import basicBiMap, pmcid_as_int, plain_str
+import scrapemed._parse as parse
+from scrapemed._text import tableRecord
+import scrapemed._arrow as _arrow
+
+# number of papers per upsert transaction, and per read
+DEFAULT_BATCH_SIZE = 500
+# dialects supporting INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class paperStore:
+    """
+    Persistent, normalized store of Papers in a SQL database.
+
+    :param str url: SQLAlchemy database URL. Default is
+        "sqlite:///data/papers.sqlite".
+
+    Attributes:
+        - engine (sa.Engine): The SQLAlchemy engine.
+        - papers, authors, sections, citations, tables, figures (sa.Table):
+            The store's tables. Use their columns to build queries.
+
+    Example:
+    ```
+    store = paperStore("sqlite:///data/papers.sqlite")
+    store.upsert(pset.papers)
+    drugs = paperSet.from_store(
+        store, query=store.papers.c.journal_title == "Drugs in R&D"
+    )
+    ```
+    """
+
+    def __init__(self, url: str = "sqlite:///" + os.path.join("data", "papers.sqlite")):
+        """
+        Connect to (and create the tables of) a paper store.
+
+        :param str url: SQLAlchemy database URL.
+        """
+        self.engine = sa.create_engine(url)
+        if self.engine.dialect.name == "sqlite" and self.engine.url.database:
+            directory = os.path.dirname(self.engine.url.database)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self.metadata = sa.MetaData()
+        self.papers = sa.Table(
+            "papers",
+            self.metadata,
+            sa.Column("pmcid", sa.BigInteger, primary_key=True, autoincrement=False),
+            sa.Column("content_hash", sa.String(64), nullable=False),
+            sa.Column("last_updated", sa.Date),
+            sa.Column("title", sa.Text),
+            sa.Column("journal_id", sa.JSON),
+            sa.Column("journal_title", sa.Text),
+            sa.Column("issn", sa.JSON),
+            sa.Column("publisher_name", sa.Text),
+            sa.Column("publisher_location", sa.Text),
+            sa.Column("article_id", sa.JSON),
+            sa.Column("article_types", sa.JSON),
+            sa.Column("article_categories", sa.JSON),
+            sa.Column("published_date", sa.JSON),
+            sa.Column("volume", sa.Text),
+            sa.Column("issue", sa.Text),
+            sa.Column("first_page", sa.Text),
+            sa.Column("last_page", sa.Text),
+            sa.Column("copyright", sa.Text),
+            sa.Column("license", sa.Text),
+            sa.Column("funding", sa.JSON),
+            sa.Column("footnote", sa.Text),
+            sa.Column("acknowledgements", sa.JSON),
+            sa.Column("notes", sa.JSON),
+            sa.Column("custom_meta", sa.JSON),
+        )
+        self.authors = self._child_table(
+            "authors",
+            sa.Column("contributor_type", sa.Text),
+            sa.Column("first_name", sa.Text),
+            sa.Column("last_name", sa.Text),
+            sa.Column("email_address", sa.Text),
+            sa.Column("affiliations", sa.JSON),
+            # False for non-author contributors
+            sa.Column("is_author", sa.Boolean, nullable=False),
+        )
+        self.sections = self._child_table(
+            "sections",
+            # "abstract" or "body"
+            sa.Column("part", sa.String(16), nullable=False),
+            sa.Column("title", sa.Text),
+            sa.Column("text", sa.Text),
+            sa.Column("text_with_refs", sa.Text),
+        )
+        self.citations = self._child_table(
+            "citations",
+            sa.Column("authors", sa.JSON),
+            sa.Column("title", sa.Text),
+            sa.Column("source", sa.Text),
+            sa.Column("year", sa.Text),
+            sa.Column("volume", sa.Text),
+            sa.Column("first_page", sa.Text),
+            sa.Column("last_page", sa.Text),
+            sa.Column("doi", sa.Text),
+            sa.Column("pmid", sa.Text),
+            # citations only available as free text are kept whole
+            sa.Column("text", sa.Text),
+        )
+        self.tables = self._child_table(
+            "tables",
+            sa.Column("label", sa.Text),
+            sa.Column("caption", sa.Text),
+            sa.Column("header", sa.JSON),
+            sa.Column("rows", sa.JSON),
+        )
+        self.figures = self._child_table(
+            "figures",
+            sa.Column("label", sa.Text),
+            sa.Column("caption", sa.Text),
+            sa.Column("link", sa.Text),
+        )
+        self.metadata.create_all(self.engine)
+
+        return None
+
+    def _child_table(self, name: str, *columns: sa.Column) -> sa.Table:
+        """
+        Define a table of rows belonging to papers, keyed by (pmcid, position).
+        """
+        return sa.Table(
+            name,
+            self.metadata,
+            sa.Column(
+                "pmcid",
+                sa.BigInteger,
+                sa.ForeignKey("papers.pmcid", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("position", sa.Integer, primary_key=True, autoincrement=False),
+            *columns,
+        )
+
+    @property
+    def child_tables(self) -> List[sa.Table]:
+        """
+        The store's tables of rows belonging to papers.
+        """
+        return [self.authors, self.sections, self.citations, self.tables, self.figures]
+
+    # --------------------------------Writing---------------------------------
+    def upsert(
+        self, papers: Iterable[Paper], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> int:
+        """
+        Insert or update Papers, keyed by PMCID.
+
+        Papers whose content is unchanged since they were stored are skipped
+        entirely. Changed papers have their paper row upserted and their
+        author, section, citation, table, and figure rows replaced.
+
+        :param Iterable[Paper] papers: Papers to store. May be a generator,
+            ie. `paperSet.iter_from_pmcid_list`.
+        :param int batch_size: Number of Papers per transaction. Default is 500.
+
+        :return: The number of Papers inserted or updated.
+        :rtype: int
+        """
+        n_written = 0
+        batch = {}
+        for paper in papers:
+            if not paper:
+                continue
+            rows = _paper_rows(paper)
+            batch[rows["papers"][0]["pmcid"]] = rows
+            if len(batch) >= batch_size:
+                n_written += self._upsert_batch(batch)
+                batch = {}
+        if batch:
+            n_written += self._upsert_batch(batch)
+        return n_written
+
+    def _upsert_batch(self, batch: Dict[int, Dict[str, List[Dict]]]) -> int:
+        """
+        Upsert one batch of papers' rows, keyed by PMCID, in one transaction.
+        """
+        with self.engine.begin() as conn:
+            stored_hashes = dict(
+                conn.execute(
+                    sa.select(self.papers.c.pmcid, self.papers.c.content_hash).where(
+                        self.papers.c.pmcid.in_(list(batch.keys()))
+                    )
+                ).all()
+            )
+            changed = {
+                pmcid: rows
+                for pmcid, rows in batch.items()
+                if stored_hashes.get(pmcid) != rows["papers"][0]["content_hash"]
+            }
+            if not changed:
+                return 0
+
+            for table in self.child_tables:
+                conn.execute(table.delete().where(table.c.pmcid.in_(list(changed))))
+            self._upsert_paper_rows(
+                conn, [rows["papers"][0] for rows in changed.values()]
+            )
+            for table in self.child_tables:
+                table_rows = [
+                    row for rows in changed.values() for row in rows[table.name]
+                ]
+                if table_rows:
+                    conn.execute(table.insert(), table_rows)
+
+        return len(changed)
+
+    def _upsert_paper_rows(
+        self, conn: sa.engine.Connection, paper_rows: List[Dict]
+    ) -> None:
+        """
+        Upsert paper rows with one executemany, via ON CONFLICT DO UPDATE where
+        the database supports it, otherwise by deleting and reinserting.
+        """
+        insert = UPSERT_DIALECTS.get(conn.dialect.name)
+        if insert is None:
+            pmcids = [row["pmcid"] for row in paper_rows]
+            conn.execute(self.papers.delete().where(self.papers.c.pmcid.in_(pmcids)))
+            conn.execute(self.papers.insert(), paper_rows)
+            return None
+
+        statement = insert(self.papers)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.papers.c.pmcid],
+            set_={
+                column.name: statement.excluded[column.name]
+                for column in self.papers.columns
+                if column.name != "pmcid"
+            },
+        )
+        conn.execute(statement, paper_rows)
+        return None
+
+    def delete(self, pmcids: List[int]) -> int:
+        """
+        Delete Papers, and all of their rows, from the store.
+
+        :param List[int] pmcids: PMCIDs of the Papers to delete.
+
+        :return: The number of Papers deleted.
+        :rtype: int
+        """
+        pmcids = [pmcid_as_int(pmcid) for pmcid in pmcids]
+        with self.engine.begin() as conn:
+            for table in self.child_tables:
+                conn.execute(table.delete().where(table.c.pmcid.in_(pmcids)))
+            result = conn.execute(
+                self.papers.delete().where(self.papers.c.pmcid.in_(pmcids))
+            )
+        return result.rowcount
+
+    # ------------------------------End Writing-------------------------------
+
+    # --------------------------------Reading---------------------------------
+    def __len__(self) -> int:
+        """
+        Get the number of Papers in the store.
+        """
+        with self.engine.connect() as conn:
+            return conn.execute(
+                sa.select(sa.func.count()).select_from(self.papers)
+            ).scalar()
+
+    def pmcids(self, query=None) -> List[int]:
+        """
+        List the PMCIDs of stored Papers.
+
+        :param query: Optional SQLAlchemy filter on the papers table, ie.
+            `store.papers.c.journal_title == "Drugs in R&D"`.
+
+        :return: Matching PMCIDs, in ascending order.
+        :rtype: List[int]
+        """
+        statement = sa.select(self.papers.c.pmcid).order_by(self.papers.c.pmcid)
+        if query is not None:
+            statement = statement.where(query)
+        with self.engine.connect() as conn:
+            return list(conn.execute(statement).scalars())
+
+    def iter_papers(
+        self, query=None, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[Paper]:
+        """
+        Lazily read Papers back from the store, one batch at a time.
+
+        Papers read from a store have their abstract and body as plain strings
+        (one per section), and no reference map. Tables are restored as
+        tableRecords, built into dataframes on access to `paper.tables`.
+
+        :param query: Optional SQLAlchemy filter on the papers table, ie.
+            `store.papers.c.journal_title == "Drugs in R&D"`.
+        :param int batch_size: Number of Papers to read per batch. Default is
+            500.
+
+        :return: Generator of Papers, in ascending PMCID order.
+        :rtype: Iterator[Paper]
+        """
+        pmcids = self.pmcids(query)
+        for start in range(0, len(pmcids), batch_size):
+            batch = pmcids[start : start + batch_size]
+            with self.engine.connect() as conn:
+                rows = {
+                    table.name: self._read_rows(conn, table, batch)
+                    for table in [self.papers] + self.child_tables
+                }
+            for paper_row in rows["papers"]:
+                pmcid = paper_row["pmcid"]
+                yield _paper_from_rows(
+                    paper_row,
+                    {
+                        table.name: rows[table.name].get(pmcid, [])
+                        for table in self.child_tables
+                    },
+                )
+
+    def _read_rows(
+        self, conn: sa.engine.Connection, table: sa.Table, pmcids: List[int]
+    ):
+        """
+        Read the rows of a table for a batch of PMCIDs. Child rows are grouped
+        by PMCID, in position order.
+        """
+        statement = sa.select(table).where(table.c.pmcid.in_(pmcids))
+        if table is self.papers:
+            statement = statement.order_by(table.c.pmcid)
+            return [dict(row) for row in conn.execute(statement).mappings()]
+
+        grouped = {}
+        statement = statement.order_by(table.c.pmcid, table.c.position)
+        for row in conn.execute(statement).mappings():
+            grouped.setdefault(row["pmcid"], []).append(dict(row))
+        return grouped
+
+    def close(self) -> None:
+        """
+        Dispose of the store's database connections.
+        """
+        self.engine.dispose()
+        return None
+
+    # ------------------------------End Reading-------------------------------
+
+
+# ---------------------------------Helpers-----------------------------------
+def _paper_rows(paper: Paper) -> Dict[str, List[Dict]]:
+    """
+    Convert a Paper to rows of each store table, keyed by table name. The
+    paper row holds a hash of all of the rows, excluding the date the Paper
+    was parsed.
+    """
+    record = _arrow.paper_record(paper)
+    pmcid = record["PMCID"]
+    paper_row = {
+        "pmcid": pmcid,
+        "title": record["Title"],
+        "journal_id": _as_dict(record["Journal_ID"]),
+        "journal_title": record["Journal_Title"],
+        "issn": _as_dict(record["ISSN"]),
+        "publisher_name": record["Publisher_Name"],
+        "publisher_location": record["Publisher_Location"],
+        "article_id": _as_dict(record["Article_ID"]),
+        "article_types": record["Article_Types"],
+        "article_categories": record["Article_Categories"],
+        "published_date": (
+            {key: value.isoformat() for key, value in record["Published_Date"]}
+            if record["Published_Date"] is not None
+            else None
+        ),
+        "volume": record["Volume"],
+        "issue": record["Issue"],
+        "first_page": record["First_Page"],
+        "last_page": record["Last_Page"],
+        "copyright": record["Copyright"],
+        "license": record["License"],
+        "funding": record["Funding"],
+        "footnote": record["Footnote"],
+        "acknowledgements": record["Acknowledgements"],
+        "notes": record["Notes"],
+        "custom_meta": _as_dict(record["Custom_Meta"]),
+    }
+
+    contributors = [(author, True) for author in record["Authors"] or []] + [
+        (contributor, False) for contributor in record["Non_Author_Contributors"] or []
+    ]
+    sections = [("abstract", section) for section in paper.abstract or []] + [
+        ("body", section) for section in paper.body or []
+    ]
+    rows = {
+        "authors": [
+            {
+                "contributor_type": contributor["Contributor_Type"],
+                "first_name": contributor["First_Name"],
+                "last_name": contributor["Last_Name"],
+                "email_address": contributor["Email_Address"],
+                "affiliations": contributor["Affiliations"],
+                "is_author": is_author,
+            }
+            for contributor, is_author in contributors
+        ],
+        "sections": [
+            {
+                "part": part,
+                "title": plain_str(getattr(section, "title", None)),
+                "text": str(section),
+                "text_with_refs": getattr(section, "text_with_refs", None),
+            }
+            for part, section in sections
+        ],
+        "citations": [
+            {
+                "authors": citation.get("Authors"),
+                "title": citation.get("Title"),
+                "source": citation.get("Source"),
+                "year": citation.get("Year"),
+                "volume": citation.get("Volume"),
+                "first_page": citation.get("FirstPage"),
+                "last_page": citation.get("LastPage"),
+                "doi": citation.get("DOI"),
+                "pmid": citation.get("PMID"),
+                "text": citation.get("Text"),
+            }
+            for citation in record["Citations"]
+        ],
+        "tables": [
+            {
+                "label": table["Label"],
+                "caption": table["Caption"],
+                "header": table["Header"],
+                "rows": table["Rows"],
+            }
+            for table in _arrow.table_records(paper)
+        ],
+        "figures": [
+            {
+                "label": figure["Label"],
+                "caption": figure["Caption"],
+                "link": figure["Link"],
+            }
+            for figure in record["Figures"]
+        ],
+    }
+    for table_rows in rows.values():
+        for position, row in enumerate(table_rows):
+            row["pmcid"] = pmcid
+            row["position"] = position
+
+    content = json.dumps([paper_row, rows], sort_keys=True, default=str)
+    paper_row["content_hash"] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    month, day, year = paper.last_updated
+    paper_row["last_updated"] = datetime.date(year, month, day)
+    rows["papers"] = [paper_row]
+    return rows
+
+
+def _paper_from_rows(paper_row: Dict, rows: Dict[str, List[Dict]]) -> Paper:
+    """
+    Rebuild a Paper from its paper row and its rows of each child table.
+    """
+    contributor_columns = {
+        "contributor_type": "Contributor_Type",
+        "first_name": "First_Name",
+        "last_name": "Last_Name",
+        "email_address": "Email_Address",
+        "affiliations": "Affiliations",
+    }
+
+    def contributors(is_author: bool):
+        records = [
+            {name: row[column] for column, name in contributor_columns.items()}
+            for row in rows["authors"]
+            if row["is_author"] == is_author
+        ]
+        if not records:
+            return None
+        return pd.DataFrame(records, columns=list(contributor_columns.values()))
+
+    published_date = paper_row["published_date"]
+    paper_dict = {
+        "PMCID": paper_row["pmcid"],
+        "Title": paper_row["title"],
+        "Authors": contributors(True),
+        "Non-Author Contributors": contributors(False),
+        "Abstract": [
+            row["text"] for row in rows["sections"] if row["part"] == "abstract"
+        ],
+        "Body": [row["text"] for row in rows["sections"] if row["part"] == "body"],
+        "Journal ID": paper_row["journal_id"],
+        "Journal Title": paper_row["journal_title"],
+        "ISSN": paper_row["issn"],
+        "Publisher Name": paper_row["publisher_name"],
+        "Publisher Location": paper_row["publisher_location"],
+        "Article ID": paper_row["article_id"],
+        "Article Types": paper_row["article_types"],
+        "Article Categories": _article_categories(paper_row["article_categories"]),
+        "Published Date": (
+            {
+                key: datetime.datetime.fromisoformat(value)
+                for key, value in published_date.items()
+            }
+            if published_date is not None
+            else None
+        ),
+        "Volume": paper_row["volume"],
+        "Issue": paper_row["issue"],
+        "First Page": paper_row["first_page"],
+        "Last Page": paper_row["last_page"],
+        "Permissions": {
+            "Copyright Statement": paper_row["copyright"],
+            "License Type": paper_row["license"],
+        },
+        "Funding": paper_row["funding"],
+        "Footnote": paper_row["footnote"],
+        "Acknowledgements": paper_row["acknowledgements"],
+        "Notes": paper_row["notes"],
+        "Custom Meta": paper_row["custom_meta"],
+        "Ref Map With Tags": basicBiMap(),
+        "Ref Map": {},
+        "Citations": [_citation_from_row(row) for row in rows["citations"]],
+        "Tables": [
+            tableRecord(row["label"], row["caption"], row["header"], row["rows"])
+            for row in rows["tables"]
+        ],
+        "Figures": [
+            {"Label": row["label"], "Caption": row["caption"], "Link": row["link"]}
+            for row in rows["figures"]
+        ],
+    }
+    paper = Paper(paper_dict)
+    last_updated = paper_row["last_updated"]
+    if last_updated is not None:
+        paper.last_updated = (last_updated.month, last_updated.day, last_updated.year)
+    return paper
+
+
+def _citation_from_row(row: Dict):
+    """
+    Rebuild a citation in the format of `_parse._parse_citation`.
+    """
+    if row["text"] is not None:
+        return row["text"]
+    return {
+        "Authors": row["authors"],
+        "Title": row["title"],
+        "Source": row["source"],
+        "Year": row["year"],
+        "Volume": row["volume"],
+        "FirstPage": row["first_page"],
+        "LastPage": row["last_page"],
+        "DOI": row["doi"],
+        "PMID": row["pmid"],
+    }
+
+
+def _as_dict(entries: List[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Dict of map entries, keeping None.
+    """
+    return dict(entries) if entries is not None else None
+
+
+def _article_categories(records: List[Dict]):
+    """
+    A paper's Article Categories, from their stored records.
+    """
+    if records is None:
+        return None
+    if not records:
+        return parse.NO_ARTICLE_CATEGORIES
+    return [{record["Subject_Group_Type"]: record["Subject"]} for record in records]
+
+
+# -------------------------------End Helpers---------------------------------
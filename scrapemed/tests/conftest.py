@@ -0,0 +1,36 @@
+"""
+Shared fixtures for ScrapeMed's tests.
+"""
+
+import os
+import copy
+import pytest
+import lxml.etree as ET
+from scrapemed.paper import Paper
+
+TEST_XML = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "testdata", "test.xml"
+)
+
+
+def make_test_papers(n_papers: int):
+    """
+    Copies of the test paper, with PMCIDs 0 to n_papers - 1. Also used by the
+    benchmarks.
+    """
+    paper = Paper.from_xml(
+        7067710, ET.parse(TEST_XML).getroot(), suppress_warnings=True
+    )
+    papers = []
+    for pmcid in range(n_papers):
+        papers.append(copy.copy(paper))
+        papers[-1].pmcid = pmcid
+    return papers
+
+
+@pytest.fixture
+def paper_copies():
+    """
+    Factory of copies of the test paper, see `make_test_papers`.
+    """
+    return make_test_papers
@@ -0,0 +1,64 @@
+"""
+Test ScrapeMed's _arrow module, which exports papers to typed Arrow tables
+and Parquet files.
+"""
+
+import pytest
+from scrapemed.paperSet import paperSet
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_to_arrow(paper_copies):
+    pset = paperSet(paper_copies(3))
+    pset.papers[1].article_categories = [{"subject-area": "Pharmacology"}]
+    papers, tables = pset.to_arrow(row_group_size=2)
+    assert papers.num_rows == 3
+    assert papers.column("PMCID").to_pylist() == [0, 1, 2]
+
+    # nested values keep their structure
+    assert papers.schema.field("Journal_Title").type == pa.dictionary(
+        pa.int32(), pa.string()
+    )
+    paper = papers.slice(0, 1).to_pylist()[0]
+    paper_obj = pset.papers[0]
+    assert paper["Title"] == paper_obj.title
+    assert paper["Authors"][0]["Last_Name"] == "Tarabar"
+    assert (
+        paper["Authors"][0]["Affiliations"] == paper_obj.authors.iloc[0]["Affiliations"]
+    )
+    assert dict(paper["Article_ID"])["pmc"] == "7067710"
+    assert dict(paper["Published_Date"])["epub"].year == 2020
+    assert paper["Citations"][0]["Authors"] == ["A Dickman"]
+    assert any(citation["Text"] for citation in paper["Citations"])
+    assert paper["Article_Categories"] == []
+    assert papers.column("Article_Categories").to_pylist()[1] == [
+        {"Subject_Group_Type": "subject-area", "Subject": "Pharmacology"}
+    ]
+
+    # tables are exported to their own table, keyed by PMCID
+    n_tables = len(paper_obj.tables)
+    assert tables.num_rows == 3 * n_tables
+    table = tables.slice(1, 1).to_pylist()[0]
+    assert table["PMCID"] == 0 and table["Table_Index"] == 1
+    record = paper_obj.table_records[1]
+    assert f"{table['Label']}: {table['Caption']}" == paper_obj.tables[1].caption
+    assert table["Header"] == record.header and table["Rows"] == record.rows
+    assert len(table["Rows"]) == len(paper_obj.tables[1].data)
+
+    return None
+
+
+def test_to_parquet(tmp_path, paper_copies):
+    pset = paperSet(paper_copies(3))
+    path, tables_path = pset.to_parquet(tmp_path / "papers.parquet", row_group_size=2)
+    assert tables_path == str(tmp_path / "papers.tables.parquet")
+
+    # written in row groups of at most row_group_size papers
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+    papers, tables = pset.to_arrow()
+    assert pq.read_table(path).to_pylist() == papers.to_pylist()
+    assert pq.read_table(tables_path).to_pylist() == tables.to_pylist()
+
+    return None
@@ -0,0 +1,64 @@
+"""
+Test ScrapeMed's cache module.
+"""
+
+import os
+import time
+import pytest
+import scrapemed.scrape as scrape
+from scrapemed.cache import xmlCache, cacheMissError
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_cache(tmp_path):
+    with open(os.path.join(TEST_DIR, "testdata", "test.xml"), "r") as f:
+        # PMC serves XML declarations without an encoding
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+
+    # roundtrip, keyed by normalized PMCID
+    cache = xmlCache(tmp_path / "cache")
+    content_hash = cache.put("PMC7067710", xml_text)
+    assert cache.get(7067710) == xml_text
+    assert "7067710" in cache and "123" not in cache
+    assert cache.get("123") is None
+
+    # identical payloads are stored once
+    assert cache.put(7067711, xml_text) == content_hash
+    assert len(cache) == 2
+    assert cache.size() == os.path.getsize(
+        tmp_path / "cache" / cache._object_path(content_hash)
+    )
+
+    # stale entries are refetched online, but served offline
+    cache.ttl = 0.01
+    time.sleep(0.02)
+    assert cache.get(7067710) is None
+    cache.offline = True
+    assert cache.get(7067710) == xml_text
+    assert cache.evict() == 2 and len(cache) == 0 and cache.size() == 0
+
+    # least recently used entries are evicted past max_bytes
+    cache = xmlCache(tmp_path / "lru")
+    cache.put(1, xml_text)
+    cache.max_bytes = cache.size() + 16
+    cache.put(2, xml_text + " ")
+    assert cache.pmcids() == ["2"]
+
+    # offline caches serve XML trees without touching the network
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    cache.put(7067710, xml_text)
+    tree = scrape.get_xml(7067710, email="", cache=cache)
+    assert tree.getroot().tag == "pmc-articleset"
+    with pytest.raises(cacheMissError):
+        scrape.get_xml(7067711, email="", cache=cache)
+    with pytest.warns(scrape.missingArticleWarning):
+        trees = scrape.get_xmls([7067710, 7067711], email="", cache=cache)
+    assert trees[1] is None
+    trees = scrape.get_xmls([7067710], email="", batch_size=2, cache=cache)
+    assert trees[0] is not None
+    cache.close()
+
+    return None  # success
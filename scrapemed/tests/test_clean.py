@@ -1,7 +1,9 @@
 """Test ScrapeMed's _clean module, which is used for html and other style
 cleaning for XML data, in particular text nodes."""
 
+import lxml.etree as ET
 import scrapemed._clean as _clean
+import scrapemed._text as _text
 from scrapemed.utils import basicBiMap
 
 
@@ -30,6 +32,9 @@ def test_clean():
         _clean._remove_text_styling(STYLED_TEST_TEXT, verbose=False)
         == CORRECT_CLEAN_TEXT
     )
+    # tags are removed regardless of case, replacements are case sensitive
+    cleaner = _clean.styleCleaner(["<i>"], {"<sub>": "_"})
+    assert cleaner.clean("<I>C</I><sub>4</sub><SUB>") == "C_4<SUB>"
 
     # test tag parsing of paragraph text
     SAMPLE_PAR_2 = """
@@ -68,4 +73,16 @@ def test_clean():
     print("SAMPLE PAR CLEANED FROM REFS: " + cleaned_text)
     print("RESULTING REF MAP: " + str(ref_map))
 
+    # refs are stored as compact records, linked to their elements if provided
+    assert [ref.tag for ref in ref_map.values()] == ["xref", "table-wrap"]
+    assert ref_map[0].get("rid") == "Tab1" and ref_map[0].text == "1"
+    assert ref_map[0].element is None
+    par_root = ET.fromstring(f"<p>{SAMPLE_PAR_2}</p>")
+    linked_ref_map = basicBiMap()
+    linked_text = _clean.split_text_and_refs(
+        _text.stringify_children(par_root), linked_ref_map, root=par_root
+    )
+    assert linked_text.endswith("[MHTML::dataref::1]") and linked_ref_map == ref_map
+    assert linked_ref_map[1].element is par_root.find("table-wrap")
+
     return None
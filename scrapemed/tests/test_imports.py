@@ -0,0 +1,73 @@
+"""
+Test ScrapeMed's import time. Parsing workers only import scrapemed.scrape
+and scrapemed._parse, so these should stay fast, and leave the vector,
+visualization, and storage dependencies unimported until used.
+"""
+
+import subprocess
+import sys
+
+# cumulative import time budgets, in seconds. Generous, to allow for slow
+# machines, but well below the multiple seconds taken by the heavy dependencies
+IMPORT_BUDGETS = {"scrapemed.scrape": 1.5, "scrapemed._parse": 4.0}
+LAZY_DEPENDENCIES = [
+    "chromadb",
+    "langchain",
+    "matplotlib",
+    "wordcloud",
+    "sqlalchemy",
+    "pandas.io.formats.style",
+]
+
+
+def test_import_time():
+    for module, budget in IMPORT_BUDGETS.items():
+        import_times = _import_times(module)
+        assert import_times[module] < budget, (
+            f"Importing {module} took {import_times[module]:.2f}s, "
+            f"over its {budget}s budget."
+        )
+        for dependency in LAZY_DEPENDENCIES:
+            assert (
+                dependency not in import_times
+            ), f"Importing {module} imported {dependency}."
+
+    return None
+
+
+def test_lazy_dependencies():
+    # Paper and paperSet only import heavy dependencies when used
+    for module in ["scrapemed.paper", "scrapemed.paperSet"]:
+        import_times = _import_times(module)
+        for dependency in LAZY_DEPENDENCIES:
+            assert (
+                dependency not in import_times
+            ), f"Importing {module} imported {dependency}."
+
+    return None
+
+
+# -----------HELPER FUNCTIONS-------------------
+def _import_times(module: str):
+    """
+    Import a module in a fresh interpreter with `python -X importtime`.
+
+    :return: Cumulative import time in seconds, keyed by each module imported.
+    :rtype: dict
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative) / 1e6
+    return import_times
+
+
+# -------------------END HELPER FUNCTIONS-----------------------------
@@ -0,0 +1,32 @@
+"""
+Test ScrapeMed's _lexical module, the BM25 index of Paper text chunks.
+"""
+
+import numpy as np
+import scrapemed._lexical as _lexical
+
+
+def test_bm25_index():
+    index = _lexical.bm25Index()
+    index.add(1, ["CYP2C9 metabolizes ibuprofen.", "Renal clearance of ibuprofen"])
+    index.add(2, ["Acetaminophen absorption", "cyp2c9 cyp2c9 polymorphism", ""])
+    assert len(index) == 5
+    assert _lexical.tokenize("IL-6, CYP2C9!") == ["il", "6", "cyp2c9"]
+
+    # exact terms match, ignoring case, with repeated terms scoring higher
+    hits = index.search("CYP2C9", n_results=5)
+    assert [hit[:2] for hit in hits] == [(2, 1), (1, 0)]
+    assert hits[0][2] > hits[1][2] > 0
+    assert index.search("unknown words") == []
+    assert index.search("ibuprofen", n_results=1)[0][:2] in {(1, 0), (1, 1)}
+    assert [hit[:2] for hit in index.search("cyp2c9", pmcids=[1])] == [(1, 0)]
+    assert index.search("cyp2c9", pmcids=["PMC1"]) == index.search("cyp2c9", 5, [1])
+
+    # papers added after a search are merged into the postings on the next
+    index.add(3, ["ibuprofen ibuprofen"])
+    assert index.search("ibuprofen")[0][:2] == (3, 0)
+    assert np.all(np.diff(index.indptr) > 0)
+    assert len(index.postings) == len(index.frequencies) == index.indptr[-1]
+    assert index.nbytes < 1000
+
+    return None
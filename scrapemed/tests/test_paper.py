@@ -3,9 +3,15 @@ Test ScrapeMed's paper module.
 """
 
 import scrapemed.paper as paper
+import scrapemed._parse as parse
 import pandas as pd
 import os
+import pickle
+import pytest
+import lxml.etree as ET
 from datetime import datetime
+from urllib.error import HTTPError
+from scrapemed.cache import xmlCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -340,3 +346,86 @@ def test_paper():
     p = paper.Paper.from_pmc(PMCID, email, download=False, suppress_warnings=True)
 
     return None
+
+
+def test_lazy_paper(tmp_path, monkeypatch):
+    path_to_testdata = os.path.join(os.path.dirname(__file__), "testdata")
+    root = ET.parse(os.path.join(path_to_testdata, "test.xml")).getroot()
+    full = paper.Paper.from_xml(7067710, root, suppress_warnings=True)
+
+    # metadata is parsed up front, everything else on first access
+    p = paper.LazyPaper.from_xml(7067710, root, suppress_warnings=True)
+    assert p.fields == parse.METADATA_FIELDS
+    assert not p.is_loaded and "body" not in p.__dict__
+    assert p.title == full.title
+    assert p.authors.equals(full.authors)
+
+    # copies and pickles keep only the XML until loaded
+    restored = pickle.loads(pickle.dumps(p))
+    assert not restored.is_loaded
+
+    assert p.body_as_str() == full.body_as_str()
+    assert p.is_loaded and p.fields == parse.PAPER_DICT_FIELDS
+    assert len(p.tables) == len(full.tables)
+    assert p.citations == full.citations
+    assert restored.abstract_as_str() == full.abstract_as_str()
+    assert restored.figures == full.figures
+
+    with pytest.raises(AttributeError):
+        p.not_an_attribute
+
+    # papers from PMC keep their XML too
+    with open(os.path.join(path_to_testdata, "test.xml")) as f:
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    cache.put(7067710, xml_text)
+    p = paper.LazyPaper.from_pmc(7067710, "", cache=cache, suppress_warnings=True)
+    assert p.fields == parse.METADATA_FIELDS and not p.is_loaded
+    full = paper.Paper.from_pmc(7067710, "", cache=cache, suppress_warnings=True)
+    assert p.body_as_str() == full.body_as_str()
+
+    # and are retried like Papers on HTTP errors, then warned about
+    calls = []
+
+    def fail(**kwargs):
+        calls.append(kwargs["pmcid"])
+        raise HTTPError("", 429, "Too Many Requests", None, None)
+
+    monkeypatch.setattr(paper.scrape, "get_xml", fail)
+    monkeypatch.setattr(paper.scrape, "_backoff_delay", lambda attempt: 0)
+    with pytest.warns(paper.pubmedHTTPError):
+        assert paper.LazyPaper.from_pmc(7067710, "") is None
+    assert calls == [7067710] * 3
+
+    return None
+
+
+def test_tables():
+    path_to_testdata = os.path.join(os.path.dirname(__file__), "testdata")
+    root = ET.parse(os.path.join(path_to_testdata, "test.xml")).getroot()
+    p = paper.Paper.from_xml(7067710, root, suppress_warnings=True)
+
+    # exporting tables does not build their dataframes
+    relational = p.to_relational()
+    assert p._tables is None
+    assert relational["Tables"] == [r.to_dict() for r in p.table_records]
+    assert relational["Tables"][1]["Label"] == "Table\xa01"
+
+    # built on first access, and rebuilt rather than pickled
+    assert len(p.tables) == len(p.table_records)
+    assert p.tables[1].caption == p.table_records[1].title
+    restored = pickle.loads(pickle.dumps(p))
+    assert restored._tables is None
+    assert restored.tables[1].data.equals(p.tables[1].data)
+
+    # dataframes set by hand are kept as they are, and recorded for export
+    df = pd.DataFrame({"a": [1, 2]})
+    p.tables = [df]
+    assert p.tables[0] is df
+    assert p.to_relational()["Tables"] == [
+        {"Label": None, "Caption": None, "Header": [["a"]], "Rows": [["1"], ["2"]]}
+    ]
+
+    return None
@@ -5,7 +5,12 @@ Test ScrapeMed's paperSet module.
 import sys
 from dotenv import load_dotenv
 import os
-from scrapemed.paperSet import paperSet
+import copy
+import pytest
+import lxml.etree as ET
+from scrapemed.paperSet import paperSet, paperSink
+from scrapemed.paper import Paper
+from scrapemed.cache import xmlCache
 
 sys.path.insert(0, "../../scrapemed")
 load_dotenv()
@@ -29,3 +34,91 @@ def test_paperset():
     assert len(pset.to_df()) == 2
 
     return None
+
+
+def test_iter_from_pmcid_list(tmp_path):
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(test_dir, "testdata", "test.xml"), "r") as f:
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+    # serve three copies of the test paper from an offline cache
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    pmcids = [7067710, 7067711, 7067712]
+    for pmcid in pmcids:
+        cache.put(pmcid, xml_text)
+
+    # papers stream one at a time, and rows are flushed in bounded chunks
+    sink = paperSink(tmp_path / "corpus", chunk_size=2)
+    stream = paperSet.iter_from_pmcid_list(
+        pmcids + [1], "", cache=cache, batch_size=2, sink=sink
+    )
+    first = next(stream)
+    assert isinstance(first, Paper) and first.pmcid == 7067710
+    assert sink.chunk_paths() == []
+    assert [paper.pmcid for paper in stream] == [7067711, 7067712]
+    assert [len(chunk) for chunk in sink.iter_chunks()] == [2, 1]
+    assert list(sink.to_df()["PMCID"]) == pmcids
+
+    # rows can be streamed instead of Papers, and a reopened sink appends
+    sink = paperSink(tmp_path / "corpus", chunk_size=2)
+    rows = list(
+        paperSet.iter_from_pmcid_list(
+            pmcids[:1], "", cache=cache, as_rows=True, sink=sink
+        )
+    )
+    assert rows[0]["Title"] == first.title
+    assert list(sink.to_df()["PMCID"]) == pmcids + pmcids[:1]
+
+    return None
+
+
+def test_iter_from_pmcid_list_errors(tmp_path):
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(test_dir, "testdata", "test.xml"), "r") as f:
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    cache.put(7067710, xml_text)
+    cache.put(7067711, "<pmc-articleset><article>")
+    cache.put(7067712, xml_text)
+
+    # a failed retrieval (7067713 is not in the offline cache) or parse
+    # (7067711 is broken) is warned, and the stream continues
+    with pytest.warns(Warning) as record:
+        papers = list(
+            paperSet.iter_from_pmcid_list(
+                [7067713, 7067710, 7067711, 7067712], "", cache=cache
+            )
+        )
+    assert [paper.pmcid for paper in papers] == [7067710, 7067712]
+    messages = [str(warning.message) for warning in record]
+    assert any("PMCID 7067713" in message for message in messages)
+    assert any("PMCID 7067711" in message for message in messages)
+
+    with pytest.raises(ET.XMLSyntaxError):
+        list(
+            paperSet.iter_from_pmcid_list(
+                [7067710, 7067711], "", cache=cache, suppress_errors=False
+            )
+        )
+
+    return None
+
+
+def test_add_papers(paper_copies):
+    papers = paper_copies(5)
+
+    # duplicates (same PMCID and last update) are found without a scan
+    pset = paperSet(papers[:2])
+    assert pset.add_papers(papers[1:] + [copy.copy(papers[4])]) == 3
+    assert not pset.add_paper(papers[0])
+    assert [p.pmcid for p in pset.papers] == list(range(5))
+
+    # rows are buffered, and appended to the df in one block on access
+    assert len(pset._pending_rows) == 3
+    assert list(pset.df["PMCID"]) == list(range(5))
+    assert pset._pending_rows == [] and len(pset.to_df()) == 5
+
+    return None
@@ -2,10 +2,171 @@
 Test ScrapeMed's parse module.
 """
 
-# import scrapemed._parse as _parse
+import os
+import pickle
+import warnings
+import pytest
+import lxml.etree as ET
+import pandas as pd
+import scrapemed._parse as _parse
+from scrapemed._text import TextElement, tableRecord
+from scrapemed.paper import Paper
+from pandas.io.formats.style import Styler
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def test_parse():
     # tested by test_paper, unit testing will go here when applicable
 
     return None
+
+
+def test_tree_walk():
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+
+    # the single pass index answers each query like XPath does
+    index = _parse.index_paper_tree(root)
+    for query, matches in index.items():
+        assert matches == root.xpath(query), query
+
+    # and both engines generate the same paper dict, with the same warnings
+    paper_dicts = {}
+    for engine in _parse.PAPER_DICT_ENGINES:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            paper_dicts[engine] = _comparable(
+                _parse.generate_paper_dict(7067710, root, engine=engine)
+            )
+        paper_dicts[engine]["warnings"] = [str(w.message) for w in caught]
+    assert paper_dicts["xpath"] == paper_dicts["walk"]
+
+    return None
+
+
+def test_ref_map_with_tags():
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+    paper_dict = _parse.generate_paper_dict(7067710, root)
+
+    # tagged refs are the serialized markup of each data reference
+    ref_map_with_tags = paper_dict["Ref Map With Tags"]
+    assert len(ref_map_with_tags) == len(paper_dict["Ref Map"])
+    for key, tag in ref_map_with_tags.items():
+        assert isinstance(tag, str) and tag.startswith("<")
+        assert ref_map_with_tags.reverse[tag] == key
+        ET.fromstring(tag)
+
+    return None
+
+
+def test_id_index():
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+    ids = _parse.index_ids(root)
+
+    # id lookups match the XPath queries they replace
+    for xref in root.iterfind(".//xref[@rid]"):
+        rid = xref.get("rid")
+        for tag in ["ref", "table-wrap", "fig"]:
+            assert _parse._find_by_id(ids, rid, tag) == root.xpath(
+                f"//{tag}[@id='{rid}']"
+            )
+        assert _parse._find_by_id(
+            ids, rid, "aff", parent_tag="contrib-group"
+        ) == root.xpath(f"//contrib-group/aff[@id='{rid}']")
+    assert _parse._find_by_id(ids, "not-an-id", "ref") == []
+
+    return None
+
+
+def test_parallel_parse():
+    with open(os.path.join(TEST_DIR, "testdata", "test.xml"), "rb") as f:
+        xml_bytes = f.read()
+    serial = _parse.paper_dict_from_xml_bytes(
+        7067710, xml_bytes, suppress_warnings=True
+    )
+
+    # paper dicts survive pickling, as when shipped back from a worker
+    restored = _parse.from_picklable_paper_dict(pickle.loads(pickle.dumps(serial)))
+    assert _comparable(restored) == _comparable(
+        _parse.from_picklable_paper_dict(serial)
+    )
+    assert isinstance(restored["Tables"][1], tableRecord)
+
+    # order is preserved, and failures are reported per PMCID
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        paper_dicts = _parse.paper_dicts_from_xml_bytes(
+            [7067710, 1, 2, 7067710],
+            [xml_bytes, b"<not-xml", None, xml_bytes],
+            workers=2,
+            suppress_warnings=True,
+            suppress_errors=True,
+        )
+    assert [paper_dict is None for paper_dict in paper_dicts] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert _comparable(paper_dicts[0]) == _comparable(restored)
+    assert _comparable(paper_dicts[3]) == _comparable(restored)
+    failures = [w for w in caught if w.category is _parse.parseFailureWarning]
+    assert len(failures) == 1 and "PMCID 1" in str(failures[0].message)
+
+    return None
+
+
+def test_fields():
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+    full = _comparable(
+        _parse.generate_paper_dict(7067710, root, suppress_warnings=True)
+    )
+    assert list(full) == _parse.PAPER_DICT_FIELDS
+
+    # selected fields match a full parse, and skipped fields are left out
+    for fields in [_parse.METADATA_FIELDS, ["Title", "Citations"], ["Tables"]]:
+        paper_dict = _comparable(
+            _parse.generate_paper_dict(
+                7067710, root, suppress_warnings=True, fields=fields
+            )
+        )
+        assert list(paper_dict) == _parse.resolve_fields(fields)
+        for field, value in paper_dict.items():
+            assert value == full[field], field
+
+    with pytest.raises(ValueError):
+        _parse.generate_paper_dict(7067710, root, fields=["Not A Field"])
+
+    # Papers leave fields that were not extracted as None
+    paper = Paper.from_xml(
+        7067710, root, suppress_warnings=True, fields=_parse.METADATA_FIELDS
+    )
+    assert paper.fields == _parse.METADATA_FIELDS
+    assert paper.title and paper.body is None and paper.tables is None
+    assert paper.to_relational()["Tables"] == []
+
+    return None
+
+
+# -----------HELPER FUNCTIONS-------------------
+def _comparable(value):
+    """
+    Convert paper dict values (DataFrames, tables, text elements) into plain
+    python values that can be compared with ==.
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict()
+    if isinstance(value, Styler):
+        return (value.data.to_dict(), value.caption)
+    if isinstance(value, TextElement):
+        if hasattr(value, "df"):
+            return _comparable(value.df)
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _comparable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_comparable(item) for item in value]
+    return value
+
+
+# -------------------END HELPER FUNCTIONS-----------------------------
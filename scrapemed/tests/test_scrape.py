@@ -3,10 +3,16 @@ Test ScrapeMed's scrape module.
 """
 
 import scrapemed.scrape as scrape
+import scrapemed._validate as _validate
+from scrapemed.cache import xmlCache
 from dotenv import load_dotenv
 from Bio import Entrez
 import os
 import lxml
+import asyncio
+import threading
+import time
+import pytest
 
 load_dotenv()
 
@@ -36,4 +42,183 @@ def test_scrape():
     xmls = scrape.get_xmls(brain_surgery_articles[0:2], email=EMAIL)
     assert isinstance(xmls[0], lxml.etree._ElementTree)
 
+    # batched efetch returns the same articles, in order
+    batched_xmls = scrape.get_xmls(
+        brain_surgery_articles[0:3], email=EMAIL, batch_size=2
+    )
+    assert len(batched_xmls) == 3
+    for pmcid, xml in zip(brain_surgery_articles[0:3], batched_xmls):
+        assert xml.findtext(".//article-meta/article-id[@pub-id-type='pmc']") == pmcid
+
+    # asyncio downloads yield every requested article
+    async def collect_xmls(pmcids):
+        return {
+            pmcid: xml async for pmcid, xml in scrape.aget_xmls(pmcids, email=EMAIL)
+        }
+
+    async_xmls = asyncio.run(collect_xmls(brain_surgery_articles[0:3]))
+    assert set(async_xmls.keys()) == set(brain_surgery_articles[0:3])
+    for xml in async_xmls.values():
+        assert isinstance(xml, lxml.etree._ElementTree)
+
+    return None
+
+
+def test_token_bucket():
+    async def time_acquires(bucket, n):
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(n)))
+        return time.monotonic() - start
+
+    # first token is available immediately, the rest refill at 10/s
+    elapsed = asyncio.run(time_acquires(scrape.tokenBucket(rate=10), 6))
+    assert 0.45 <= elapsed < 1.5
+
+    # jittered backoff grows exponentially, within [delay / 2, delay]
+    for attempt in range(4):
+        delay = min(60.0, 2.0 * 2**attempt)
+        assert delay / 2 <= scrape._backoff_delay(attempt) <= delay
+
+    return None
+
+
+def test_aget_xmls_cached(tmp_path, monkeypatch):
+    with open(os.path.join(os.path.dirname(__file__), "testdata", "test.xml")) as f:
+        # PMC serves XML declarations without an encoding
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    cache.put(7067710, xml_text)
+
+    # trees are built off the event loop's thread
+    threads = []
+    tree_from_xml_string = scrape._tree_from_xml_string
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        return tree_from_xml_string(*args)
+
+    monkeypatch.setattr(scrape, "_tree_from_xml_string", record_thread)
+    # and so are cache reads
+    cache_threads = []
+    cache_get = cache.get
+
+    def record_cache_thread(pmcid):
+        cache_threads.append(threading.current_thread())
+        return cache_get(pmcid)
+
+    monkeypatch.setattr(cache, "get", record_cache_thread)
+
+    async def collect():
+        return {
+            pmcid: tree
+            async for pmcid, tree in scrape.aget_xmls(
+                [7067710], email="", api_key="per-call-key", cache=cache
+            )
+        }
+
+    api_key = Entrez.api_key
+    trees = asyncio.run(collect())
+    assert trees[7067710].getroot().tag == "pmc-articleset"
+    assert threads and threading.main_thread() not in threads
+    assert cache_threads and threading.main_thread() not in cache_threads
+    # the api key is only used for this call's requests
+    assert Entrez.api_key == api_key
+
+    return None
+
+
+def test_get_xml_strip_method(tmp_path):
+    with open(os.path.join(os.path.dirname(__file__), "testdata", "test.xml")) as f:
+        xml_text = f.read().replace(
+            "<?xml version='1.0' encoding='UTF-8'?>", '<?xml version="1.0" ?>'
+        )
+    cache = xmlCache(tmp_path / "cache", offline=True)
+    cache.put(7067710, xml_text)
+
+    # strip_method reaches xml_tree_from_string, and both methods agree
+    trees = {
+        method: scrape.get_xml(7067710, "", cache=cache, strip_method=method)
+        for method in ["regex", "tree"]
+    }
+    assert lxml.etree.tostring(trees["regex"]) == lxml.etree.tostring(trees["tree"])
+    with pytest.raises(ValueError):
+        scrape.get_xml(7067710, "", cache=cache, strip_method="dom")
+
+    return None
+
+
+def test_split_articleset():
+    path_to_testdata = os.path.join(os.path.dirname(__file__), "testdata")
+    with open(os.path.join(path_to_testdata, "test.xml"), "rb") as f:
+        xml_text = f.read().decode("utf-8")
+
+    # build a two article set, as returned by a batched efetch
+    article_start = xml_text.index("<article ")
+    article_end = xml_text.index("</pmc-articleset>")
+    article = xml_text[article_start:article_end]
+    second_article = article.replace(
+        '<article-id pub-id-type="pmc">7067710<',
+        '<article-id pub-id-type="pmc">7067711<',
+    )
+    articleset = (
+        xml_text[:article_start] + article + second_article + "</pmc-articleset>"
+    )
+
+    xml_texts = scrape._split_articleset(articleset)
+    assert list(xml_texts.keys()) == ["7067710", "7067711"]
+    for pmcid, article_text in xml_texts.items():
+        tree = scrape.xml_tree_from_string(article_text, strip_text_styling=True)
+        assert len(tree.getroot()) == 1
+        assert _validate.validate_xml(tree)
+
+    return None
+
+
+def test_strip_methods():
+    """
+    Tests that stripping styling from the tree matches regex string cleaning.
+    """
+    path_to_testdata = os.path.join(os.path.dirname(__file__), "testdata")
+    xml_files = [
+        os.path.join(path_to_testdata, filename)
+        for filename in sorted(os.listdir(path_to_testdata))
+        if filename.endswith(".xml")
+    ]
+    xml_files.append(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "..",
+            "examples",
+            "data",
+            "entrez_download_PMCID=7067710.xml",
+        )
+    )
+    for xml_file in xml_files:
+        with open(xml_file, "rb") as f:
+            xml_bytes = f.read()
+        regex_tree = scrape.xml_tree_from_string(xml_bytes, strip_text_styling=True)
+        tree_tree = scrape.xml_tree_from_string(
+            xml_bytes, strip_text_styling=True, strip_method="tree"
+        )
+        assert lxml.etree.tostring(regex_tree) == lxml.etree.tostring(tree_tree)
+
+    # styling inside CDATA and comments is left alone by the tree method
+    STYLED = (
+        "<p>C<sub>4</sub> is <Italic a='1'>great</Italic><b/>"
+        "<!-- <i>note</i> --><![CDATA[<i>raw</i>]]></p>"
+    )
+    root = scrape.xml_tree_from_string(
+        STYLED, strip_text_styling=True, strip_method="tree"
+    ).getroot()
+    assert root.text == "C_4 is great"
+    assert root[0].text == " <i>note</i> " and root[0].tail == "<i>raw</i>"
+    root = scrape.xml_tree_from_string(STYLED, strip_text_styling=True).getroot()
+    assert root[0].text == " note "
+
+    with pytest.raises(ValueError):
+        scrape.xml_tree_from_string(STYLED, True, strip_method="dom")
+
     return None
@@ -0,0 +1,72 @@
+"""
+Test ScrapeMed's store module, which persists papers to a SQL database.
+"""
+
+import copy
+from scrapemed.paperSet import paperSet
+from scrapemed.store import paperStore
+
+
+def test_store_roundtrip(tmp_path, paper_copies):
+    store = paperStore("sqlite:///" + str(tmp_path / "data" / "papers.sqlite"))
+    pset = paperSet(paper_copies(3))
+    pset.papers[1].article_categories = [{"subject-area": "Pharmacology"}]
+    assert pset.to_store(store, batch_size=2) == 3
+    assert len(store) == 3
+
+    loaded = paperSet.from_store(store, batch_size=2)
+    assert len(loaded) == 3
+    paper, stored_paper = pset.papers[0], loaded.papers[0]
+    assert stored_paper.pmcid == 0
+    assert stored_paper.last_updated == paper.last_updated
+    assert stored_paper.title == paper.title
+    assert stored_paper.abstract_as_str() == paper.abstract_as_str()
+    assert stored_paper.body_as_str() == paper.body_as_str()
+    assert stored_paper.authors.equals(paper.authors)
+    assert stored_paper.article_id == paper.article_id
+    assert stored_paper.published_date == paper.published_date
+    assert stored_paper.article_categories == paper.article_categories
+    assert loaded.papers[1].article_categories == pset.papers[1].article_categories
+    assert stored_paper.citations == paper.citations
+    assert stored_paper.figures == paper.figures
+    assert len(stored_paper.tables) == len(paper.tables)
+    assert stored_paper.tables[1].caption == paper.tables[1].caption
+    assert stored_paper.tables[1].data.shape == paper.tables[1].data.shape
+
+    # papers stream from the store one batch at a time
+    stream = paperSet.iter_from_store(store, batch_size=2)
+    assert next(stream).pmcid == 0
+    assert [paper.pmcid for paper in stream] == [1, 2]
+
+    # queries filter the papers table
+    queried = paperSet.from_store(store, query=store.papers.c.pmcid >= 1)
+    assert [paper.pmcid for paper in queried.papers] == [1, 2]
+
+    store.close()
+    return None
+
+
+def test_store_upsert(tmp_path, paper_copies):
+    store = paperStore("sqlite:///" + str(tmp_path / "papers.sqlite"))
+    papers = paper_copies(3)
+    assert store.upsert(papers) == 3
+
+    # unchanged papers are skipped, even if parsed again later
+    papers[0].last_updated = (1, 1, 2000)
+    assert store.upsert(papers) == 0
+
+    # changed papers replace their rows
+    papers[1] = copy.copy(papers[1])
+    papers[1].title = "A New Title"
+    papers[1].figures = []
+    assert store.upsert(papers) == 1
+    updated = list(store.iter_papers(store.papers.c.pmcid == 1))[0]
+    assert updated.title == "A New Title"
+    assert updated.figures == []
+    assert len(list(store.iter_papers()))
+
+    assert store.delete([2]) == 1
+    assert store.pmcids() == [0, 1]
+
+    store.close()
+    return None
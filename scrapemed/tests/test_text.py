@@ -7,8 +7,13 @@ from scrapemed._text import TextParagraph, TextSection, TextTable
 
 # from scrapemed._text import TextFigure
 import lxml.etree as ET
+import os
+import pickle
+import pandas as pd
 from scrapemed.utils import basicBiMap
 
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 def test_text():
     # test getters and setters
@@ -113,3 +118,75 @@ def test_text():
     print(type(TextTable(table_root)))
 
     return None
+
+
+def test_read_table():
+    tables = [
+        # grouped rows and a two row header spanning columns
+        (
+            "<table-wrap><table><thead><tr><th rowspan='2'>Group</th>"
+            "<th colspan='2'>Dose</th></tr><tr><th>A</th><th>B</th></tr></thead>"
+            "<tbody><tr><td rowspan='2'>x</td><td>1,234</td><td>2.5</td></tr>"
+            "<tr><td>NA</td><td></td></tr><tr><td>y</td><td>3</td></tr></tbody>"
+            "</table></table-wrap>"
+        ),
+        # no <thead>, a header row of <th> cells, collapsed whitespace
+        (
+            "<table-wrap><table><tr><th>a</th><th>b</th></tr>"
+            "<tr><td>1</td><td>2  \n 3</td></tr></table></table-wrap>"
+        ),
+        # no header, ragged rows, a footer, and a rowspan past the last row
+        (
+            "<table-wrap><table><tbody><tr><td rowspan='3'>a</td><td>1</td></tr>"
+            "<tr><td colspan='3'>wide</td></tr></tbody>"
+            "<tfoot><tr><td>f</td></tr></tfoot></table></table-wrap>"
+        ),
+        # line breaks are left to pd.read_html
+        (
+            "<table-wrap><table><tr><td>a<br/>b</td><td>1</td></tr></table>"
+            "</table-wrap>"
+        ),
+    ]
+    with open(os.path.join(TEST_DIR, "testdata", "test.xml"), "rb") as f:
+        table_wraps = list(ET.fromstring(f.read()).iter("table-wrap"))
+    table_wraps += [ET.fromstring(table) for table in tables]
+
+    # reading the tree directly gives the same dataframes as pd.read_html
+    for table_wrap in table_wraps:
+        pd.testing.assert_frame_equal(
+            _text.read_table(table_wrap),
+            pd.read_html(ET.tostring(table_wrap))[0],
+        )
+
+    return None
+
+
+def test_table_record():
+    table_root = ET.fromstring(
+        "<table-wrap><label>Table 1</label><caption><p>Doses</p></caption>"
+        "<table><thead><tr><th>Group</th><th>Dose</th></tr></thead><tbody>"
+        "<tr><td>x</td><td>1,234</td></tr><tr><td>y</td><td></td></tr>"
+        "</tbody></table></table-wrap>"
+    )
+    table = TextTable(table_root)
+
+    # tables are kept as their cell text until the dataframe is needed
+    assert table.record == _text.tableRecord(
+        "Table 1", "Doses", [["Group", "Dose"]], [["x", "1,234"], ["y", ""]]
+    )
+    assert table._df is None
+    assert table.df.caption == "Table 1: Doses"
+    assert table.df.data.equals(_text.read_table(table_root))
+    assert table.record.to_dict()["Rows"] == [["x", "1,234"], ["y", ""]]
+
+    # the dataframe is rebuilt, rather than pickled
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored._df is None and restored.df.data.equals(table.df.data)
+
+    # dataframes can be recorded too
+    record = _text.tableRecord.from_table(table.df)
+    assert record.caption == "Table 1: Doses" and record.label is None
+    assert record.header == [["Group", "Dose"]]
+    assert record.to_df().equals(table.df.data)
+
+    return None
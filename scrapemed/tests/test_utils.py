@@ -2,6 +2,8 @@
 Test ScrapeMed's utils module.
 """
 
+import pickle
+import lxml.etree as ET
 import scrapemed.utils as smutils
 from scrapemed.utils import reversedBiMapComparisonWarning
 import pytest
@@ -25,4 +27,23 @@ def test_utils():
             not bimap == bimap3
         ), "Exactly reversed bimaps raise warning, and are not equal."
 
+    # test data reference records
+    xref = ET.fromstring('<xref ref-type="bibr" rid="CR1">1</xref>')
+    ref = smutils.dataRef("xref", xref.items(), xref.text, element=xref)
+    assert ref.get("rid") == "CR1" and ref.get("id") is None
+    assert str(ref) == ET.tostring(xref, encoding="unicode")
+    assert ref == smutils.dataRef("xref", xref.items(), "1")
+    bimap = smutils.basicBiMap({0: ref})
+    assert bimap.reverse[smutils.dataRef("xref", xref.items(), "1")] == 0
+    unpickled = pickle.loads(pickle.dumps(ref))
+    assert unpickled == ref and unpickled.element is None
+
+    # test PMCID normalization
+    assert smutils.normalize_pmcid("PMC7067710") == "7067710"
+    assert smutils.normalize_pmcid(" pmc7067710") == "7067710"
+    assert smutils.normalize_pmcid(7067710) == "7067710"
+    assert smutils.pmcid_as_int(" PMC7067710") == 7067710
+    assert smutils.plain_str(7067710) == "7067710"
+    assert smutils.plain_str(float("nan")) is None
+
     return None  # success
@@ -8,6 +8,7 @@ import scrapemed._morehtml as mhtml
 import lxml.etree as ET
 import filecmp
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
 def test_xml_validation():
@@ -85,6 +86,41 @@ def test_xml_validation():
     return None  # output for a passing test in pytest
 
 
+def test_validate_xmls():
+    """
+    Tests batch XML validation, sharing one compiled DTD across documents.
+    """
+    path_to_testdata = os.path.join(os.path.dirname(__file__), "testdata")
+    xmls = [
+        _get_xml_from_file(os.path.join(path_to_testdata, filename))
+        for filename in ["test.xml", "weird_caps.xml", "test_wildcarding_1.xml"]
+    ]
+    xmls.append(ET.ElementTree(ET.fromstring("<pmc-articleset/>")))
+
+    results = _validate.validate_xmls(xmls)
+    assert [result.valid for result in results] == [True, False, True, False]
+    assert results[0].errors == [] and results[2].errors == []
+    assert results[1].errors and results[3].errors
+
+    # validity matches the single document API, and the DTD is compiled once
+    assert [_validate.validate_xml(xml) for xml in xmls[:3]] == [True, False, True]
+    url = _validate.SUPPORTED_DTD_URLS[0]
+    assert _validate.get_dtd(url) is _validate.get_dtd(url)
+
+    # per thread, so concurrent validations keep their own error logs
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert (
+            _validate.get_dtd(url)
+            is not executor.submit(_validate.get_dtd, url).result()
+        )
+        threaded = list(
+            executor.map(lambda xml: _validate.validate_xmls([xml])[0], xmls * 8)
+        )
+    assert threaded == results * 8
+
+    return None  # success
+
+
 # -----------HELPER FUNCTIONS-------------------
 def _get_xml_from_file(filename: str, encoding: str = "utf-8") -> ET.ElementTree:
     """
@@ -0,0 +1,240 @@
+"""
+Test ScrapeMed's vector module.
+"""
+
+import os
+import pytest
+import numpy as np
+import pandas as pd
+import lxml.etree as ET
+import scrapemed._vector as _vector
+from scrapemed.paper import Paper
+from scrapemed.paperSet import paperSet
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_chunk_paper():
+    paper = _test_paper()
+    text = paper.full_text()
+
+    # section spans locate each section's text in the full text
+    spans = _vector.section_spans(paper)
+    sections = (paper.abstract or []) + (paper.body or [])
+    assert len(spans) == len(sections)
+    for (start, end, part, title), section in zip(spans, sections):
+        assert text[start:end] == str(section)
+    assert [part for _, _, part, _ in spans[:2]] == ["abstract", "abstract"]
+
+    # chunks are tagged with the PMCID and section they come from
+    ids, chunks, metadatas = _vector.chunk_paper(paper, 100, 20)
+    assert ids[26] == "pmcid-7067710-chunk-26"
+    assert len(chunks) == len(ids) == len(metadatas)
+    assert metadatas[0] == {
+        "pmcid": 7067710,
+        "start": 0,
+        "end": len(chunks[0]),
+        "part": "abstract",
+        "section": "Introduction",
+    }
+    assert metadatas[-1]["part"] == "body"
+    # whatever form the PMCID is in
+    paper.pmcid = "PMC7067710"
+    assert _vector.chunk_paper(paper, 100, 20) == (ids, chunks, metadatas)
+    paper.pmcid = 7067710
+
+    # and with their offsets into the full text
+    for chunk, metadata in zip(chunks, metadatas):
+        assert text[metadata["start"] : metadata["end"]] == chunk
+    stitched = _vector.stitch(text, metadatas[24:29])
+    assert stitched.startswith("similar to its monocomponent constituents")
+    assert stitched.endswith("similar exposures to acetaminophen and ibuprofen")
+    assert "formulation effects. Similar to previous findings" in stitched
+    assert _vector.stitch(text, [{"pmcid": 7067710}]) is None
+
+    return None
+
+
+def test_hashing_embedder():
+    embedding_fn = _vector.hashingEmbedder(n_features=64)
+    texts = ["Ibuprofen absorption", "ibuprofen ABSORPTION!", "renal clearance", ""]
+    embeddings = embedding_fn(texts)
+    assert embeddings.shape == (4, 64)
+    assert np.allclose(np.linalg.norm(embeddings[:3], axis=1), 1)
+    assert np.allclose(embeddings[0], embeddings[1])
+    assert not embeddings[3].any()
+
+    # batches run on the shared thread pool give the same embeddings, in order
+    batched = _vector.embed(texts, embedding_fn, batch_size=1)
+    assert np.allclose(np.stack(batched), embeddings)
+
+    return None
+
+
+def test_vectorize(tmp_path, monkeypatch, paper_copies):
+    paper = _test_paper()
+    embedding_fn = _vector.hashingEmbedder()
+    paper.vectorize(embedding_fn=embedding_fn, embed_batch_size=16)
+    assert paper.vector_collection.count() == len(
+        _vector.chunk_paper(paper, 100, 20)[0]
+    )
+    # the query is embedded with the paper's embedding function
+    result = paper.query("ibuprofen absorption", n_before=1, n_after=1)
+    ((match, context),) = result.items()
+    # the expanded context is one slice of the text around the match
+    index = int(match.split("-")[-1])
+    ids, chunks, metadatas = _vector.chunk_paper(paper, 100, 20)
+    stitched = _vector.stitch(paper.full_text(), metadatas[index - 1 : index + 2])
+    assert context == f"...{stitched}..."
+    assert chunks[index] in context
+
+    # papers are added to one persistent collection, once
+    pset = paperSet(paper_copies(3))
+    path = str(tmp_path / "chroma")
+    assert pset.vectorize(path=path, embedding_fn=embedding_fn, batch_size=100) == 3
+    assert pset.vectorize(path=path, embedding_fn=embedding_fn) == 0
+
+    hits = pset.query("ibuprofen absorption", n_results=4)
+    assert len(hits) == 4 and set(hits["PMCID"]) <= {0, 1, 2}
+    assert hits["Distance"].is_monotonic_increasing
+    hits = pset.query("ibuprofen absorption", pmcids=[2])
+    assert set(hits["PMCID"]) == {2} and set(hits["Part"]) <= {"abstract", "body"}
+
+    # the chunks of skipped papers must match the collection's, for the
+    # lexical index to match it
+    with pytest.raises(ValueError):
+        pset.vectorize(path=path, chunk_size=200, embedding_fn=embedding_fn)
+    with pytest.raises(ValueError):
+        pset.vectorize(path=path, embedding_fn=_vector.hashingEmbedder(64))
+    assert (
+        pset.vectorize(
+            path=path, chunk_size=200, embedding_fn=embedding_fn, refresh=True
+        )
+        == 3
+    )
+    hits = pset.query("ibuprofen absorption", n_results=4, mode="lexical")
+    assert all(
+        "ibuprofen" in text.lower() or "absorption" in text.lower()
+        for text in hits["Text"]
+    )
+    assert pset.vectorize(path=path, embedding_fn=embedding_fn, refresh=True) == 3
+
+    # paperSets sharing a collection only retrieve their own Papers by default
+    other = paperSet(paper_copies(5)[3:])
+    assert other.vectorize(path=path, embedding_fn=embedding_fn) == 2
+    hits = pset.query("ibuprofen absorption", n_results=10)
+    assert len(hits) == 10 and set(hits["PMCID"]) <= {0, 1, 2}
+    assert set(other.query("ibuprofen absorption", n_results=10)["PMCID"]) <= {3, 4}
+    # PMCIDs are stored as integers, whatever form the papers hold them in
+    other = paperSet(paper_copies(3))
+    for paper in other.papers:
+        paper.pmcid = str(paper.pmcid)
+    assert other.vectorize(path=path, embedding_fn=embedding_fn) == 0
+    other.vectorize(path=str(tmp_path / "chroma-str"), embedding_fn=embedding_fn)
+    stored = other.vector_collection.get(include=["metadatas"])["metadatas"]
+    assert {metadata["pmcid"] for metadata in stored} == {0, 1, 2}
+
+    # an unvectorized paperSet is vectorized in memory on its first query
+    monkeypatch.chdir(tmp_path)
+    other = paperSet(paper_copies(1))
+    assert len(other.query("ibuprofen", embedding_fn=embedding_fn)) == 5
+    assert not os.path.exists(_vector.DEFAULT_VECTOR_PATH)
+
+    return None
+
+
+def test_query_many(tmp_path):
+    paper = _test_paper()
+    paper.vectorize(embedding_fn=_vector.hashingEmbedder())
+    queries = ["ibuprofen absorption", "renal clearance", "ibuprofen absorption"]
+
+    # one result per query, in order, matching single queries
+    results = paper.query_many(queries, n_results=2, n_before=1, n_after=1)
+    assert len(results) == 3 and results[0] == results[2]
+    for query, result in zip(queries, results):
+        assert result == paper.query(query, n_results=2, n_before=1, n_after=1)
+    assert paper.query_many([]) == []
+
+    pset = paperSet([paper])
+    pset.vectorize(
+        path=str(tmp_path / "chroma"), embedding_fn=_vector.hashingEmbedder()
+    )
+    frames = pset.query_many(queries, n_results=3, n_after=1)
+    assert len(frames) == 3
+    pd.testing.assert_frame_equal(frames[1], pset.query(queries[1], 3, n_after=1))
+    # the context of each match runs from its start into the next chunk
+    text = paper.full_text()
+    for _, hit in frames[0].iterrows():
+        assert hit["Context"].startswith(hit["Text"])
+        assert text[hit["Start"] :].startswith(hit["Context"])
+    assert "Context" not in pset.query(queries[0]).columns
+
+    return None
+
+
+def test_pmcid_forms(tmp_path):
+    # PMCIDs as strings, ie. from Entrez, or PMC prefixed, are normalized
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+    paper = Paper.from_xml("PMC7067710", root, suppress_warnings=True)
+    paper.vectorize(embedding_fn=_vector.hashingEmbedder())
+    assert len(paper.query("ibuprofen", n_results=2, mode="fused")) == 2
+
+    pset = paperSet([Paper.from_xml("7067710", root, suppress_warnings=True)])
+    pset.vectorize(
+        path=str(tmp_path / "chroma"), embedding_fn=_vector.hashingEmbedder()
+    )
+    for mode in _vector.QUERY_MODES:
+        hits = pset.query("ibuprofen absorption", n_results=3, mode=mode)
+        assert len(hits) == 3 and set(hits["PMCID"]) == {7067710}
+        assert hits["Text"].notna().all()
+    hits = pset.query("ibuprofen", n_results=3, pmcids=["PMC7067710"])
+    assert len(hits) == 3
+
+    return None
+
+
+def test_hybrid_query(tmp_path):
+    paper = _test_paper()
+    paper.vectorize(embedding_fn=_vector.hashingEmbedder())
+    assert len(paper.lexical_index) == paper.vector_collection.count()
+
+    # lexical queries match exact terms
+    result = paper.query(
+        "95th percentile", n_results=1, n_before=0, n_after=0, mode="lexical"
+    )
+    (context,) = result.values()
+    assert "95th" in context
+    assert paper.query("zzyzx", mode="lexical") == {}
+    assert len(paper.query("ibuprofen 95th", n_results=3, mode="fused")) == 3
+    with pytest.raises(ValueError):
+        paper.query("ibuprofen", mode="sparse")
+
+    pset = paperSet([paper])
+    pset.vectorize(
+        path=str(tmp_path / "chroma"), embedding_fn=_vector.hashingEmbedder()
+    )
+    hits = pset.query("95th percentile", n_results=2, mode="lexical")
+    assert "95th" in hits["Text"][0] and hits["Distance"].isna().all()
+    assert hits["Score"].is_monotonic_decreasing
+    # fused queries rank chunks matched both ways first
+    hits = pset.query("ibuprofen 95th", n_results=3, mode="fused")
+    assert len(hits) == 3 and hits["Score"].is_monotonic_decreasing
+    assert hits["Score"][0] > 1 / (_vector.RRF_K + 1)
+    assert "Score" not in pset.query("ibuprofen").columns
+
+    # the lexical index is rebuilt from papers already in the collection
+    pset.vectorize(
+        path=str(tmp_path / "chroma"), embedding_fn=_vector.hashingEmbedder()
+    )
+    assert len(pset.lexical_index) == len(paper.lexical_index)
+
+    return None
+
+
+# -----------HELPER FUNCTIONS-------------------
+def _test_paper():
+    root = ET.parse(os.path.join(TEST_DIR, "testdata", "test.xml")).getroot()
+    return Paper.from_xml(7067710, root, suppress_warnings=True)
+
+
+# -------------------END HELPER FUNCTIONS-----------------------------
@@ -6,9 +6,11 @@ The `utils` module contains various utilities necessary for PMC data parsing and
 cleaning, where the utilities are not directly related to text cleaning (`_clean`),
 recursive text processing (`_text`), or parsing (`_parse`).
 
-At the moment, the module contains a helper function for cleaning up docstrings,
-and a class, basicBiMap, which is a two-way map similar to python's dict class,
-used for efficient storage of data reference maps used throughout ScrapeMed.
+At the moment, the module contains helper functions for cleaning up docstrings
+and normalizing PMCIDs, a class, basicBiMap, which is a two-way map similar
+to python's dict class, used for efficient storage of data reference maps used
+throughout ScrapeMed, and a class, dataRef, a compact record of each data
+reference stored in those maps.
 
 Note: Data reference maps are used to pull citations, tables, and figures out of
 text for parsing elsewhere while retaining placeholders in the original text.
@@ -18,8 +20,10 @@ text for parsing elsewhere while retaining placeholders in the original text.
         basicBiMaps which are exactly the same but reversed.
 """
 
+import math
 import warnings
 from inspect import cleandoc
+from typing import Union
 
 
 class reversedBiMapComparisonWarning(Warning):
@@ -43,6 +47,45 @@ def cleanerdoc(s):
     return cleandoc(s).replace("\n", "")
 
 
+def normalize_pmcid(pmcid: Union[int, str]) -> str:
+    """
+    Normalize a PMCID to its numeric string form, ie. "PMC7067710" -> "7067710".
+
+    :param Union[int, str] pmcid: The PMCID to normalize.
+
+    :return: The PMCID as a string without a "PMC" prefix.
+    :rtype: str
+    """
+    return str(pmcid).strip().upper().removeprefix("PMC")
+
+
+def pmcid_as_int(pmcid: Union[int, str]) -> int:
+    """
+    Normalize a PMCID to an integer, ie. "PMC7067710" -> 7067710.
+
+    :param Union[int, str] pmcid: The PMCID to normalize.
+
+    :return: The PMCID as an integer.
+    :rtype: int
+    """
+    return int(normalize_pmcid(pmcid))
+
+
+def plain_str(value) -> str:
+    """
+    Convert a value (ie. an lxml smart string) to a plain string, keeping None
+    (and NaN) as None.
+
+    :param value: The value to convert.
+
+    :return: The value as a plain string, or None.
+    :rtype: str
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return str(value)
+
+
 # --------- end general helper funcs
 
 
@@ -100,6 +143,12 @@ class basicBiMap(dict):
         super().__setitem__(key, value)  # call the original __setitem__ method
         self.reverse[value] = key  # update the reverse dict
 
+    def __reduce__(self):
+        """
+        Pickle as the forward items, rebuilding the reverse dict on load.
+        """
+        return (self.__class__, (dict(self),))
+
     # Pass to super for methods necessary to be considered a Mapping class
     def __getitem__(self, key):
         return super().__getitem__(key)
@@ -136,3 +185,108 @@ class basicBiMap(dict):
                 )
             return False
         return True
+
+
+class dataRef:
+    """
+    Compact record of a data reference (<xref>, <table-wrap>, or <fig> tag)
+    pulled out of text, stored as a value in data reference maps.
+
+    Records compare and hash by tag, attributes and inner text, so identical
+    tags share one key in a basicBiMap. The referenced lxml element is kept as
+    a handle when available (it is dropped when pickling), and markup is only
+    serialized on demand via str().
+
+    :param str tag: The tag name, ie. "xref".
+    :param tuple attrib: Tuple of (name, value) attribute pairs, in order.
+    :param str text: The inner text (or inner markup) of the tag.
+    :param element: Optional handle to the lxml element the tag came from.
+
+    Example:
+    ```
+    ref = dataRef("xref", (("ref-type", "bibr"), ("rid", "CR1")), "1")
+    ref.get("rid")  # Output: 'CR1'
+    str(ref)  # Output: '<xref ref-type="bibr" rid="CR1">1</xref>'
+    ```
+    """
+
+    __slots__ = ("tag", "attrib", "text", "element")
+
+    def __init__(self, tag: str, attrib: tuple = (), text: str = "", element=None):
+        """
+        Initialize a data reference record.
+
+        :param str tag: The tag name.
+        :param tuple attrib: Tuple of (name, value) attribute pairs.
+        :param str text: The inner text (or inner markup) of the tag.
+        :param element: Optional handle to the lxml element the tag came from.
+        """
+        self.tag = tag
+        self.attrib = tuple(attrib)
+        self.text = text
+        self.element = element
+
+    def get(self, name: str, default=None):
+        """
+        Get an attribute value, like lxml's Element.get.
+
+        :param str name: The attribute name.
+        :param default: Returned if the attribute is not set.
+
+        :return: The attribute value, or default.
+        """
+        for key, value in self.attrib:
+            if key == name:
+                return value
+        return default
+
+    def _key(self) -> tuple:
+        """
+        The fields a record is compared and hashed by.
+        """
+        return (self.tag, self.attrib, self.text)
+
+    def __eq__(self, other):
+        """
+        Compare records by tag, attributes and inner text.
+        """
+        if not isinstance(other, dataRef):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        """
+        Hash records by tag, attributes and inner text.
+        """
+        return hash(self._key())
+
+    def __str__(self):
+        """
+        Serialize the record back into markup.
+
+        :return: The markup of the tag.
+        :rtype: str
+        """
+        attrib = "".join(f' {name}="{value}"' for name, value in self.attrib)
+        if not self.text:
+            return f"<{self.tag}{attrib}/>"
+        return f"<{self.tag}{attrib}>{self.text}</{self.tag}>"
+
+    def __repr__(self):
+        """
+        Return a representation of the record, including its markup.
+        """
+        return f"dataRef({str(self)!r})"
+
+    def __getstate__(self):
+        """
+        Pickle only the record, since lxml elements can't be pickled.
+        """
+        return (self.tag, self.attrib, self.text)
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled record, without its element handle.
+        """
+        self.tag, self.attrib, self.text = state
+        self.element = None